@@ -0,0 +1,8 @@
+"""
+Benchmarks package initialization.
+Provides placeholder credentials so config can be imported without a .env file.
+"""
+import os
+
+os.environ.setdefault("BOT_TOKEN", "123456:BENCHMARK")
+os.environ.setdefault("ADMIN_ID", "1")
@@ -0,0 +1,125 @@
+"""
+Reviewing many pending applications one by one vs in bulk.
+
+Users submit applications through the real dispatcher, then the admin
+approves all of them, first one at a time (pending list, view, approve,
+back to the menu for every application) and then, for a fresh set, with
+the multi-select mode of the pending list (select each page, one bulk
+approve). Reports the updates the admin had to send, the SQL statements
+they ran and the Bot API calls of the handlers. User notifications are
+queued in the outbox in both modes and not counted.
+
+Usage:
+    python -m benchmarks.bulk_review [--applications 200]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import benchmarks  # noqa: F401  (sets placeholder credentials)
+
+# Point the bot's engine at a scratch database before it is imported and
+# lift the per-user rate limits, which would otherwise drop scripted updates
+os.environ["DB_FILE"] = os.path.join(tempfile.mkdtemp(), "bulk_review.db")
+os.environ["LOG_LEVEL"] = "WARNING"
+for name in ("THROTTLE_MESSAGE_RATE", "THROTTLE_MESSAGE_BURST",
+             "THROTTLE_CALLBACK_RATE", "THROTTLE_CALLBACK_BURST"):
+    os.environ[name] = "1000000"
+
+import main  # noqa: E402
+from benchmarks.fake_bot_api import FakeBotAPI  # noqa: E402
+from benchmarks.flows import FlowRunner, apply_flow, start_flow  # noqa: E402
+from config import ADMIN_ID  # noqa: E402
+from db.cache import load_caches  # noqa: E402
+from db.database import engine, init_db  # noqa: E402
+from services.profiling import UpdateProfile, current_profile  # noqa: E402
+
+
+async def submit(runner: FlowRunner, first_user_id: int, count: int):
+    """Let `count` new users submit one application each."""
+    for user_id in range(first_user_id, first_user_id + count):
+        await start_flow(runner, user_id)
+        await apply_flow(runner, user_id)
+
+
+async def review_one_by_one(runner: FlowRunner) -> int:
+    """Approve every pending application through its own view. Returns updates sent."""
+    sent = 0
+    while True:
+        await runner.send("single", "pending list", runner.updates.callback(ADMIN_ID, "admin_new_apps"))
+        sent += 1
+        views = [data for data in runner.buttons(ADMIN_ID) if data.startswith("view_app_")]
+        if not views:
+            return sent
+        app_id = views[0].rsplit("_", 1)[1]
+        for step, data in (("view", f"view_app_{app_id}"), ("approve", f"admin_approve_{app_id}"), ("menu", "admin_menu")):
+            await runner.send("single", step, runner.updates.callback(ADMIN_ID, data))
+            sent += 1
+
+
+async def review_in_bulk(runner: FlowRunner) -> int:
+    """Select every page in multi-select mode and approve them at once. Returns updates sent."""
+    sent = 0
+    for step, data in (("pending list", "admin_new_apps"), ("select mode", "bulk_start")):
+        await runner.send("bulk", step, runner.updates.callback(ADMIN_ID, data))
+        sent += 1
+    while True:
+        await runner.send("bulk", "select page", runner.updates.callback(ADMIN_ID, "bulk_page_all"))
+        sent += 1
+        older = [data for data in runner.buttons(ADMIN_ID) if data.startswith("bulk_older_")]
+        if not older:
+            break
+        await runner.send("bulk", "next page", runner.updates.callback(ADMIN_ID, older[0]))
+        sent += 1
+    await runner.send("bulk", "approve", runner.updates.callback(ADMIN_ID, "bulk_approve"))
+    return sent + 1
+
+
+async def measure(name: str, runner: FlowRunner, review) -> None:
+    """Run one review mode and print what it cost."""
+    runner.api.reset()
+    profile = UpdateProfile()
+    token = current_profile.set(profile)
+    started = time.perf_counter()
+    try:
+        sent = await review(runner)
+    finally:
+        current_profile.reset(token)
+    elapsed = time.perf_counter() - started
+    api_calls = sum(runner.api.calls.values())
+    print(f"{name:<12} {sent:>8} {profile.sql_count:>8} {api_calls:>9} {elapsed:>9.2f}")
+
+
+async def main_review() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--applications", type=int, default=200)
+    args = parser.parse_args()
+
+    await init_db()
+    await load_caches()
+
+    api = FakeBotAPI()
+    await api.start()
+    bot = api.create_bot()
+    dp = main.build_dispatcher()
+    runner = FlowRunner(dp, bot, api)
+    try:
+        print(f"Approving {args.applications} pending applications")
+        print(f"{'mode':<12} {'updates':>8} {'SQL':>8} {'API calls':>9} {'seconds':>9}")
+        await submit(runner, 200000, args.applications)
+        await measure("one by one", runner, review_one_by_one)
+        await submit(runner, 300000, args.applications)
+        await measure("bulk", runner, review_in_bulk)
+    finally:
+        await dp.emit_shutdown(bot=bot)
+        await bot.session.close()
+        await api.stop()
+        await engine.dispose()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main_review()))
@@ -0,0 +1,80 @@
+"""
+Commit throughput benchmark for the SQLite engine profiles.
+
+Usage:
+    python -m benchmarks.db_commits [--commits 2000] [--writers 8]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import benchmarks  # noqa: F401  (sets placeholder credentials)
+from db.database import ENGINE_PROFILES, create_engine_for
+from db.models import Base, User
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+
+async def run_profile(profile: str, commits: int, writers: int) -> dict:
+    """Run the commit workload against a fresh database using one profile."""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine_for(os.path.join(tmp, "bench.db"), profile)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        async def writer(offset: int, count: int):
+            for i in range(count):
+                async with session_factory() as session:
+                    session.add(User(user_id=offset + i, language="en"))
+                    await session.commit()
+
+        async def reader(stop: asyncio.Event) -> int:
+            reads = 0
+            while not stop.is_set():
+                async with session_factory() as session:
+                    await session.execute(select(func.count(User.user_id)))
+                reads += 1
+                await asyncio.sleep(0)
+            return reads
+
+        per_writer = commits // writers
+        stop = asyncio.Event()
+        reader_task = asyncio.create_task(reader(stop))
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            writer(w * per_writer, per_writer) for w in range(writers)
+        ))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        reads = await reader_task
+        await engine.dispose()
+
+    return {
+        "profile": profile,
+        "commits": per_writer * writers,
+        "seconds": elapsed,
+        "commits_per_second": per_writer * writers / elapsed,
+        "concurrent_reads_per_second": reads / elapsed,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--commits", type=int, default=2000)
+    parser.add_argument("--writers", type=int, default=8)
+    args = parser.parse_args()
+
+    for profile in ENGINE_PROFILES:
+        result = await run_profile(profile, args.commits, args.writers)
+        print(
+            f"{result['profile']:>8}: {result['commits']} commits in {result['seconds']:.2f}s "
+            f"-> {result['commits_per_second']:.0f} commits/s, "
+            f"{result['concurrent_reads_per_second']:.0f} reads/s alongside"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
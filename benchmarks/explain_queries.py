@@ -0,0 +1,86 @@
+"""
+Check that the hot application queries are served by indexes.
+
+Builds a fresh database through init_db (tables plus migrations), runs
+EXPLAIN QUERY PLAN for each query and exits non-zero if any of them does
+not use the expected index or needs a temporary B-tree to sort/group.
+
+Usage:
+    python -m benchmarks.explain_queries
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+import benchmarks  # noqa: F401  (sets placeholder credentials)
+
+# Point the bot's engine at a scratch database before it is imported
+os.environ["DB_FILE"] = os.path.join(tempfile.mkdtemp(), "explain.db")
+
+from sqlalchemy import func, select  # noqa: E402
+from sqlalchemy.dialects import sqlite  # noqa: E402
+
+from db.database import engine, init_db  # noqa: E402
+from db.manager import pending_page_query  # noqa: E402
+from db.models import Application  # noqa: E402
+
+# Cursor of a page edge, as built by make_page_cursor
+CURSOR = "20240101000000000000_100"
+
+# (description, statement, index that must appear in the plan)
+QUERIES = [
+    # The statements get_pending_applications_page runs
+    (
+        "pending list",
+        pending_page_query(),
+        "ix_applications_status_created_at",
+    ),
+    (
+        "pending page, older",
+        pending_page_query(older_than=CURSOR),
+        "ix_applications_status_created_at",
+    ),
+    (
+        "pending page, newer",
+        pending_page_query(newer_than=CURSOR),
+        "ix_applications_status_created_at",
+    ),
+    (
+        "stats aggregate",
+        select(Application.status, func.count(Application.id))
+        .group_by(Application.status),
+        "ix_applications_status_created_at",
+    ),
+    (
+        "applications by user",
+        select(Application)
+        .where(Application.user_id == 1)
+        .order_by(Application.created_at.desc()),
+        "ix_applications_user_id_created_at",
+    ),
+]
+
+
+async def explain(statement) -> str:
+    """Return the EXPLAIN QUERY PLAN output for a statement."""
+    sql = str(statement.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+    async with engine.connect() as conn:
+        result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")
+        return "\n".join(row[-1] for row in result.all())
+
+
+async def main() -> int:
+    await init_db()
+    failures = 0
+    for description, statement, index in QUERIES:
+        plan = await explain(statement)
+        ok = index in plan and "TEMP B-TREE" not in plan
+        failures += not ok
+        print(f"[{'ok' if ok else 'FAIL'}] {description}: {plan}")
+    await engine.dispose()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,106 @@
+"""
+Time and memory of exporting applications with /export.
+
+Fills a scratch database with applications, then exports them in every
+file format, first at a tenth of the rows and then at all of them. Memory
+is the peak traced by tracemalloc during the export; it should not grow
+with the number of rows. Times are measured in a separate run without
+tracing.
+
+Usage:
+    python -m benchmarks.export_rows [--rows 1000000]
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import benchmarks  # noqa: F401  (sets placeholder credentials)
+
+# Point the bot's engines at a scratch database before they are imported
+os.environ["DB_FILE"] = os.path.join(tempfile.mkdtemp(), "export_rows.db")
+
+from sqlalchemy import insert  # noqa: E402
+
+from db.database import engine, init_db, read_engine  # noqa: E402
+from db.models import Application, ApplicationStatus  # noqa: E402
+from services.export import ExportOptions, export_applications  # noqa: E402
+
+INSERT_CHUNK = 10000
+
+FORMATS = {
+    "csv": ExportOptions("csv"),
+    "jsonl": ExportOptions("jsonl"),
+    "csv.gz": ExportOptions("csv", compress=True),
+    "jsonl.gz": ExportOptions("jsonl", compress=True),
+}
+
+
+async def fill(rows: int, seed: int = 1):
+    """Insert `rows` applications spread over the last year."""
+    rng = random.Random(seed)
+    statuses = list(ApplicationStatus)
+    start = datetime.utcnow() - timedelta(days=365)
+    async with engine.begin() as conn:
+        for first in range(0, rows, INSERT_CHUNK):
+            values = []
+            for i in range(first, min(first + INSERT_CHUNK, rows)):
+                created_at = start + timedelta(seconds=i * 365 * 86400 // rows)
+                values.append({
+                    "user_id": 100000 + rng.randrange(rows // 4 + 1),
+                    "name": f"Applicant {i}",
+                    "contact": f"applicant{i}@example.com",
+                    "purpose": "Benchmark application with a purpose long enough to look real, " * 2,
+                    "status": rng.choice(statuses),
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                })
+            await conn.execute(insert(Application), values)
+
+
+async def measure(name: str, options: ExportOptions):
+    """Export the applications twice, timed and traced, and print the results."""
+    started = time.perf_counter()
+    path, exported = await export_applications(options)
+    elapsed = time.perf_counter() - started
+    size = os.path.getsize(path)
+    os.remove(path)
+
+    tracemalloc.start()
+    path, _ = await export_applications(options)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    os.remove(path)
+
+    print(
+        f"{name:<9} {exported:>9} {elapsed:>8.2f} {exported / elapsed:>10.0f} "
+        f"{size / 1024 / 1024:>9.1f} {peak / 1024 / 1024:>8.2f}"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000)
+    args = parser.parse_args()
+
+    await init_db()
+    small = args.rows // 10
+    print(f"Inserting {args.rows} applications...")
+    await fill(small)
+    print(f"{'format':<9} {'rows':>9} {'seconds':>8} {'rows/s':>10} {'file MB':>9} {'peak MB':>8}")
+    for name, options in FORMATS.items():
+        await measure(name, options)
+
+    await fill(args.rows - small, seed=2)
+    for name, options in FORMATS.items():
+        await measure(name, options)
+    await engine.dispose()
+    await read_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
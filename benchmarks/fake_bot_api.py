@@ -0,0 +1,197 @@
+"""
+Local stand-in for the Telegram Bot API used by the benchmarks.
+
+Answers every method the bot calls with a minimal valid result, serves
+queued updates through getUpdates and records each call so a benchmark
+can wait until the bot has replied to everything it was sent. Calls can
+also be made to fail, to test how the bot handles flood control and
+network errors.
+"""
+import asyncio
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List
+
+from aiogram import Bot
+from aiohttp import web
+
+BOT_ID = 123456
+
+# Methods that return the sent or edited Message
+MESSAGE_METHODS = {"sendmessage", "editmessagetext", "senddocument"}
+
+# Failures that fail_next can script
+FLOOD_CONTROL = "flood_control"  # 429 Too Many Requests with retry_after
+NETWORK_ERROR = "network_error"  # connection closed without a response
+
+
+class FakeBotAPI:
+    """aiohttp server imitating api.telegram.org for a single bot."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self.calls: Counter = Counter()
+        self.requests: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.last_message: Dict[int, Dict[str, Any]] = {}  # chat_id -> last sent/edited message
+        self.last_call_at = 0.0
+        self._updates: List[Dict[str, Any]] = []
+        self._updates_ready = asyncio.Event()
+        self._calls_changed = asyncio.Event()
+        self._runner = None
+        self._message_ids = 0
+        self._failures: Dict[str, List[str]] = defaultdict(list)
+        self.retry_after = 1  # Seconds of flood control a FLOOD_CONTROL failure asks for
+
+    @property
+    def url(self) -> str:
+        """Base URL to pass to TelegramAPIServer.from_base."""
+        return f"http://{self.host}:{self.port}"
+
+    def create_bot(self) -> Bot:
+        """Create the bot the way main does, with its requests going to this server."""
+        # Imported here so the benchmarks can point the database elsewhere first
+        from main import create_bot
+        return create_bot(self.url)
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    def push_updates(self, updates: List[Dict[str, Any]]):
+        """Queue updates to be returned by getUpdates."""
+        self._updates.extend(updates)
+        self._updates_ready.set()
+
+    def fail_next(self, method: str, *failures: str):
+        """
+        Make the next calls of a method fail, one scripted failure per call.
+
+        Args:
+            method: Bot API method name, e.g. "sendMessage"
+            failures: FLOOD_CONTROL or NETWORK_ERROR, in call order
+        """
+        self._failures[method.lower()].extend(failures)
+
+    def reset(self):
+        """Forget recorded calls."""
+        self.calls.clear()
+        self.requests.clear()
+        self.last_message.clear()
+
+    async def wait_for(self, method: str, count: int, timeout: float = 60.0):
+        """
+        Wait until `method` has been called at least `count` times.
+
+        Args:
+            method: Bot API method name, e.g. "sendMessage"
+            count: Number of calls to wait for
+            timeout: Seconds before giving up
+        """
+        method = method.lower()
+        deadline = time.monotonic() + timeout
+        while self.calls[method] < count:
+            self._calls_changed.clear()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"{method}: {self.calls[method]} of {count} calls after {timeout}s")
+            try:
+                await asyncio.wait_for(self._calls_changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"].lower()
+        params = dict(await request.post())
+        if method == "getupdates":
+            return self._ok(await self._get_updates(params))
+
+        self.calls[method] += 1
+        self.requests[method].append(params)
+        self.last_call_at = time.perf_counter()
+        self._calls_changed.set()
+
+        if self._failures[method]:
+            failure = self._failures[method].pop(0)
+            if failure == FLOOD_CONTROL:
+                return web.json_response({
+                    "ok": False,
+                    "error_code": 429,
+                    "description": f"Too Many Requests: retry after {self.retry_after}",
+                    "parameters": {"retry_after": self.retry_after},
+                }, status=429)
+            # The client sees the connection drop before any response
+            request.transport.close()
+            return web.Response()
+
+        if method == "getme":
+            return self._ok({"id": BOT_ID, "is_bot": True, "first_name": "Benchmark", "username": "benchmark_bot"})
+        if method in MESSAGE_METHODS:
+            self.last_message[int(params.get("chat_id", 0))] = params
+            self._message_ids += 1
+            return self._ok({
+                "message_id": self._message_ids,
+                "date": int(time.time()),
+                "chat": {"id": int(params.get("chat_id", 0)), "type": "private"},
+                "text": params.get("text", ""),
+            })
+        return self._ok(True)
+
+    async def _get_updates(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        offset = int(params.get("offset", 0))
+        limit = int(params.get("limit", 100))
+        self._updates = [update for update in self._updates if update["update_id"] >= offset]
+        if not self._updates:
+            self._updates_ready.clear()
+            try:
+                await asyncio.wait_for(self._updates_ready.wait(), min(float(params.get("timeout", 0)), 1.0))
+            except asyncio.TimeoutError:
+                pass
+        return self._updates[:limit]
+
+    @staticmethod
+    def _ok(result: Any) -> web.Response:
+        return web.json_response({"ok": True, "result": result})
+
+
+def make_message_update(update_id: int, user_id: int, text: str) -> Dict[str, Any]:
+    """Build a raw private-chat text message update."""
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": "User", "language_code": "en"},
+            "text": text,
+        },
+    }
+
+
+def make_callback_update(update_id: int, user_id: int, data: str, message_id: int = 1) -> Dict[str, Any]:
+    """Build a raw callback query update for a button under a bot message."""
+    return {
+        "update_id": update_id,
+        "callback_query": {
+            "id": str(update_id),
+            "chat_instance": str(user_id),
+            "from": {"id": user_id, "is_bot": False, "first_name": "User", "language_code": "en"},
+            "message": {
+                "message_id": message_id,
+                "date": int(time.time()),
+                "chat": {"id": user_id, "type": "private"},
+                "from": {"id": BOT_ID, "is_bot": True, "first_name": "Benchmark"},
+                "text": "Menu",
+            },
+            "data": data,
+        },
+    }
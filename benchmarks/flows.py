@@ -0,0 +1,107 @@
+"""
+Scripted user and admin flows for the end-to-end benchmarks.
+
+Each flow feeds raw updates into the dispatcher one at a time, like a
+real client waiting for the bot's answer, and records how long each
+update took to handle, Bot API calls included.
+"""
+import itertools
+import json
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from aiogram import Bot, Dispatcher
+
+from benchmarks.fake_bot_api import FakeBotAPI, make_callback_update, make_message_update
+
+
+class UpdateFactory:
+    """Builds raw updates with increasing update IDs."""
+
+    def __init__(self):
+        self._ids = itertools.count(1)
+
+    def message(self, user_id: int, text: str) -> Dict[str, Any]:
+        return make_message_update(next(self._ids), user_id, text)
+
+    def callback(self, user_id: int, data: str) -> Dict[str, Any]:
+        return make_callback_update(next(self._ids), user_id, data)
+
+
+class FlowRunner:
+    """Feeds updates into a dispatcher and records per-update latency."""
+
+    def __init__(self, dp: Dispatcher, bot: Bot, api: FakeBotAPI):
+        self.dp = dp
+        self.bot = bot
+        self.api = api
+        self.updates = UpdateFactory()
+        # scenario -> [(step, milliseconds)]
+        self.samples: Dict[str, List[Tuple[str, float]]] = defaultdict(list)
+
+    async def send(self, scenario: str, step: str, update: Dict[str, Any]):
+        """Handle one update and record its latency under scenario/step."""
+        started = time.perf_counter()
+        await self.dp.feed_raw_update(self.bot, update)
+        self.samples[scenario].append((step, (time.perf_counter() - started) * 1000))
+
+    def buttons(self, chat_id: int) -> List[str]:
+        """Callback data of the inline keyboard last sent to a chat."""
+        message = self.api.last_message.get(chat_id) or {}
+        markup = json.loads(message.get("reply_markup") or "{}")
+        return [
+            button.get("callback_data", "")
+            for row in markup.get("inline_keyboard", [])
+            for button in row
+        ]
+
+
+def letters(number: int) -> str:
+    """Spell a number with letters; names may not contain digits."""
+    return "".join(chr(ord("a") + int(digit)) for digit in str(number)).capitalize()
+
+
+async def start_flow(runner: FlowRunner, user_id: int):
+    """A new user opens the bot."""
+    await runner.send("start", "/start", runner.updates.message(user_id, "/start"))
+
+
+async def apply_flow(runner: FlowRunner, user_id: int):
+    """A user goes through the whole /apply form."""
+    steps = [
+        ("/apply", "/apply"),
+        ("name", f"Applicant {letters(user_id)}"),
+        ("contact", f"user{user_id}@example.com"),
+        ("purpose", "I would like to join the programme as a benchmark user"),
+    ]
+    for step, text in steps:
+        await runner.send("apply", step, runner.updates.message(user_id, text))
+
+
+async def admin_flow(runner: FlowRunner, admin_id: int, round_index: int) -> Optional[str]:
+    """
+    An admin opens the pending list, reviews one application and checks the stats.
+
+    Applications are picked from the keyboard the bot actually sent, so
+    concurrent admins may pick the same one and get "already processed".
+
+    Returns:
+        The decision callback that was sent, or None if nothing was pending
+    """
+    send = runner.send
+    updates = runner.updates
+    await send("admin", "/admin", updates.message(admin_id, "/admin"))
+    await send("admin", "pending list", updates.callback(admin_id, "admin_new_apps"))
+
+    views = [data for data in runner.buttons(admin_id) if data.startswith("view_app_")]
+    decision = None
+    if views:
+        view = views[round_index % len(views)]
+        await send("admin", "view", updates.callback(admin_id, view))
+        action = "approve" if round_index % 2 == 0 else "reject"
+        decision = f"admin_{action}_{view.rsplit('_', 1)[1]}"
+        await send("admin", action, updates.callback(admin_id, decision))
+
+    await send("admin", "stats", updates.callback(admin_id, "admin_stats"))
+    return decision
@@ -0,0 +1,113 @@
+"""
+Memory held by FSM storage when users abandon the application form.
+
+Simulates users who start /apply and walk away after one of the three
+steps, then reports the memory traced by tracemalloc for MemoryStorage
+and SQLiteStorage, the number of database writes SQLiteStorage issued
+for all state and data changes, and the memory left after abandoned
+drafts expire.
+
+Usage:
+    python -m benchmarks.fsm_memory [--users 100000] [--cache-size 10000]
+"""
+import argparse
+import asyncio
+import gc
+import os
+import random
+import tempfile
+import tracemalloc
+
+import benchmarks  # noqa: F401  (sets placeholder credentials)
+
+# Point the bot's engine at a scratch database before it is imported
+os.environ["DB_FILE"] = os.path.join(tempfile.mkdtemp(), "fsm_memory.db")
+
+from aiogram.fsm.storage.base import BaseStorage, StorageKey  # noqa: E402
+from aiogram.fsm.storage.memory import MemoryStorage  # noqa: E402
+
+from db.database import engine, init_db  # noqa: E402
+from db.fsm_storage import SQLiteStorage  # noqa: E402
+from states.application_states import ApplicationSteps  # noqa: E402
+
+BOT_ID = 123456
+
+
+async def abandon_forms(storage: BaseStorage, users: int, seed: int = 1) -> int:
+    """
+    Walk `users` users through the form, each stopping after a random step.
+
+    Returns:
+        Number of set_state/update_data calls made
+    """
+    rng = random.Random(seed)
+    calls = 0
+    for user_id in range(1, users + 1):
+        key = StorageKey(bot_id=BOT_ID, chat_id=user_id, user_id=user_id)
+        steps = rng.randint(1, 3)
+
+        # /apply
+        await storage.set_state(key, ApplicationSteps.name)
+        calls += 1
+        if steps == 1:
+            continue
+        # Name entered
+        await storage.update_data(key, {"name": f"Applicant {user_id}"})
+        await storage.set_state(key, ApplicationSteps.contact)
+        calls += 2
+        if steps == 2:
+            continue
+        # Contact entered, purpose never arrives
+        await storage.update_data(key, {"contact": f"user{user_id}@example.com"})
+        await storage.set_state(key, ApplicationSteps.purpose)
+        calls += 2
+    return calls
+
+
+def traced_mb() -> float:
+    """Currently traced memory in megabytes."""
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0] / 1024 / 1024
+
+
+async def measure(name: str, storage: BaseStorage, users: int) -> float:
+    """Fill a storage with abandoned forms and print the memory it holds."""
+    before = traced_mb()
+    calls = await abandon_forms(storage, users)
+    if isinstance(storage, SQLiteStorage):
+        await storage.flush()
+    print(f"{name:<14} {traced_mb() - before:8.1f} MB   {calls} FSM writes")
+    return before
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--cache-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    await init_db()
+    tracemalloc.start()
+
+    memory_storage = MemoryStorage()
+    await measure("MemoryStorage", memory_storage, args.users)
+    del memory_storage
+
+    ttl = 2.0
+    sqlite_storage = SQLiteStorage(cache_size=args.cache_size, ttl=ttl)
+    before = await measure("SQLiteStorage", sqlite_storage, args.users)
+    print(
+        f"{'':<14} {sqlite_storage.rows_written} rows written in "
+        f"{sqlite_storage.flushes} transactions"
+    )
+
+    await asyncio.sleep(ttl)
+    purged = await sqlite_storage.purge_expired()
+    print(f"after TTL      {traced_mb() - before:8.1f} MB   {purged} abandoned drafts purged")
+
+    tracemalloc.stop()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,114 @@
+"""
+Page-turn latency of the pending applications list: keyset vs OFFSET.
+
+Fills a scratch database with pending applications and walks the list
+page by page with get_pending_applications_page, timing the first and
+the deepest pages next to the equivalent LIMIT/OFFSET query.
+
+Usage:
+    python -m benchmarks.pagination [--rows 100000] [--repeat 50]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import benchmarks  # noqa: F401  (sets placeholder credentials)
+
+# Point the bot's engine at a scratch database before it is imported
+os.environ["DB_FILE"] = os.path.join(tempfile.mkdtemp(), "pagination.db")
+
+from sqlalchemy import insert, select  # noqa: E402
+
+from db.database import engine, init_db, read_session  # noqa: E402
+from db.manager import (  # noqa: E402
+    APPLICATIONS_PAGE_SIZE,
+    get_pending_applications_page,
+    make_page_cursor,
+)
+from db.models import Application, ApplicationStatus, User  # noqa: E402
+
+
+async def fill(rows: int):
+    """Insert `rows` pending applications from a single user."""
+    started = datetime(2024, 1, 1)
+    async with engine.begin() as conn:
+        await conn.execute(insert(User), [{"user_id": 1, "language": "en", "created_at": started}])
+        batch = []
+        for i in range(rows):
+            created_at = started + timedelta(seconds=i)
+            batch.append({
+                "user_id": 1,
+                "name": f"Applicant {i}",
+                "contact": f"user{i}@example.com",
+                "purpose": "Benchmark application purpose",
+                "status": ApplicationStatus.PENDING,
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+            if len(batch) == 10000:
+                await conn.execute(insert(Application), batch)
+                batch = []
+        if batch:
+            await conn.execute(insert(Application), batch)
+
+
+async def time_keyset(older_than, repeat: int) -> float:
+    """Average milliseconds to load the page after `older_than`."""
+    async with read_session() as session:
+        started = time.perf_counter()
+        for _ in range(repeat):
+            await get_pending_applications_page(session, older_than=older_than)
+        return (time.perf_counter() - started) / repeat * 1000
+
+
+async def time_offset(offset: int, repeat: int) -> float:
+    """Average milliseconds to load the page at `offset` with LIMIT/OFFSET."""
+    query = (
+        select(Application)
+        .where(Application.status == ApplicationStatus.PENDING)
+        .order_by(Application.created_at.desc(), Application.id.desc())
+        .limit(APPLICATIONS_PAGE_SIZE)
+        .offset(offset)
+    )
+    async with read_session() as session:
+        started = time.perf_counter()
+        for _ in range(repeat):
+            (await session.execute(query)).scalars().all()
+        return (time.perf_counter() - started) / repeat * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    await init_db()
+    await fill(args.rows)
+
+    # Walk the whole list once to collect the cursor of every page
+    cursors = [None]
+    async with read_session() as session:
+        while True:
+            applications, _, has_older = await get_pending_applications_page(
+                session, older_than=cursors[-1]
+            )
+            if not has_older:
+                break
+            cursors.append(make_page_cursor(applications[-1]))
+
+    pages = len(cursors)
+    print(f"{args.rows} pending applications, {pages} pages of {APPLICATIONS_PAGE_SIZE}")
+    for page in (1, pages // 2, pages):
+        keyset_ms = await time_keyset(cursors[page - 1], args.repeat)
+        offset_ms = await time_offset((page - 1) * APPLICATIONS_PAGE_SIZE, args.repeat)
+        print(f"page {page:>6}: keyset {keyset_ms:7.3f} ms   offset {offset_ms:7.3f} ms")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,129 @@
+"""
+SQL statement budgets of the bot's handlers.
+
+Feeds the user and admin flows through the real dispatcher, one update at
+a time, and fails if any step runs more SQL statements than its budget.
+A failing step prints the statements it ran, which makes N+1 queries and
+accidental extra round trips easy to spot. Run it after touching a
+handler or a service and lower the budget when a step gets cheaper.
+
+Usage:
+    python -m benchmarks.query_budget [--measure]
+
+    --measure   print the statement count of every step without checking
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+
+import benchmarks  # noqa: F401  (sets placeholder credentials)
+
+# Point the bot's engine at a scratch database before it is imported and
+# lift the per-user rate limits, which would otherwise drop scripted updates
+os.environ["DB_FILE"] = os.path.join(tempfile.mkdtemp(), "query_budget.db")
+os.environ["LOG_LEVEL"] = "WARNING"
+for name in ("THROTTLE_MESSAGE_RATE", "THROTTLE_MESSAGE_BURST",
+             "THROTTLE_CALLBACK_RATE", "THROTTLE_CALLBACK_BURST"):
+    os.environ[name] = "1000000"
+
+import main  # noqa: E402
+from benchmarks.fake_bot_api import FakeBotAPI  # noqa: E402
+from benchmarks.flows import FlowRunner, letters  # noqa: E402
+from config import ADMIN_ID  # noqa: E402
+from db.cache import load_caches  # noqa: E402
+from db.database import engine, init_db  # noqa: E402
+from services.profiling import assert_max_queries  # noqa: E402
+
+USER_ID = 100001
+
+# Step -> maximum number of SQL statements for one update
+BUDGETS = {
+    "user /start (new user)": 4,
+    "user /start (returning)": 1,
+    "user /apply": 1,
+    "user name": 1,
+    "user contact": 1,
+    "user purpose": 6,
+    "admin /admin": 4,
+    "admin pending list": 2,
+    "admin view": 2,
+    "admin approve": 4,
+    "admin stats": 1,
+}
+
+
+async def run_steps(runner: FlowRunner, measure: bool) -> bool:
+    """
+    Feed every budgeted step and report its statement count.
+
+    Returns:
+        True if all steps stayed within budget
+    """
+    updates = runner.updates
+    steps = [
+        ("user /start (new user)", lambda: updates.message(USER_ID, "/start")),
+        ("user /start (returning)", lambda: updates.message(USER_ID, "/start")),
+        ("user /apply", lambda: updates.message(USER_ID, "/apply")),
+        ("user name", lambda: updates.message(USER_ID, f"Applicant {letters(USER_ID)}")),
+        ("user contact", lambda: updates.message(USER_ID, f"user{USER_ID}@example.com")),
+        ("user purpose", lambda: updates.message(USER_ID, "I would like to join the programme as a benchmark user")),
+        ("admin /admin", lambda: updates.message(ADMIN_ID, "/admin")),
+        ("admin pending list", lambda: updates.callback(ADMIN_ID, "admin_new_apps")),
+        ("admin view", lambda: updates.callback(ADMIN_ID, f"view_app_{pending_id()}")),
+        ("admin approve", lambda: updates.callback(ADMIN_ID, f"admin_approve_{pending_id()}")),
+        ("admin stats", lambda: updates.callback(ADMIN_ID, "admin_stats")),
+    ]
+
+    picked = []
+
+    def pending_id() -> str:
+        """ID of the first application in the pending list the bot sent."""
+        if not picked:
+            views = [data for data in runner.buttons(ADMIN_ID) if data.startswith("view_app_")]
+            if not views:
+                raise RuntimeError("No pending application in the admin keyboard")
+            picked.append(views[0].rsplit("_", 1)[1])
+        return picked[0]
+
+    ok = True
+    for step, build in steps:
+        budget = BUDGETS[step]
+        update = build()
+        try:
+            with assert_max_queries(10**6 if measure else budget) as profile:
+                await runner.send("budget", step, update)
+        except AssertionError as e:
+            ok = False
+            print(f"FAIL {step}: {e}")
+            continue
+        print(f"{'    ' if measure else 'ok  '}{step:<26} {profile.sql_count:>3} / {budget}")
+    return ok
+
+
+async def main_budget() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--measure", action="store_true", help="only print statement counts")
+    args = parser.parse_args()
+
+    await init_db()
+    await load_caches()
+
+    api = FakeBotAPI()
+    await api.start()
+    bot = api.create_bot()
+    dp = main.build_dispatcher()
+    runner = FlowRunner(dp, bot, api)
+    try:
+        ok = await run_steps(runner, args.measure)
+    finally:
+        await dp.emit_shutdown(bot=bot)
+        await bot.session.close()
+        await api.stop()
+        await engine.dispose()
+    return 0 if ok or args.measure else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main_budget()))
@@ -0,0 +1,178 @@
+"""
+Latency of /search over the FTS5 index of applications.
+
+Fills a scratch database with applications whose names, contacts and
+purposes come from generated vocabularies (purpose words follow a Zipf
+distribution, so some are in most applications and some in a handful),
+then reports:
+
+    insert    time to insert the rows with the FTS triggers in place
+    backfill  time of the migration's rebuild of the whole index
+    queries   p50/p95/p99 latency of db.manager.search_applications for
+              several kinds of search text, and of a LIKE '%x%' scan
+              over the same columns for comparison
+
+Usage:
+    python -m benchmarks.search_latency [--rows 1000000] [--queries 50]
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, List
+
+import benchmarks  # noqa: F401  (sets placeholder credentials)
+
+# Point the bot's engines at a scratch database before they are imported
+os.environ["DB_FILE"] = os.path.join(tempfile.mkdtemp(), "search_latency.db")
+
+from sqlalchemy import insert, or_, select, text  # noqa: E402
+
+from benchmarks.write_contention import percentile  # noqa: E402
+from db.database import engine, init_db, read_engine, read_session  # noqa: E402
+from db.manager import search_applications  # noqa: E402
+from db.models import Application, ApplicationStatus  # noqa: E402
+
+INSERT_CHUNK = 10000
+SYLLABLES = ["ka", "ri", "mo", "len", "sa", "tor", "vi", "na", "bel", "du", "ran", "shi", "po", "el", "mar", "ko"]
+
+
+def make_word(rng: random.Random, syllables: int) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(syllables))
+
+
+class Vocabulary:
+    """Generated first names, last names and purpose words."""
+
+    def __init__(self, seed: int = 1):
+        rng = random.Random(seed)
+        self.first_names = sorted({make_word(rng, 2).capitalize() for _ in range(400)})
+        self.last_names = sorted({make_word(rng, 3).capitalize() for _ in range(3000)})
+        self.words = sorted({make_word(rng, rng.randint(2, 4)) for _ in range(5000)})
+        # Zipf weights: the n-th word is n times rarer than the first
+        self.word_weights = [1 / rank for rank in range(1, len(self.words) + 1)]
+
+
+async def fill(rows: int, vocabulary: Vocabulary, seed: int = 1):
+    """Insert `rows` applications."""
+    rng = random.Random(seed)
+    statuses = list(ApplicationStatus)
+    start = datetime.utcnow() - timedelta(days=365)
+    async with engine.begin() as conn:
+        for first in range(0, rows, INSERT_CHUNK):
+            values = []
+            for i in range(first, min(first + INSERT_CHUNK, rows)):
+                first_name = rng.choice(vocabulary.first_names)
+                last_name = rng.choice(vocabulary.last_names)
+                words = rng.choices(vocabulary.words, vocabulary.word_weights, k=rng.randint(6, 16))
+                created_at = start + timedelta(seconds=i * 365 * 86400 // rows)
+                values.append({
+                    "user_id": 100000 + i,
+                    "name": f"{first_name} {last_name}",
+                    "contact": f"{first_name.lower()}.{last_name.lower()}{i}@example.com",
+                    "purpose": " ".join(words).capitalize(),
+                    "status": rng.choice(statuses),
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                })
+            await conn.execute(insert(Application), values)
+
+
+async def sample_applications(count: int, rows: int, seed: int = 2) -> List[Application]:
+    """Random existing applications to build search texts from."""
+    rng = random.Random(seed)
+    ids = [rng.randint(1, rows) for _ in range(count)]
+    async with read_session() as session:
+        result = await session.execute(select(Application).where(Application.id.in_(ids)))
+        return list(result.scalars().all())
+
+
+async def timed(run: Callable[[str], Awaitable[int]], texts: List[str]) -> List[float]:
+    """Run a search for every text and return the latencies in milliseconds."""
+    latencies = []
+    for search_text in texts:
+        started = time.perf_counter()
+        await run(search_text)
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    return latencies
+
+
+def report(name: str, latencies: List[float]):
+    print(
+        f"{name:<28} {len(latencies):>5} {percentile(latencies, 0.50):>9.2f} "
+        f"{percentile(latencies, 0.95):>9.2f} {percentile(latencies, 0.99):>9.2f}"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=50, help="searches per kind")
+    args = parser.parse_args()
+
+    await init_db()
+    vocabulary = Vocabulary()
+
+    started = time.perf_counter()
+    await fill(args.rows, vocabulary)
+    print(f"insert    {args.rows} applications with FTS triggers: {time.perf_counter() - started:.1f} s")
+
+    started = time.perf_counter()
+    async with engine.begin() as conn:
+        await conn.execute(text("INSERT INTO applications_fts (applications_fts) VALUES ('rebuild')"))
+    print(f"backfill  rebuild of the whole index: {time.perf_counter() - started:.1f} s")
+
+    rng = random.Random(3)
+    samples = await sample_applications(args.queries, args.rows)
+    common = vocabulary.words[:args.queries]
+    rare = vocabulary.words[-args.queries:]
+    kinds = {
+        "full name": [app.name for app in samples],
+        "first name prefix (3)": [app.name[:3] for app in samples],
+        "name prefixes (jo smi)": [" ".join(part[:3] for part in app.name.split()) for app in samples],
+        "email": [app.contact for app in samples],
+        "rare purpose word": rare,
+        "common purpose word": common,
+        "common word, page 10": common,
+        "two purpose words": [f"{rng.choice(common)} {rng.choice(rare)}" for _ in range(args.queries)],
+    }
+
+    async def search(search_text: str, page: int = 0) -> int:
+        async with read_session() as session:
+            applications, _, _ = await search_applications(session, search_text, page)
+            return len(applications)
+
+    async def like_scan(search_text: str) -> int:
+        pattern = f"%{search_text}%"
+        async with read_session() as session:
+            result = await session.execute(
+                select(Application)
+                .where(or_(
+                    Application.name.like(pattern),
+                    Application.contact.like(pattern),
+                    Application.purpose.like(pattern)
+                ))
+                .order_by(Application.id.desc())
+                .limit(10)
+            )
+            return len(result.scalars().all())
+
+    print(f"{'query':<28} {'runs':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, texts in kinds.items():
+        if name == "common word, page 10":
+            report(name, await timed(lambda search_text: search(search_text, page=9), texts))
+        else:
+            report(name, await timed(search, texts))
+    # A full scan per query, so only a few runs
+    report("LIKE scan, full name", await timed(like_scan, [app.name for app in samples[:5]]))
+
+    await engine.dispose()
+    await read_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,107 @@
+"""
+Update throughput of the multi-process mode with 1, 2, 4 and 8 workers.
+
+Starts a Supervisor for each worker count and feeds it updates through
+getUpdates from a local fake Bot API, the same way the bot runs with
+WORKERS > 1 in polling mode. Every user sends /start and then /language,
+and a run ends when the workers have sent a reply to every update. The
+speed-up is bounded by the number of CPU cores.
+
+Usage:
+    python -m benchmarks.sharding_throughput [--users 2000] [--workers 1 2 4 8]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime
+
+import benchmarks  # noqa: F401  (sets placeholder credentials)
+
+# Point the bot's engine at a scratch database before it is imported.
+# Worker processes re-import this module as __mp_main__ and keep the inherited path.
+if __name__ != "__mp_main__":
+    os.environ["DB_FILE"] = os.path.join(tempfile.mkdtemp(), "sharding.db")
+os.environ["LOG_LEVEL"] = "WARNING"
+
+from sqlalchemy import insert  # noqa: E402
+
+from benchmarks.fake_bot_api import FakeBotAPI, make_message_update  # noqa: E402
+from db.database import engine, init_db  # noqa: E402
+from db.models import User  # noqa: E402
+from services.sharding import Supervisor  # noqa: E402
+
+ALLOWED_UPDATES = ["message", "callback_query"]
+
+
+def make_updates(users: int):
+    """/start then /language from every user, interleaved across users."""
+    updates = []
+    for text in ("/start", "/language"):
+        for user_id in range(1, users + 1):
+            updates.append(make_message_update(len(updates) + 1, user_id, text))
+    return updates
+
+
+async def run(api: FakeBotAPI, workers: int, updates) -> float:
+    """Return seconds from the first getUpdates until the last reply."""
+    supervisor = Supervisor(workers)
+    supervisor.start()
+    await supervisor.wait_ready()
+
+    bot = api.create_bot()
+    dp = supervisor.create_dispatcher()
+    api.reset()
+    api.push_updates(updates)
+
+    started = time.perf_counter()
+    polling = asyncio.create_task(dp.start_polling(
+        bot,
+        polling_timeout=1,
+        handle_as_tasks=False,
+        handle_signals=False,
+        allowed_updates=ALLOWED_UPDATES,
+    ))
+    await api.wait_for("sendMessage", len(updates), timeout=300)
+    elapsed = api.last_call_at - started
+
+    await dp.stop_polling()
+    await polling
+    await supervisor.stop()
+    return elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    await init_db()
+    async with engine.begin() as conn:
+        now = datetime.utcnow()
+        await conn.execute(insert(User), [
+            {"user_id": user_id, "language": "en", "created_at": now}
+            for user_id in range(1, args.users + 1)
+        ])
+
+    api = FakeBotAPI()
+    await api.start()
+    os.environ["BOT_API_URL"] = api.url
+
+    updates = make_updates(args.users)
+    print(f"{len(updates)} updates from {args.users} users, {os.cpu_count()} CPU cores")
+    baseline = None
+    for workers in args.workers:
+        seconds = await run(api, workers, updates)
+        rate = len(updates) / seconds
+        baseline = baseline or rate
+        print(f"{workers} worker(s): {rate:8.0f} updates/s   x{rate / baseline:.2f}")
+
+    await api.stop()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,238 @@
+"""
+End-to-end throughput and latency of the bot's dispatcher.
+
+Builds the dispatcher with main.build_dispatcher, points the bot at the
+local fake Bot API and runs the scripted flows from benchmarks.flows in
+phases:
+
+    start   new users send /start
+    apply   users fill in the whole /apply form
+    admin   admins open the pending list, approve or reject one
+            application and open the stats, round after round
+
+Each phase reports throughput and p50/p95/p99 latency per update. Results
+can be saved as JSON and compared with an earlier run; the comparison
+exits non-zero when throughput or p95 latency of a phase is worse by more
+than the threshold.
+
+Usage:
+    python -m benchmarks.suite [--users 500] [--admins 5] [--rounds 20]
+        [--concurrency 50] [--output results.json]
+        [--compare baseline.json] [--threshold 0.1]
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+import benchmarks  # noqa: F401  (sets placeholder credentials)
+
+# Point the bot's engine at a scratch database before it is imported and
+# lift the per-user rate limits, which would otherwise drop scripted updates
+os.environ["DB_FILE"] = os.path.join(tempfile.mkdtemp(), "suite.db")
+os.environ["LOG_LEVEL"] = "WARNING"
+for name in ("THROTTLE_MESSAGE_RATE", "THROTTLE_MESSAGE_BURST",
+             "THROTTLE_CALLBACK_RATE", "THROTTLE_CALLBACK_BURST"):
+    os.environ[name] = "1000000"
+
+from sqlalchemy import insert  # noqa: E402
+
+import main  # noqa: E402
+from benchmarks.fake_bot_api import FakeBotAPI  # noqa: E402
+from benchmarks.flows import FlowRunner, admin_flow, apply_flow, start_flow  # noqa: E402
+from config import ADMIN_ID  # noqa: E402
+from db.cache import load_caches  # noqa: E402
+from db.database import engine, init_db  # noqa: E402
+from db.models import Admin  # noqa: E402
+from services.outbox import outbox_worker  # noqa: E402
+
+# Applicant IDs start here so they never collide with admin IDs
+FIRST_USER_ID = 100000
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, round(fraction * (len(values) - 1)))]
+
+
+def summarize(samples, seconds: float) -> Dict[str, Any]:
+    """Throughput and latency percentiles of one phase, overall and per step."""
+    latencies = sorted(ms for _, ms in samples)
+    by_step = defaultdict(list)
+    for step, ms in samples:
+        by_step[step].append(ms)
+
+    def describe(values: List[float]) -> Dict[str, float]:
+        values = sorted(values)
+        return {
+            "p50_ms": round(percentile(values, 0.50), 3),
+            "p95_ms": round(percentile(values, 0.95), 3),
+            "p99_ms": round(percentile(values, 0.99), 3),
+        }
+
+    return {
+        "updates": len(latencies),
+        "seconds": round(seconds, 3),
+        "updates_per_second": round(len(latencies) / seconds, 1) if seconds else 0.0,
+        **describe(latencies),
+        "steps": {step: {"updates": len(values), **describe(values)} for step, values in by_step.items()},
+    }
+
+
+async def run_phase(runner: FlowRunner, name: str, flows: List[Callable], concurrency: int) -> Dict[str, Any]:
+    """Run flow callables with at most `concurrency` in flight and summarize the phase."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(flow):
+        async with semaphore:
+            await flow()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(run(flow) for flow in flows))
+    return summarize(runner.samples[name], time.perf_counter() - started)
+
+
+def git_commit() -> str:
+    """Short hash of the checked-out commit, or "unknown"."""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        )
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_results(results: Dict[str, Any]):
+    print(f"commit {results['commit']}, {results['params']}")
+    print(f"{'phase':<8} {'updates':>8} {'upd/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, phase in results["phases"].items():
+        print(
+            f"{name:<8} {phase['updates']:>8} {phase['updates_per_second']:>9.1f} "
+            f"{phase['p50_ms']:>9.2f} {phase['p95_ms']:>9.2f} {phase['p99_ms']:>9.2f}"
+        )
+    print(f"Bot API calls: {results['bot_api_calls']}")
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> bool:
+    """
+    Print the change of every phase against a baseline run.
+
+    Returns:
+        True if any phase regressed by more than `threshold`
+    """
+    print(f"\nagainst {baseline.get('commit', 'baseline')} (threshold {threshold:.0%})")
+    regressed = False
+    for name, phase in results["phases"].items():
+        base = baseline.get("phases", {}).get(name)
+        if not base:
+            print(f"{name:<8} no baseline")
+            continue
+        throughput = phase["updates_per_second"] / base["updates_per_second"] - 1
+        p95 = phase["p95_ms"] / base["p95_ms"] - 1 if base["p95_ms"] else 0.0
+        worse = throughput < -threshold or p95 > threshold
+        regressed |= worse
+        print(
+            f"{name:<8} throughput {throughput:+7.1%}   p95 {p95:+7.1%}"
+            f"{'   REGRESSION' if worse else ''}"
+        )
+    return regressed
+
+
+async def main_benchmark() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--admins", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="JSON results of an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args()
+
+    await init_db()
+    admin_ids = [ADMIN_ID] + [ADMIN_ID + i for i in range(1, args.admins)]
+    if len(admin_ids) > 1:
+        async with engine.begin() as conn:
+            await conn.execute(insert(Admin), [
+                {"user_id": admin_id, "added_by": ADMIN_ID} for admin_id in admin_ids[1:]
+            ])
+    await load_caches()
+
+    api = FakeBotAPI()
+    await api.start()
+    bot = api.create_bot()
+    dp = main.build_dispatcher()
+    runner = FlowRunner(dp, bot, api)
+    outbox = asyncio.create_task(outbox_worker.run(bot))
+
+    users = range(FIRST_USER_ID, FIRST_USER_ID + args.users)
+    phases = {
+        "start": await run_phase(
+            runner, "start",
+            [lambda user_id=user_id: start_flow(runner, user_id) for user_id in users],
+            args.concurrency,
+        ),
+        "apply": await run_phase(
+            runner, "apply",
+            [lambda user_id=user_id: apply_flow(runner, user_id) for user_id in users],
+            args.concurrency,
+        ),
+    }
+
+    async def review(admin_id: int):
+        for round_index in range(args.rounds):
+            await admin_flow(runner, admin_id, round_index)
+
+    phases["admin"] = await run_phase(
+        runner, "admin",
+        [lambda admin_id=admin_id: review(admin_id) for admin_id in admin_ids],
+        args.concurrency,
+    )
+
+    outbox.cancel()
+    await dp.emit_shutdown(bot=bot)
+    await bot.session.close()
+    await api.stop()
+    await engine.dispose()
+
+    results = {
+        "commit": git_commit(),
+        "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "params": {
+            "users": args.users,
+            "admins": args.admins,
+            "rounds": args.rounds,
+            "concurrency": args.concurrency,
+        },
+        "phases": phases,
+        "bot_api_calls": dict(api.calls),
+    }
+    print_results(results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main_benchmark()))
@@ -0,0 +1,136 @@
+"""
+Update throughput of webhook mode compared with long polling.
+
+Runs the real dispatcher (main.build_dispatcher) against a local fake
+Bot API. In polling mode the updates are served through getUpdates; in
+webhook mode they are POSTed to the webhook app with the secret token.
+Each update is a /start from a new user, and a run ends when the bot has
+sent a reply for every update.
+
+Usage:
+    python -m benchmarks.webhook_throughput [--updates 2000] [--concurrency 50]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+import benchmarks  # noqa: F401  (sets placeholder credentials)
+
+# Point the bot's engine at a scratch database and enable the secret check
+os.environ["DB_FILE"] = os.path.join(tempfile.mkdtemp(), "webhook.db")
+os.environ["WEBHOOK_SECRET"] = "benchmark-secret"
+
+from aiohttp import ClientSession, web  # noqa: E402
+
+import main  # noqa: E402
+from benchmarks.fake_bot_api import FakeBotAPI, make_message_update  # noqa: E402
+from config import WEBHOOK_PATH, WEBHOOK_SECRET  # noqa: E402
+from db.cache import load_caches  # noqa: E402
+from db.database import engine, init_db  # noqa: E402
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+def make_updates(count: int, first_user_id: int):
+    """One /start per new user, so every update reaches the database."""
+    return [
+        make_message_update(first_user_id + i, first_user_id + i, "/start")
+        for i in range(count)
+    ]
+
+
+async def run_polling(api: FakeBotAPI, dp, updates) -> float:
+    """Serve updates through getUpdates; return seconds until every reply was sent."""
+    bot = api.create_bot()
+    api.reset()
+    api.push_updates(updates)
+
+    started = time.perf_counter()
+    polling = asyncio.create_task(
+        dp.start_polling(bot, polling_timeout=1, handle_signals=False)
+    )
+    await api.wait_for("sendMessage", len(updates))
+    elapsed = api.last_call_at - started
+
+    await dp.stop_polling()
+    await polling
+    return elapsed
+
+
+async def run_webhook(api: FakeBotAPI, dp, updates, concurrency: int):
+    """
+    POST updates to the webhook app.
+
+    Returns:
+        Tuple of (seconds until every reply was sent, response latencies in ms)
+    """
+    bot = api.create_bot()
+    runner = web.AppRunner(main.create_webhook_app(dp, bot), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    url = f"http://127.0.0.1:{port}{WEBHOOK_PATH}"
+    api.reset()
+
+    latencies = []
+    pending = iter(updates)
+    async with ClientSession() as client:
+        async with client.post(url, json=updates[0]) as response:
+            rejected = response.status
+        print(f"request without secret token: HTTP {rejected}")
+
+        async def sender():
+            for update in pending:
+                sent_at = time.perf_counter()
+                async with client.post(url, json=update, headers={SECRET_HEADER: WEBHOOK_SECRET}) as response:
+                    await response.read()
+                    assert response.status == 200, response.status
+                latencies.append((time.perf_counter() - sent_at) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(sender() for _ in range(concurrency)))
+        await api.wait_for("sendMessage", len(updates))
+        elapsed = api.last_call_at - started
+
+    await runner.cleanup()
+    return elapsed, latencies
+
+
+async def main_benchmark():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--updates", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    await init_db()
+    await load_caches()
+    api = FakeBotAPI()
+    await api.start()
+
+    # Routers are module-level, so one dispatcher serves both runs
+    dp = main.build_dispatcher()
+    polling_seconds = await run_polling(api, dp, make_updates(args.updates, 1_000_000))
+    webhook_seconds, latencies = await run_webhook(
+        api, dp, make_updates(args.updates, 2_000_000), args.concurrency
+    )
+
+    print(f"{args.updates} updates, webhook concurrency {args.concurrency}")
+    print(f"polling  {args.updates / polling_seconds:8.0f} updates/s")
+    print(
+        f"webhook  {args.updates / webhook_seconds:8.0f} updates/s   "
+        f"response p50 {statistics.median(latencies):.2f} ms, "
+        f"max {max(latencies):.2f} ms"
+    )
+
+    await api.stop()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main_benchmark())
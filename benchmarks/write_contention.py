@@ -0,0 +1,138 @@
+"""
+Concurrent application submissions: independent commits vs the write coordinator.
+
+Every submitter inserts an application and stamps the user's last
+submission time several times in a row. In "direct" mode each submission
+commits on its own pooled connection, as the handlers used to; in
+"coordinator" mode submissions are queued to a WriteCoordinator on a
+single connection and group-committed; in "batched" mode a WriteBatcher
+also merges the submissions of a few milliseconds into one multi-row
+INSERT, like db.manager.create_application.
+
+Usage:
+    python -m benchmarks.write_contention [--submitters 500] [--rounds 4] [--profile tuned] [--window-ms 5]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List
+
+import benchmarks  # noqa: F401  (sets placeholder credentials)
+from db.database import create_engine_for, create_write_engine
+from db.models import Application, ApplicationStatus, Base, User
+from db.manager import ApplicationSubmission, insert_applications
+from db.writer import WriteBatcher, WriteCoordinator
+from sqlalchemy import insert, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+FIRST_USER_ID = 100000
+
+
+async def submit(session: AsyncSession, user_id: int):
+    """The writes of one application submission, without the commit."""
+    session.add(Application(
+        user_id=user_id,
+        name="Applicant",
+        contact="applicant@example.com",
+        purpose="Benchmark submission",
+        status=ApplicationStatus.PENDING,
+    ))
+    await session.execute(
+        update(User).where(User.user_id == user_id).values(last_submission_time=datetime.utcnow())
+    )
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, round(fraction * (len(values) - 1)))]
+
+
+async def run_mode(mode: str, profile: str, submitters: int, rounds: int, window: float) -> Dict[str, float]:
+    """Run all submitters against a fresh database in one mode."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "bench.db")
+        engine = create_engine_for(db_file, profile) if mode == "direct" else create_write_engine(db_file, profile)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(insert(User), [
+                {"user_id": FIRST_USER_ID + i, "language": "en"} for i in range(submitters)
+            ])
+        session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        coordinator = WriteCoordinator(session_factory)
+        batcher = WriteBatcher(insert_applications, window, coordinator)
+
+        async def direct(user_id: int):
+            async with session_factory() as session:
+                await submit(session, user_id)
+                await session.commit()
+
+        async def queued(user_id: int):
+            await coordinator.run(lambda session: submit(session, user_id))
+
+        async def batched(user_id: int):
+            await batcher.submit(ApplicationSubmission({
+                "user_id": user_id,
+                "name": "Applicant",
+                "contact": "applicant@example.com",
+                "purpose": "Benchmark submission",
+            }))
+
+        write: Callable[[int], Awaitable[None]] = {"direct": direct, "coordinator": queued, "batched": batched}[mode]
+        latencies: List[float] = []
+        errors = 0
+
+        async def submitter(user_id: int):
+            nonlocal errors
+            for _ in range(rounds):
+                started = time.perf_counter()
+                try:
+                    await write(user_id)
+                except OperationalError:
+                    errors += 1  # "database is locked" after busy_timeout
+                    continue
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(submitter(FIRST_USER_ID + i) for i in range(submitters)))
+        elapsed = time.perf_counter() - started
+        await coordinator.close()
+        await engine.dispose()
+
+    latencies.sort()
+    return {
+        "committed": len(latencies),
+        "errors": errors,
+        "transactions": len(latencies) if mode == "direct" else coordinator.batches,
+        "per_second": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.50),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--submitters", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=4)
+    parser.add_argument("--profile", default="tuned", choices=["tuned", "default"])
+    parser.add_argument("--window-ms", type=float, default=5, help="Batching window of the batched mode")
+    args = parser.parse_args()
+
+    print(f"{args.submitters} submitters x {args.rounds} submissions, profile {args.profile}")
+    print(f"{'mode':<12} {'committed':>9} {'errors':>7} {'txns':>6} {'sub/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for mode in ("direct", "coordinator", "batched"):
+        result = await run_mode(mode, args.profile, args.submitters, args.rounds, args.window_ms / 1000)
+        print(
+            f"{mode:<12} {result['committed']:>9} {result['errors']:>7} {result['transactions']:>6} "
+            f"{result['per_second']:>8.0f} {result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
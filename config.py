@@ -3,6 +3,7 @@ Configuration module for the Telegram bot.
 Reads settings from environment variables.
 """
 import os
+import re
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -13,10 +14,74 @@ ADMIN_ID_STR = os.getenv("ADMIN_ID", "").strip()
 
 # Database settings
 DB_FILE = os.getenv("DB_FILE", "applio_bot.db")
+DB_PROFILE = os.getenv("DB_PROFILE", "tuned")  # "tuned" or "default"
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", 5000))
+DB_MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", 268435456))  # 256 MB
+DB_CACHE_SIZE = int(os.getenv("DB_CACHE_SIZE", -65536))  # negative = KiB, so 64 MB
+DB_WRITE_BATCH_SIZE = int(os.getenv("DB_WRITE_BATCH_SIZE", 200))  # Writes per group commit
+APPLICATION_BATCH_WINDOW_MS = float(os.getenv("APPLICATION_BATCH_WINDOW_MS", 5))  # Wait for more submissions per INSERT
+
+# Cache settings
+ADMIN_CACHE_REFRESH_SECONDS = int(os.getenv("ADMIN_CACHE_REFRESH_SECONDS", 60))
+
+# Outgoing message settings
+BOT_API_RATE_LIMIT = int(os.getenv("BOT_API_RATE_LIMIT", 30))  # messages per second, Telegram's global limit
+NOTIFY_CONCURRENCY = int(os.getenv("NOTIFY_CONCURRENCY", 8))
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", 50))
+OUTBOX_POLL_SECONDS = float(os.getenv("OUTBOX_POLL_SECONDS", 5))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 8))
+OUTBOX_MAX_BACKOFF_SECONDS = int(os.getenv("OUTBOX_MAX_BACKOFF_SECONDS", 300))
 
 # Anti-spam settings
 APP_COOLDOWN_SECONDS = int(os.getenv("APP_COOLDOWN_SECONDS", 300))  # 5 minutes default
 
+# Per-user rate limits (updates per second and burst size per update type)
+THROTTLE_MESSAGE_RATE = float(os.getenv("THROTTLE_MESSAGE_RATE", 1))
+THROTTLE_MESSAGE_BURST = int(os.getenv("THROTTLE_MESSAGE_BURST", 5))
+THROTTLE_CALLBACK_RATE = float(os.getenv("THROTTLE_CALLBACK_RATE", 2))
+THROTTLE_CALLBACK_BURST = int(os.getenv("THROTTLE_CALLBACK_BURST", 10))
+THROTTLE_IDLE_SECONDS = int(os.getenv("THROTTLE_IDLE_SECONDS", 600))
+
+# Maximum number of updates handled at the same time (one user's updates always run in order)
+UPDATE_CONCURRENCY = int(os.getenv("UPDATE_CONCURRENCY", 100))
+
+# FSM storage: "sqlite" keeps conversations in the bot database, "memory" in RAM only
+FSM_STORAGE = os.getenv("FSM_STORAGE", "sqlite")
+FSM_CACHE_SIZE = int(os.getenv("FSM_CACHE_SIZE", 10000))
+FSM_TTL_SECONDS = int(os.getenv("FSM_TTL_SECONDS", 86400))
+FSM_FLUSH_DELAY_MS = int(os.getenv("FSM_FLUSH_DELAY_MS", 50))
+FSM_PURGE_SECONDS = int(os.getenv("FSM_PURGE_SECONDS", 600))
+
+# How updates arrive: "polling" (getUpdates) or "webhook" (aiohttp server)
+BOT_MODE = os.getenv("BOT_MODE", "polling")
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", 8080))
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook")
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")  # Public base URL, e.g. https://bot.example.com
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+
+# Number of worker processes; above 1 the bot runs a supervisor that shards updates by user
+WORKERS = int(os.getenv("WORKERS", 1))
+
+# Base URL of a local Bot API server (empty = api.telegram.org)
+BOT_API_URL = os.getenv("BOT_API_URL", "")
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+# Updates handled slower than this are written to the slow-update log (JSON lines)
+SLOW_UPDATE_MS = float(os.getenv("SLOW_UPDATE_MS", 500))
+SLOW_UPDATE_LOG = os.getenv("SLOW_UPDATE_LOG", "")  # File path; empty = regular log
+
+# Log the stack and the running handler when the event loop is blocked this long (0 = disabled)
+LOOP_BLOCK_THRESHOLD_MS = float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", 0))
+
+# Prometheus /metrics endpoint (port 0 = disabled); worker N of WORKERS serves METRICS_PORT + N
+METRICS_HOST = os.getenv("METRICS_HOST", "0.0.0.0")
+METRICS_PORT = int(os.getenv("METRICS_PORT", 0))
+
 # Validate required settings
 if not BOT_TOKEN:
     raise ValueError("BOT_TOKEN is not set in .env file")
@@ -24,6 +89,39 @@ if not BOT_TOKEN:
 if not ADMIN_ID_STR:
     raise ValueError("ADMIN_ID is not set in .env file")
 
+if DB_PROFILE not in ("tuned", "default"):
+    raise ValueError(f"DB_PROFILE must be 'tuned' or 'default'. Got: {DB_PROFILE}")
+
+if DB_WRITE_BATCH_SIZE < 1:
+    raise ValueError(f"DB_WRITE_BATCH_SIZE must be at least 1. Got: {DB_WRITE_BATCH_SIZE}")
+
+if APPLICATION_BATCH_WINDOW_MS < 0:
+    raise ValueError(f"APPLICATION_BATCH_WINDOW_MS must not be negative. Got: {APPLICATION_BATCH_WINDOW_MS}")
+
+if FSM_STORAGE not in ("sqlite", "memory"):
+    raise ValueError(f"FSM_STORAGE must be 'sqlite' or 'memory'. Got: {FSM_STORAGE}")
+
+if UPDATE_CONCURRENCY < 1:
+    raise ValueError(f"UPDATE_CONCURRENCY must be at least 1. Got: {UPDATE_CONCURRENCY}")
+
+if WORKERS < 1:
+    raise ValueError(f"WORKERS must be at least 1. Got: {WORKERS}")
+
+if LOOP_BLOCK_THRESHOLD_MS < 0:
+    raise ValueError(f"LOOP_BLOCK_THRESHOLD_MS must not be negative. Got: {LOOP_BLOCK_THRESHOLD_MS}")
+
+if not 0 <= METRICS_PORT <= 65535:
+    raise ValueError(f"METRICS_PORT must be between 0 and 65535. Got: {METRICS_PORT}")
+
+if BOT_MODE not in ("polling", "webhook"):
+    raise ValueError(f"BOT_MODE must be 'polling' or 'webhook'. Got: {BOT_MODE}")
+
+if BOT_MODE == "webhook" and not WEBHOOK_URL:
+    raise ValueError("WEBHOOK_URL is required when BOT_MODE is 'webhook'")
+
+if WEBHOOK_SECRET and not re.fullmatch(r"[A-Za-z0-9_-]{1,256}", WEBHOOK_SECRET):
+    raise ValueError("WEBHOOK_SECRET may only contain A-Z, a-z, 0-9, _ and - (up to 256 characters)")
+
 try:
     ADMIN_ID = int(ADMIN_ID_STR)
     if ADMIN_ID <= 0:
@@ -0,0 +1,282 @@
+"""
+In-process caches for hot database lookups.
+"""
+import asyncio
+import functools
+import heapq
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import APP_COOLDOWN_SECONDS
+from db.database import read_session
+from db.models import Admin, Application, ApplicationStatus, User
+
+logger = logging.getLogger(__name__)
+
+# Receives (cache name, method name, args) for every local cache change.
+# Set in worker processes so the other workers can replay the change.
+_publisher: Optional[Callable[[str, str, tuple], None]] = None
+
+
+def shared_change(method):
+    """Mark a cache mutation that must be replayed in other worker processes."""
+    @functools.wraps(method)
+    def wrapper(self, *args):
+        method(self, *args)
+        if _publisher is not None:
+            _publisher(self.name, method.__name__, args)
+
+    wrapper.apply_locally = method
+    return wrapper
+
+
+class AdminCache:
+    """Set of added admin IDs mirrored from the admins table."""
+
+    name = "admins"
+
+    def __init__(self):
+        self._ids: Set[int] = set()
+        self.loaded = False
+
+    async def load(self, session: AsyncSession):
+        """
+        Replace the cached IDs with the current contents of the admins table.
+
+        Args:
+            session: Database session
+        """
+        result = await session.execute(select(Admin.user_id))
+        self._ids = set(result.scalars().all())
+        self.loaded = True
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._ids
+
+    @shared_change
+    def add(self, user_id: int):
+        """Record an admin that was just written to the database."""
+        self._ids.add(user_id)
+
+    @shared_change
+    def discard(self, user_id: int):
+        """Forget an admin that was just deleted from the database."""
+        self._ids.discard(user_id)
+
+    def ids(self) -> List[int]:
+        """Return cached admin IDs."""
+        return list(self._ids)
+
+
+class StatsCounters:
+    """User and per-status application counts kept up to date on every write."""
+
+    name = "stats"
+
+    def __init__(self):
+        self.users = 0
+        self.applications: Dict[ApplicationStatus, int] = {
+            status: 0 for status in ApplicationStatus
+        }
+        self.loaded = False
+
+    async def load(self, session: AsyncSession):
+        """
+        Recount users and applications with one GROUP BY aggregate.
+
+        Changes counted while the queries run would be overwritten, so this
+        runs once, before any update is handled; after that the counts only
+        move through the methods below.
+
+        Args:
+            session: Database session
+        """
+        result = await session.execute(
+            select(Application.status, func.count(Application.id))
+            .group_by(Application.status)
+        )
+        applications = {status: 0 for status in ApplicationStatus}
+        for status, count in result.all():
+            applications[status] = count
+
+        users = await session.execute(select(func.count(User.user_id)))
+        self.users = users.scalar() or 0
+        self.applications = applications
+        self.loaded = True
+
+    @shared_change
+    def user_created(self):
+        """Count a newly created user."""
+        self.users += 1
+
+    @shared_change
+    def application_created(self):
+        """Count a newly submitted (pending) application."""
+        self.applications[ApplicationStatus.PENDING] += 1
+
+    @shared_change
+    def status_changed(self, old: ApplicationStatus, new: ApplicationStatus, count: int = 1):
+        """Move applications from one status bucket to another."""
+        self.applications[old] -= count
+        self.applications[new] += count
+
+    def snapshot(self) -> Dict[str, int]:
+        """Return current counts keyed by users/total/pending/approved/rejected."""
+        return {
+            "users": self.users,
+            "total": sum(self.applications.values()),
+            "pending": self.applications[ApplicationStatus.PENDING],
+            "approved": self.applications[ApplicationStatus.APPROVED],
+            "rejected": self.applications[ApplicationStatus.REJECTED],
+        }
+
+
+class CooldownIndex:
+    """
+    Users still inside the submission cooldown, keyed by user ID.
+
+    Entries live in a dict for O(1) lookups and in an expiry min-heap so
+    expired ones are pruned in order; memory stays proportional to the
+    number of users currently in cooldown.
+    """
+
+    name = "cooldowns"
+
+    def __init__(self, cooldown: int = APP_COOLDOWN_SECONDS):
+        self.cooldown = cooldown
+        self._entries: Dict[int, Tuple[float, str]] = {}  # user_id -> (expires_at, language)
+        self._heap: List[Tuple[float, int]] = []
+        self.loaded = False
+
+    async def load(self, session: AsyncSession):
+        """
+        Rebuild the index from users whose last submission is still in cooldown.
+
+        Args:
+            session: Database session
+        """
+        since = datetime.utcnow() - timedelta(seconds=self.cooldown)
+        result = await session.execute(
+            select(User.user_id, User.language, User.last_submission_time)
+            .where(User.last_submission_time >= since)
+        )
+        self._entries = {}
+        self._heap = []
+        for user_id, language, submitted_at in result.all():
+            self._insert(user_id, submitted_at, language)
+        self.loaded = True
+
+    @shared_change
+    def record(self, user_id: int, submitted_at: datetime, language: str):
+        """
+        Start a user's cooldown.
+
+        Args:
+            user_id: Telegram user ID
+            submitted_at: Submission time (naive UTC, as stored in the database)
+            language: User language code, used for the cooldown message
+        """
+        self._insert(user_id, submitted_at, language)
+
+    def _insert(self, user_id: int, submitted_at: datetime, language: str):
+        expires_at = submitted_at.replace(tzinfo=timezone.utc).timestamp() + self.cooldown
+        self._entries[user_id] = (expires_at, language)
+        heapq.heappush(self._heap, (expires_at, user_id))
+
+    def prune(self, now: Optional[float] = None):
+        """Drop entries whose cooldown has ended."""
+        now = time.time() if now is None else now
+        while self._heap and self._heap[0][0] <= now:
+            expires_at, user_id = heapq.heappop(self._heap)
+            entry = self._entries.get(user_id)
+            if entry and entry[0] <= now:
+                del self._entries[user_id]
+
+    def get(self, user_id: int) -> Optional[Tuple[int, str]]:
+        """
+        Look up a user's cooldown.
+
+        Args:
+            user_id: Telegram user ID
+
+        Returns:
+            Tuple of (remaining seconds, language) if in cooldown, None otherwise
+        """
+        now = time.time()
+        self.prune(now)
+        entry = self._entries.get(user_id)
+        if not entry:
+            return None
+        expires_at, language = entry
+        return int(expires_at - now), language
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+admin_cache = AdminCache()
+stats_counters = StatsCounters()
+cooldowns = CooldownIndex()
+
+CACHES = {cache.name: cache for cache in (admin_cache, stats_counters, cooldowns)}
+
+
+def set_publisher(publisher: Optional[Callable[[str, str, tuple], None]]):
+    """
+    Report every local cache change to `publisher`.
+
+    Args:
+        publisher: Called with (cache name, method name, args), or None to stop
+    """
+    global _publisher
+    _publisher = publisher
+
+
+def apply_change(name: str, method: str, args: tuple):
+    """
+    Replay a change published by another process without publishing it again.
+
+    Args:
+        name: Cache name
+        method: Name of the shared_change method
+        args: Positional arguments of the original call
+    """
+    cache = CACHES[name]
+    getattr(type(cache), method).apply_locally(cache, *args)
+
+
+async def load_caches():
+    """Load all caches from the database."""
+    async with read_session() as session:
+        await admin_cache.load(session)
+        await stats_counters.load(session)
+        await cooldowns.load(session)
+    logger.info(
+        f"Caches loaded: {len(admin_cache.ids())} added admins, "
+        f"{stats_counters.snapshot()['total']} applications, "
+        f"{len(cooldowns)} users in cooldown"
+    )
+
+
+async def refresh_admin_cache_periodically(interval: int):
+    """
+    Reload the admin list forever, picking up rows edited directly in the database.
+
+    The stats counters are not reloaded: recounting scans the tables and
+    would overwrite changes counted while it runs.
+
+    Args:
+        interval: Seconds between reloads
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with read_session() as session:
+                await admin_cache.load(session)
+        except Exception as e:
+            logger.error(f"Failed to refresh the admin cache: {e}", exc_info=True)
@@ -1,31 +1,205 @@
 """
 Database initialization and session management.
 """
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+import time
+from typing import Callable, Optional
 
-from config import DB_FILE
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from config import (
+    DB_BUSY_TIMEOUT_MS,
+    DB_CACHE_SIZE,
+    DB_FILE,
+    DB_MAX_OVERFLOW,
+    DB_MMAP_SIZE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_PROFILE,
+)
+from db.migrations import run_migrations
 from db.models import Base
+from services.profiling import instrument_engine
+
+# Pragmas applied to every new connection, per engine profile.
+# "default" keeps SQLite's stock behaviour (rollback journal, full fsync).
+ENGINE_PROFILES = {
+    "default": {},
+    "tuned": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": DB_BUSY_TIMEOUT_MS,
+        "mmap_size": DB_MMAP_SIZE,
+        "cache_size": DB_CACHE_SIZE,
+        "temp_store": "MEMORY",
+    },
+}
+
+
+def _install_pragmas(engine: AsyncEngine, pragmas: dict):
+    """Run PRAGMA statements on each new DBAPI connection of the engine."""
+    if not pragmas:
+        return
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Connection pool that reports how long each checkout waited for a connection."""
+
+    # Called with the wait in seconds; set when metrics are enabled
+    on_wait: Optional[Callable[[float], None]] = None
+
+    def _do_get(self):
+        if self.on_wait is None:
+            return super()._do_get()
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.on_wait(time.perf_counter() - started)
+
+
+def _begin_immediate(engine: AsyncEngine):
+    """
+    Let SQLAlchemy control transactions on the engine's connections.
+
+    pysqlite opens transactions lazily and does not handle SAVEPOINT, so
+    its own transaction handling is turned off and every transaction starts
+    with BEGIN IMMEDIATE, taking the write lock up front.
+    """
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def create_engine_for(
+    db_file: str,
+    profile: str = DB_PROFILE,
+    read_only: bool = False,
+    pool_size: int = DB_POOL_SIZE,
+    max_overflow: int = DB_MAX_OVERFLOW
+) -> AsyncEngine:
+    """
+    Create an async SQLite engine configured with the given profile.
 
-# SQLite async engine
+    Args:
+        db_file: Path to the SQLite database file
+        profile: Engine profile name (see ENGINE_PROFILES)
+        read_only: Refuse writes on the engine's connections (PRAGMA query_only)
+        pool_size: Connections kept in the pool
+        max_overflow: Extra connections opened when the pool is exhausted
+
+    Returns:
+        Configured async engine
+    """
+    new_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{db_file}",
+        echo=False,
+        poolclass=TimedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=DB_POOL_TIMEOUT,
+    )
+    pragmas = dict(ENGINE_PROFILES[profile])
+    if read_only:
+        pragmas["query_only"] = "ON"
+    _install_pragmas(new_engine, pragmas)
+    instrument_engine(new_engine)
+    return new_engine
+
+
+def create_write_engine(db_file: str, profile: str = DB_PROFILE) -> AsyncEngine:
+    """
+    Create the single-connection read-write engine used by the write coordinator.
+
+    Args:
+        db_file: Path to the SQLite database file
+        profile: Engine profile name (see ENGINE_PROFILES)
+
+    Returns:
+        Engine with one connection whose transactions start with BEGIN IMMEDIATE
+    """
+    new_engine = create_engine_for(db_file, profile, pool_size=1, max_overflow=0)
+    _begin_immediate(new_engine)
+    return new_engine
+
+
+# SQLite async engines: the single read-write connection and a pool of
+# read-only connections. At runtime only the write coordinator (db.writer)
+# uses the read-write one; a session holding it while waiting for a queued
+# write would wait forever.
 DATABASE_URL = f"sqlite+aiosqlite:///{DB_FILE}"
-engine = create_async_engine(DATABASE_URL, echo=False)
+engine = create_write_engine(DB_FILE)
+read_engine = create_engine_for(DB_FILE, read_only=True)
 
-# Async session factory
+# Async session factories
 async_session = async_sessionmaker(
     engine,
     class_=AsyncSession,
     expire_on_commit=False
 )
+read_session = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+)
+
+
+class LazySession:
+    """
+    Proxy for AsyncSession that creates the real session on first use.
+
+    Updates that never touch the database never create a session and
+    never check out a pooled connection. The session reads from the
+    read-only pool; writes go through db.writer.write_coordinator.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker = read_session):
+        self._session_factory = session_factory
+        self._session = None
+
+    @property
+    def opened(self) -> bool:
+        """Whether the underlying session has been created."""
+        return self._session is not None
+
+    def __getattr__(self, name: str):
+        if self._session is None:
+            self._session = self._session_factory()
+        return getattr(self._session, name)
+
+    async def close(self):
+        """Close the underlying session if it was ever opened."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
 
 
 async def init_db():
-    """Initialize database tables."""
+    """Initialize database tables and apply pending migrations."""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(run_migrations)
 
 
 async def get_session() -> AsyncSession:
-    """Get async database session."""
-    async with async_session() as session:
+    """Get async read-only database session."""
+    async with read_session() as session:
         yield session
-
@@ -0,0 +1,325 @@
+"""
+FSM storage kept in the bot's SQLite database.
+Recent conversations are served from an in-memory LRU cache and writes are
+coalesced, so a handler that updates data and state costs a single write.
+"""
+import asyncio
+import json
+import logging
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, DefaultKeyBuilder, StateType, StorageKey
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from config import FSM_CACHE_SIZE, FSM_FLUSH_DELAY_MS, FSM_TTL_SECONDS
+from db.database import read_session
+from db.models import FsmRecord
+from db.writer import write_coordinator
+
+logger = logging.getLogger(__name__)
+
+# Keys per DELETE statement, well below SQLite's bound parameter limit
+DELETE_CHUNK_SIZE = 500
+
+# Seconds before retrying a failed flush, doubled after every failure
+FLUSH_RETRY_MIN_SECONDS = 0.5
+FLUSH_RETRY_MAX_SECONDS = 30.0
+
+
+class _Entry:
+    """Cached state and data of one conversation."""
+
+    __slots__ = ("state", "data", "updated_at", "stored_state")
+
+    def __init__(
+        self,
+        state: Optional[str],
+        data: Dict[str, Any],
+        updated_at: datetime,
+        stored_state: Optional[str] = None
+    ):
+        self.state = state
+        self.data = data
+        self.updated_at = updated_at
+        # State of the conversation's row in the table, None if it has no row
+        self.stored_state = stored_state
+
+
+class SQLiteStorage(BaseStorage):
+    """FSM storage backed by the fsm_storage table."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker = read_session,
+        cache_size: int = FSM_CACHE_SIZE,
+        ttl: float = FSM_TTL_SECONDS,
+        flush_delay: float = FSM_FLUSH_DELAY_MS / 1000
+    ):
+        """
+        Args:
+            session_factory: Session factory for reads; writes go through the write coordinator
+            cache_size: Number of conversations kept in memory
+            ttl: Seconds after the last change when a conversation is dropped
+            flush_delay: Seconds to collect changes before writing them
+        """
+        self.session_factory = session_factory
+        self.cache_size = cache_size
+        self.ttl = ttl
+        self.flush_delay = flush_delay
+        self.key_builder = DefaultKeyBuilder(
+            with_bot_id=True, with_business_connection_id=True, with_destiny=True
+        )
+        self._cache: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._dirty = set()
+        self._writing = set()
+        self._flush_handle: Optional[asyncio.Task] = None
+        # Rows of the table per state, loaded on first use
+        self._state_counts: Optional[Counter] = None
+
+        self.flushes = 0
+        self.rows_written = 0
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        entry = await self._get_entry(key)
+        entry.state = state.state if isinstance(state, State) else state
+        self._mark_dirty(key)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        entry = await self._get_entry(key)
+        return entry.state
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        entry = await self._get_entry(key)
+        entry.data = data.copy()
+        self._mark_dirty(key)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        entry = await self._get_entry(key)
+        return entry.data.copy()
+
+    async def close(self) -> None:
+        """Write pending changes before shutdown."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        await self.flush()
+
+    async def _get_entry(self, key: StorageKey) -> _Entry:
+        """Return the cached entry for a key, loading it from the database on a miss."""
+        record_key = self.key_builder.build(key)
+        entry = self._cache.get(record_key)
+        if entry is not None:
+            if entry.updated_at >= datetime.utcnow() - timedelta(seconds=self.ttl):
+                self._cache.move_to_end(record_key)
+                return entry
+            # Expired while cached; unsaved entries are never this old
+            del self._cache[record_key]
+
+        async with self.session_factory() as session:
+            record = await session.get(FsmRecord, record_key)
+
+        # Another task may have loaded the key while this one waited
+        entry = self._cache.get(record_key)
+        if entry is not None:
+            return entry
+
+        now = datetime.utcnow()
+        if record is None:
+            entry = _Entry(None, {}, now)
+        elif record.updated_at < now - timedelta(seconds=self.ttl):
+            # Expired but not purged yet, so its row still counts
+            entry = _Entry(None, {}, now, record.state)
+        else:
+            entry = _Entry(record.state, json.loads(record.data), record.updated_at, record.state)
+        # Make room first, so the new entry is not the one evicted
+        self._evict(room=1)
+        self._cache[record_key] = entry
+        return entry
+
+    def _mark_dirty(self, key: StorageKey):
+        """Queue a key for the next write and schedule it."""
+        record_key = self.key_builder.build(key)
+        self._cache[record_key].updated_at = datetime.utcnow()
+        self._dirty.add(record_key)
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.create_task(self._flush_later(self.flush_delay))
+
+    async def _flush_later(self, delay: float, retry_delay: float = FLUSH_RETRY_MIN_SECONDS):
+        await asyncio.sleep(delay)
+        self._flush_handle = None
+        try:
+            await self.flush()
+        except Exception as e:
+            # The keys are dirty again; nothing else may touch them soon, so retry
+            logger.error(f"FSM storage flush failed, retrying in {retry_delay}s: {e}", exc_info=True)
+            if self._flush_handle is None:
+                self._flush_handle = asyncio.create_task(
+                    self._flush_later(retry_delay, min(retry_delay * 2, FLUSH_RETRY_MAX_SECONDS))
+                )
+
+    async def flush(self):
+        """Write every changed conversation in one transaction."""
+        if not self._dirty:
+            return
+        keys, self._dirty = self._dirty, set()
+        self._writing |= keys
+
+        upserts = []
+        deletes = []
+        # Entries with the state their rows get, to count once the write is done
+        written = []
+        for record_key in keys:
+            entry = self._cache[record_key]
+            if entry.state is None and not entry.data:
+                deletes.append(record_key)
+                written.append((entry, None))
+            else:
+                written.append((entry, entry.state))
+                upserts.append({
+                    "key": record_key,
+                    "state": entry.state,
+                    "data": json.dumps(entry.data),
+                    "updated_at": entry.updated_at,
+                })
+
+        async def write_rows(session: AsyncSession):
+            if upserts:
+                statement = insert(FsmRecord)
+                await session.execute(
+                    statement.on_conflict_do_update(
+                        index_elements=[FsmRecord.key],
+                        set_={
+                            "state": statement.excluded.state,
+                            "data": statement.excluded.data,
+                            "updated_at": statement.excluded.updated_at,
+                        },
+                    ),
+                    upserts,
+                )
+            for start in range(0, len(deletes), DELETE_CHUNK_SIZE):
+                await session.execute(
+                    delete(FsmRecord).where(
+                        FsmRecord.key.in_(deletes[start:start + DELETE_CHUNK_SIZE])
+                    )
+                )
+
+        try:
+            await write_coordinator.run(write_rows)
+        except Exception:
+            # Keep the changes for the next attempt
+            self._dirty |= keys
+            raise
+        finally:
+            self._writing -= keys
+
+        for entry, state in written:
+            self._count_change(entry.stored_state, state)
+            entry.stored_state = state
+
+        self.flushes += 1
+        self.rows_written += len(keys)
+        self._evict()
+
+    def _evict(self, room: int = 0):
+        """Drop least recently used entries above cache_size, keeping unsaved ones and `room` spare slots."""
+        excess = len(self._cache) + room - self.cache_size
+        if excess <= 0:
+            return
+        victims = []
+        for record_key in self._cache:
+            if len(victims) >= excess:
+                break
+            if record_key not in self._dirty and record_key not in self._writing:
+                victims.append(record_key)
+        for record_key in victims:
+            del self._cache[record_key]
+
+    async def purge_expired(self) -> int:
+        """
+        Forget conversations that have not changed for ttl seconds.
+
+        Returns:
+            Number of rows removed from the database
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=self.ttl)
+        expired = [
+            record_key for record_key, entry in self._cache.items()
+            if entry.updated_at < cutoff
+            and record_key not in self._dirty and record_key not in self._writing
+        ]
+        for record_key in expired:
+            del self._cache[record_key]
+
+        async def delete_expired(session: AsyncSession) -> List[str]:
+            result = await session.execute(
+                delete(FsmRecord).where(FsmRecord.updated_at < cutoff).returning(FsmRecord.key)
+            )
+            return list(result.scalars().all())
+
+        removed_keys = await write_coordinator.run(delete_expired)
+        for record_key in removed_keys:
+            # The row is gone; a pending change of the entry inserts it again
+            entry = self._cache.get(record_key)
+            if entry is not None:
+                entry.stored_state = None
+        removed = len(removed_keys)
+        if removed:
+            logger.info(f"Dropped {removed} abandoned FSM conversations")
+        # Other worker processes write to the same table, so count the states again
+        if self._state_counts is not None:
+            await self._load_state_counts()
+        return removed
+
+    async def count_states(self) -> Dict[str, int]:
+        """
+        Count stored conversations per state.
+
+        The counts are kept up to date as changes are written, so only the
+        first call reads the table. Expired conversations are counted until
+        they are purged.
+
+        Returns:
+            Number of conversations by state name
+        """
+        if self._state_counts is None:
+            await self._load_state_counts()
+        return dict(self._state_counts)
+
+    async def _load_state_counts(self):
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(FsmRecord.state, func.count())
+                .where(FsmRecord.state.is_not(None))
+                .group_by(FsmRecord.state)
+            )
+        self._state_counts = Counter(dict(result.all()))
+
+    def _count_change(self, old_state: Optional[str], new_state: Optional[str]):
+        """Move one conversation between state counts."""
+        if self._state_counts is None or old_state == new_state:
+            return
+        if old_state is not None:
+            self._state_counts[old_state] -= 1
+            if self._state_counts[old_state] <= 0:
+                del self._state_counts[old_state]
+        if new_state is not None:
+            self._state_counts[new_state] += 1
+
+    async def purge_periodically(self, interval: float):
+        """
+        Purge expired conversations every `interval` seconds until cancelled.
+
+        Args:
+            interval: Seconds between purges
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.purge_expired()
+            except Exception as e:
+                logger.error(f"FSM storage purge failed: {e}", exc_info=True)
@@ -1,18 +1,46 @@
 """
 Database manager for CRUD operations and anti-spam checks.
+Reads use the caller's session; writes are committed by the write coordinator.
 """
 import logging
 from datetime import datetime
-from typing import Optional
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
 
-from sqlalchemy import select
+from aiogram.types import InlineKeyboardMarkup
+from sqlalchemy import Select, delete, func, insert, select, text as sql_text, tuple_, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 
-from config import ADMIN_ID, APP_COOLDOWN_SECONDS
-from db.models import Admin, Application, ApplicationStatus, User
+from config import ADMIN_ID, APPLICATION_BATCH_WINDOW_MS
+from db.cache import admin_cache, cooldowns, stats_counters
+from db.models import Admin, Application, ApplicationStatus, OutboxMessage, User, applications_fts
+from db.writer import WriteBatcher, write_coordinator
 
 logger = logging.getLogger(__name__)
 
+# Applications shown per page in the admin list
+APPLICATIONS_PAGE_SIZE = 10
+
+CURSOR_TIME_FORMAT = "%Y%m%d%H%M%S%f"
+
+# Search texts are cut to this many words
+SEARCH_MAX_TERMS = 8
+
+# Only the newest matches of a search are ranked, so broad searches stay fast
+SEARCH_MAX_RANKED = 1000
+
+# Text and keyboard of a notification about an application, in the recipient's language
+NoticeBuilder = Callable[[Application, str], Tuple[str, Optional[InlineKeyboardMarkup]]]
+
+
+class ApplicationSubmission(NamedTuple):
+    """An application to insert and the admins to notify about it."""
+
+    values: Dict[str, object]
+    admin_ids: Tuple[int, ...] = ()
+    admin_notice: Optional[NoticeBuilder] = None
+
 
 async def get_user(session: AsyncSession, user_id: int) -> Optional[User]:
     """
@@ -49,10 +77,14 @@ async def get_or_create_user(
     """
     user = await get_user(session, user_id)
     if not user:
-        user = User(user_id=user_id, language=language)
-        session.add(user)
-        await session.commit()
-        await session.refresh(user)
+        async def insert_user(write_session: AsyncSession) -> User:
+            new_user = User(user_id=user_id, language=language, last_submission_time=None)
+            write_session.add(new_user)
+            await write_session.flush()
+            return new_user
+
+        user = await write_coordinator.run(insert_user)
+        stats_counters.user_created()
         logger.info(f"Created new user: {user_id}")
     return user
 
@@ -75,32 +107,74 @@ async def update_user_language(
     """
     user = await get_user(session, user_id)
     if user:
-        user.language = language
-        await session.commit()
+        async def set_language(write_session: AsyncSession):
+            await write_session.execute(
+                update(User).where(User.user_id == user_id).values(language=language)
+            )
+
+        await write_coordinator.run(set_language)
+        # The caller's session is read-only; update its copy without marking it dirty
+        set_committed_value(user, "language", language)
         logger.info(f"Updated language for user {user_id}: {language}")
     return user
 
 
-async def check_cooldown(session: AsyncSession, user_id: int) -> Optional[int]:
+async def insert_applications(
+    session: AsyncSession,
+    submissions: List[ApplicationSubmission]
+) -> List[Tuple[Application, Optional[str]]]:
     """
-    Check if user is in cooldown period.
+    Insert a batch of applications and update their users' last submission time.
+
+    The admin notifications of the batch are written to the outbox in the
+    same transaction, so an application is never stored without them.
 
     Args:
-        session: Database session
-        user_id: Telegram user ID
+        session: Writer session
+        submissions: Applications with the admins to notify
 
     Returns:
-        Remaining seconds if in cooldown, None otherwise
+        Each created application with its user's language, in submission order
     """
-    user = await get_user(session, user_id)
-    if not user or not user.last_submission_time:
-        return None
+    submitted_at = datetime.utcnow()
+    # One multi-row INSERT; RETURNING loads ids and created_at without a refresh
+    result = await session.scalars(
+        insert(Application).returning(Application, sort_by_parameter_order=True),
+        [
+            dict(submission.values, status=ApplicationStatus.PENDING, created_at=submitted_at, updated_at=submitted_at)
+            for submission in submissions
+        ]
+    )
+    applications = result.all()
+
+    # The languages are needed for the cooldown index
+    result = await session.execute(
+        update(User)
+        .where(User.user_id.in_({submission.values["user_id"] for submission in submissions}))
+        .values(last_submission_time=submitted_at)
+        .returning(User.user_id, User.language)
+    )
+    languages = dict(result.all())
+
+    admin_ids = {
+        admin_id
+        for submission in submissions if submission.admin_notice
+        for admin_id in submission.admin_ids
+    }
+    if admin_ids:
+        result = await session.execute(
+            select(User.user_id, User.language).where(User.user_id.in_(admin_ids))
+        )
+        admin_languages = dict(result.all())
+        await _insert_outbox_messages(session, [
+            (admin_id, *submission.admin_notice(application, admin_languages.get(admin_id, "en")))
+            for application, submission in zip(applications, submissions) if submission.admin_notice
+            for admin_id in submission.admin_ids
+        ])
+    return [(application, languages.get(application.user_id)) for application in applications]
+
 
-    time_diff = datetime.utcnow() - user.last_submission_time
-    if time_diff.total_seconds() < APP_COOLDOWN_SECONDS:
-        remaining = int(APP_COOLDOWN_SECONDS - time_diff.total_seconds())
-        return remaining
-    return None
+application_batcher = WriteBatcher(insert_applications, APPLICATION_BATCH_WINDOW_MS / 1000, write_coordinator)
 
 
 async def create_application(
@@ -108,37 +182,35 @@ async def create_application(
     user_id: int,
     name: str,
     contact: str,
-    purpose: str
+    purpose: str,
+    admin_notice: Optional[NoticeBuilder] = None
 ) -> Application:
     """
     Create new application and update user's last submission time.
 
+    Submissions arriving within APPLICATION_BATCH_WINDOW_MS of each other
+    are inserted in one statement and committed together.
+
     Args:
-        session: Database session
+        session: Caller's session, used only if the admin cache is not loaded yet
         user_id: Telegram user ID
         name: Applicant name
         contact: Contact information
         purpose: Application purpose
+        admin_notice: Builds the notification queued for every admin in the same transaction
 
     Returns:
         Created application object
     """
-    application = Application(
-        user_id=user_id,
-        name=name,
-        contact=contact,
-        purpose=purpose,
-        status=ApplicationStatus.PENDING
-    )
-    session.add(application)
-
-    # Update user's last submission time
-    user = await get_user(session, user_id)
-    if user:
-        user.last_submission_time = datetime.utcnow()
-
-    await session.commit()
-    await session.refresh(application)
+    admin_ids = tuple(await get_all_admins(session)) if admin_notice else ()
+    application, language = await application_batcher.submit(ApplicationSubmission(
+        {"user_id": user_id, "name": name, "contact": contact, "purpose": purpose},
+        admin_ids,
+        admin_notice
+    ))
+    stats_counters.application_created()
+    if language is not None:
+        cooldowns.record(user_id, application.created_at, language)
     logger.info(f"New application #{application.id} created by user {user_id}")
     return application
 
@@ -157,36 +229,344 @@ async def get_application(
     Returns:
         Application object or None
     """
+    return await session.get(Application, app_id)
+
+
+def make_page_cursor(application: Application) -> str:
+    """
+    Encode an application's (created_at, id) position for callback data.
+
+    Args:
+        application: Application at the edge of a page
+
+    Returns:
+        Compact cursor string, e.g. "20240131120000123456_42"
+    """
+    return f"{application.created_at.strftime(CURSOR_TIME_FORMAT)}_{application.id}"
+
+
+def parse_page_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor produced by make_page_cursor.
+
+    Args:
+        cursor: Cursor string
+
+    Returns:
+        Tuple of (created_at, id)
+    """
+    created_at, app_id = cursor.split("_")
+    return datetime.strptime(created_at, CURSOR_TIME_FORMAT), int(app_id)
+
+
+def pending_page_query(
+    older_than: Optional[str] = None,
+    newer_than: Optional[str] = None,
+    limit: int = APPLICATIONS_PAGE_SIZE
+) -> Select:
+    """
+    Build the query of get_pending_applications_page.
+
+    It selects one row more than `limit` to tell whether there is another
+    page. With newer_than the rows come oldest first.
+
+    Args:
+        older_than: Cursor of the last row of the previous page (go forward)
+        newer_than: Cursor of the first row of the next page (go back)
+        limit: Page size
+
+    Returns:
+        Select statement
+    """
+    position = tuple_(Application.created_at, Application.id)
+    query = select(Application).where(Application.status == ApplicationStatus.PENDING)
+
+    if newer_than:
+        # Walk towards newer rows in ascending order; the caller flips the page
+        query = query.where(position > tuple_(*parse_page_cursor(newer_than)))
+        query = query.order_by(Application.created_at.asc(), Application.id.asc())
+    else:
+        if older_than:
+            query = query.where(position < tuple_(*parse_page_cursor(older_than)))
+        query = query.order_by(Application.created_at.desc(), Application.id.desc())
+    return query.limit(limit + 1)
+
+
+async def get_pending_applications_page(
+    session: AsyncSession,
+    older_than: Optional[str] = None,
+    newer_than: Optional[str] = None,
+    limit: int = APPLICATIONS_PAGE_SIZE
+) -> Tuple[List[Application], bool, bool]:
+    """
+    Get one page of pending applications, newest first, using keyset pagination.
+
+    Pages are addressed by the (created_at, id) of their edge rows instead of
+    an OFFSET, so every page costs one index range scan of `limit` rows.
+
+    Args:
+        session: Database session
+        older_than: Cursor of the last row of the previous page (go forward)
+        newer_than: Cursor of the first row of the next page (go back)
+        limit: Page size
+
+    Returns:
+        Tuple of (applications, has_newer, has_older)
+    """
+    result = await session.execute(pending_page_query(older_than, newer_than, limit))
+    applications = list(result.scalars().all())
+
+    if newer_than:
+        has_newer = len(applications) > limit
+        return applications[:limit][::-1], has_newer, True
+
+    has_older = len(applications) > limit
+    return applications[:limit], older_than is not None, has_older
+
+
+def make_search_query(text: str) -> Optional[str]:
+    """
+    Turn an admin's search text into an FTS5 query.
+
+    Every word becomes a quoted prefix term, so FTS5 syntax in the text is
+    matched literally and "jo smi" finds "John Smith". All terms must match.
+
+    Args:
+        text: Search text
+
+    Returns:
+        FTS5 MATCH expression, or None if the text has no words
+    """
+    terms = text.split()[:SEARCH_MAX_TERMS]
+    if not terms:
+        return None
+    return " ".join('"' + term.replace('"', '""') + '"*' for term in terms)
+
+
+async def search_applications(
+    session: AsyncSession,
+    text: str,
+    page: int = 0,
+    limit: int = APPLICATIONS_PAGE_SIZE
+) -> Tuple[List[Application], bool, bool]:
+    """
+    Full-text search over application name, contact and purpose.
+
+    Only the SEARCH_MAX_RANKED newest matches are ranked, so a search
+    matching most applications costs as much as a narrow one. Older
+    matches are left out, and the search reports that it was truncated.
+
+    Args:
+        session: Database session
+        text: Search text
+        page: Zero-based page number
+        limit: Page size
+
+    Returns:
+        Tuple of (applications, has_more, truncated), best matches first,
+        newest first among equals
+    """
+    query = make_search_query(text)
+    if query is None:
+        return [], False, False
+
+    match = sql_text("applications_fts MATCH :query").bindparams(query=query)
+    # Rowid of the newest match that is not ranked, NULL if all are. FTS5
+    # walks matches in rowid order cheaply, while ranking has to score
+    # every match it is given
+    first_unranked = (
+        select(applications_fts.c.rowid)
+        .where(match)
+        .order_by(applications_fts.c.rowid.desc())
+        .limit(1)
+        .offset(SEARCH_MAX_RANKED)
+        .scalar_subquery()
+    )
     result = await session.execute(
-        select(Application).where(Application.id == app_id)
+        select(Application, first_unranked.is_not(None))
+        .select_from(applications_fts)
+        .join(Application, Application.id == applications_fts.c.rowid)
+        .where(match, applications_fts.c.rowid > func.coalesce(first_unranked, 0))
+        .order_by(applications_fts.c.rank, Application.id.desc())
+        .limit(limit + 1)
+        .offset(page * limit)
     )
-    return result.scalar_one_or_none()
+    rows = result.all()
+    truncated = bool(rows) and bool(rows[0][1])
+    applications = [application for application, _ in rows]
+    return applications[:limit], len(applications) > limit, truncated
+
+
+def _applicant_language():
+    """Correlated subquery for the language of an application's user, NULL if there is no such user."""
+    return select(User.language).where(User.user_id == Application.user_id).scalar_subquery()
 
 
 async def update_application_status(
     session: AsyncSession,
     app_id: int,
-    status: ApplicationStatus
+    status: ApplicationStatus,
+    notice: Optional[NoticeBuilder] = None
 ) -> Optional[Application]:
     """
-    Update application status.
+    Atomically move a pending application to a new status.
+
+    Runs a single compare-and-set UPDATE ... WHERE status = pending
+    RETURNING, so when two admins decide at the same time only one of
+    them gets the application back. The statement also returns the
+    applicant's language, and the applicant's notification is written
+    to the outbox in the same transaction.
 
     Args:
-        session: Database session
+        session: Caller's session (unused, the write goes through the write coordinator)
         app_id: Application ID
         status: New status
+        notice: Builds the notification queued for the applicant
 
     Returns:
-        Updated application or None
+        Updated application, or None if it does not exist or is no longer pending
     """
-    app = await get_application(session, app_id)
+    async def compare_and_set(write_session: AsyncSession) -> Optional[Application]:
+        result = await write_session.execute(
+            update(Application)
+            .where(
+                Application.id == app_id,
+                Application.status == ApplicationStatus.PENDING
+            )
+            .values(status=status, updated_at=datetime.utcnow())
+            .returning(Application, _applicant_language())
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None
+        app, language = row
+        if notice and language is not None:
+            await _insert_outbox_messages(write_session, [(app.user_id, *notice(app, language))])
+        return app
+
+    app = await write_coordinator.run(compare_and_set)
     if app:
-        app.status = status
-        await session.commit()
+        stats_counters.status_changed(ApplicationStatus.PENDING, status)
         logger.info(f"Application #{app_id} status updated to {status.value}")
     return app
 
 
+async def update_applications_status(
+    session: AsyncSession,
+    app_ids: List[int],
+    status: ApplicationStatus,
+    notice: Optional[NoticeBuilder] = None
+) -> List[Application]:
+    """
+    Atomically move several pending applications to a new status.
+
+    Runs one UPDATE ... WHERE id IN (...) AND status = pending RETURNING,
+    so applications another admin decided on meanwhile are left out.
+    As in update_application_status, the applicants' notifications are
+    written to the outbox in the same transaction.
+
+    Args:
+        session: Caller's session (unused, the write goes through the write coordinator)
+        app_ids: Application IDs
+        status: New status
+        notice: Builds the notification queued for each applicant
+
+    Returns:
+        Applications that were pending and got the new status
+    """
+    if not app_ids:
+        return []
+
+    async def compare_and_set(write_session: AsyncSession) -> List[Application]:
+        result = await write_session.execute(
+            update(Application)
+            .where(
+                Application.id.in_(app_ids),
+                Application.status == ApplicationStatus.PENDING
+            )
+            .values(status=status, updated_at=datetime.utcnow())
+            .returning(Application, _applicant_language())
+        )
+        rows = result.all()
+        if notice:
+            await _insert_outbox_messages(write_session, [
+                (app.user_id, *notice(app, language)) for app, language in rows if language is not None
+            ])
+        return [app for app, _ in rows]
+
+    applications = await write_coordinator.run(compare_and_set)
+    if applications:
+        stats_counters.status_changed(ApplicationStatus.PENDING, status, len(applications))
+        logger.info(f"{len(applications)} of {len(app_ids)} applications status updated to {status.value}")
+    return applications
+
+
+async def get_application_stats(session: AsyncSession) -> Dict[str, int]:
+    """
+    Get user and application counts.
+
+    Args:
+        session: Database session, used only if the counters are not loaded yet
+
+    Returns:
+        Dict with users, total, pending, approved and rejected counts
+    """
+    if not stats_counters.loaded:
+        await stats_counters.load(session)
+    return stats_counters.snapshot()
+
+
+# ============== Outbox ==============
+
+
+async def _insert_outbox_messages(
+    write_session: AsyncSession,
+    messages: Iterable[Tuple[int, str, Optional[InlineKeyboardMarkup]]]
+) -> int:
+    """
+    Insert outgoing messages into the outbox within a write job.
+
+    Args:
+        write_session: Writer session
+        messages: (chat_id, text, reply_markup) tuples
+
+    Returns:
+        Number of queued messages
+    """
+    values = [
+        {
+            "chat_id": chat_id,
+            "text": text,
+            "reply_markup": reply_markup.model_dump_json(exclude_none=True) if reply_markup else None,
+        }
+        for chat_id, text, reply_markup in messages
+    ]
+    if values:
+        # One executemany INSERT; the ORM would insert row by row to fetch each id
+        await write_session.execute(insert(OutboxMessage), values)
+    return len(values)
+
+
+async def enqueue_messages(
+    session: AsyncSession,
+    messages: Iterable[Tuple[int, str, Optional[InlineKeyboardMarkup]]]
+) -> int:
+    """
+    Store outgoing messages in the outbox for the background sender.
+
+    Args:
+        session: Caller's session (unused, the write goes through the write coordinator)
+        messages: (chat_id, text, reply_markup) tuples
+
+    Returns:
+        Number of queued messages
+    """
+    messages = list(messages)
+    if not messages:
+        return 0
+    return await write_coordinator.run(lambda write_session: _insert_outbox_messages(write_session, messages))
+
+
 # ============== Admin Management ==============
 
 
@@ -195,7 +575,7 @@ async def is_admin(session: AsyncSession, user_id: int) -> bool:
     Check if user is an admin (main admin or added admin).
 
     Args:
-        session: Database session
+        session: Database session, used only if the admin cache is not loaded yet
         user_id: Telegram user ID
 
     Returns:
@@ -205,11 +585,10 @@ async def is_admin(session: AsyncSession, user_id: int) -> bool:
     if user_id == ADMIN_ID:
         return True
 
-    # Check if added admin in database
-    result = await session.execute(
-        select(Admin).where(Admin.user_id == user_id)
-    )
-    return result.scalar_one_or_none() is not None
+    # Check if added admin in the in-memory roster
+    if not admin_cache.loaded:
+        await admin_cache.load(session)
+    return user_id in admin_cache
 
 
 async def is_main_admin(user_id: int) -> bool:
@@ -230,14 +609,16 @@ async def get_all_admins(session: AsyncSession) -> list:
     Get list of all admin user IDs (including main admin).
 
     Args:
-        session: Database session
+        session: Database session, used only if the admin cache is not loaded yet
 
     Returns:
         List of admin user IDs
     """
-    result = await session.execute(select(Admin))
-    admins = result.scalars().all()
-    admin_ids = [ADMIN_ID] + [admin.user_id for admin in admins]
+    if not admin_cache.loaded:
+        await admin_cache.load(session)
+    admin_ids = [ADMIN_ID] + [
+        admin_id for admin_id in admin_cache.ids() if admin_id != ADMIN_ID
+    ]
     return admin_ids
 
 
@@ -277,10 +658,19 @@ async def add_admin(
     if await is_admin(session, user_id):
         return None
 
-    admin = Admin(user_id=user_id, added_by=added_by)
-    session.add(admin)
-    await session.commit()
-    await session.refresh(admin)
+    async def insert_admin(write_session: AsyncSession) -> Admin:
+        admin = Admin(user_id=user_id, added_by=added_by)
+        write_session.add(admin)
+        await write_session.flush()
+        return admin
+
+    try:
+        admin = await write_coordinator.run(insert_admin)
+    except IntegrityError:
+        # Row was added behind the cache's back
+        admin_cache.add(user_id)
+        return None
+    admin_cache.add(user_id)
     logger.info(f"New admin added: {user_id} by {added_by}")
     return admin
 
@@ -290,7 +680,7 @@ async def remove_admin(session: AsyncSession, user_id: int) -> bool:
     Remove admin by user ID.
 
     Args:
-        session: Database session
+        session: Caller's session (unused, the write goes through the write coordinator)
         user_id: Telegram user ID to remove
 
     Returns:
@@ -300,16 +690,18 @@ async def remove_admin(session: AsyncSession, user_id: int) -> bool:
     if user_id == ADMIN_ID:
         return False
 
-    result = await session.execute(
-        select(Admin).where(Admin.user_id == user_id)
-    )
-    admin = result.scalar_one_or_none()
+    async def delete_admin(write_session: AsyncSession) -> int:
+        result = await write_session.execute(
+            delete(Admin).where(Admin.user_id == user_id)
+        )
+        return result.rowcount
+
+    removed = await write_coordinator.run(delete_admin)
+    admin_cache.discard(user_id)
 
-    if not admin:
+    if not removed:
         return False
 
-    await session.delete(admin)
-    await session.commit()
     logger.info(f"Admin removed: {user_id}")
     return True
 
@@ -0,0 +1,126 @@
+"""
+Versioned schema migrations.
+
+`Base.metadata.create_all` only creates missing tables, so changes to
+existing tables (new indexes, columns, virtual tables) are applied here as
+ordered steps. Each applied step is recorded in the schema_version table.
+"""
+import logging
+from datetime import datetime
+from typing import Callable, List, Tuple
+
+from sqlalchemy.engine import Connection
+
+logger = logging.getLogger(__name__)
+
+
+def _add_application_indexes(conn: Connection):
+    """Index the pending-list, stats and per-user application queries."""
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_applications_status_created_at "
+        "ON applications (status, created_at)"
+    )
+    conn.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_applications_user_id_created_at "
+        "ON applications (user_id, created_at)"
+    )
+
+
+def _add_application_search(conn: Connection):
+    """
+    Full-text index over application name, contact and purpose.
+
+    An external-content FTS5 table stores only the index and reads the text
+    from applications. Triggers keep it in sync; status changes do not touch
+    it. Existing rows are indexed by the final rebuild. Prefixes of up to six
+    characters are indexed too, so a prefix term reads one doclist instead of
+    merging those of every word it expands to.
+    """
+    conn.exec_driver_sql(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS applications_fts USING fts5("
+        "name, contact, purpose, "
+        "content='applications', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3 4 5 6')"
+    )
+    # Rank name matches above contact matches above purpose matches
+    conn.exec_driver_sql(
+        "INSERT INTO applications_fts (applications_fts, rank) VALUES ('rank', 'bm25(10.0, 5.0, 1.0)')"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS applications_fts_insert AFTER INSERT ON applications BEGIN "
+        "INSERT INTO applications_fts (rowid, name, contact, purpose) "
+        "VALUES (new.id, new.name, new.contact, new.purpose); "
+        "END"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS applications_fts_delete AFTER DELETE ON applications BEGIN "
+        "INSERT INTO applications_fts (applications_fts, rowid, name, contact, purpose) "
+        "VALUES ('delete', old.id, old.name, old.contact, old.purpose); "
+        "END"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS applications_fts_update AFTER UPDATE OF name, contact, purpose "
+        "ON applications BEGIN "
+        "INSERT INTO applications_fts (applications_fts, rowid, name, contact, purpose) "
+        "VALUES ('delete', old.id, old.name, old.contact, old.purpose); "
+        "INSERT INTO applications_fts (rowid, name, contact, purpose) "
+        "VALUES (new.id, new.name, new.contact, new.purpose); "
+        "END"
+    )
+    # Backfill: index every existing application
+    conn.exec_driver_sql("INSERT INTO applications_fts (applications_fts) VALUES ('rebuild')")
+
+
+# Ordered list of (version, description, step). Never edit or reorder
+# released steps - append new ones with the next version number.
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "Add status/created_at and user_id/created_at indexes on applications", _add_application_indexes),
+    (2, "Add full-text search over applications", _add_application_search),
+]
+
+
+def get_schema_version(conn: Connection) -> int:
+    """
+    Get the latest applied migration version.
+
+    Args:
+        conn: Database connection
+
+    Returns:
+        Latest applied version, 0 for a database without migrations
+    """
+    conn.exec_driver_sql(
+        "CREATE TABLE IF NOT EXISTS schema_version ("
+        "version INTEGER PRIMARY KEY, "
+        "description VARCHAR(255) NOT NULL, "
+        "applied_at DATETIME NOT NULL)"
+    )
+    result = conn.exec_driver_sql("SELECT MAX(version) FROM schema_version")
+    return result.scalar() or 0
+
+
+def run_migrations(conn: Connection) -> int:
+    """
+    Apply all pending migration steps in order.
+
+    Intended to be called through `AsyncConnection.run_sync` inside the
+    transaction that created the tables.
+
+    Args:
+        conn: Database connection
+
+    Returns:
+        Schema version after migrating
+    """
+    version = get_schema_version(conn)
+    for step_version, description, step in MIGRATIONS:
+        if step_version <= version:
+            continue
+        logger.info(f"Applying migration {step_version}: {description}")
+        step(conn)
+        conn.exec_driver_sql(
+            "INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+            (step_version, description, datetime.utcnow().isoformat(" ")),
+        )
+        version = step_version
+    return version
@@ -1,7 +1,7 @@
 """
 Database models for the application bot.
 """
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, Enum as SQLEnum, column, table
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -46,6 +46,12 @@ class Application(Base):
     # Relationship with user
     user = relationship("User", back_populates="applications")
 
+    # Created on existing databases by migration 1 (see db/migrations.py)
+    __table_args__ = (
+        Index("ix_applications_status_created_at", "status", "created_at"),
+        Index("ix_applications_user_id_created_at", "user_id", "created_at"),
+    )
+
 
 class Admin(Base):
     """Admin model for storing additional administrators."""
@@ -56,3 +62,34 @@ class Admin(Base):
     added_by = Column(Integer, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
+
+class OutboxMessage(Base):
+    """Outgoing Telegram message waiting to be delivered by the outbox worker."""
+    __tablename__ = "outbox"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    chat_id = Column(Integer, nullable=False)
+    text = Column(Text, nullable=False)
+    reply_markup = Column(Text, nullable=True)  # InlineKeyboardMarkup as JSON
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class FsmRecord(Base):
+    """Persisted FSM state and data of one conversation."""
+    __tablename__ = "fsm_storage"
+
+    key = Column(String, primary_key=True)
+    state = Column(String, nullable=True)
+    data = Column(Text, nullable=False, default="{}")  # JSON object
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+
+# FTS5 index of application name, contact and purpose. Not part of
+# Base.metadata: created and kept in sync by migration 2 (see db/migrations.py)
+applications_fts = table(
+    "applications_fts",
+    column("rowid", Integer),
+    column("rank"),
+)
@@ -0,0 +1,265 @@
+"""
+Single writer for the SQLite database.
+SQLite allows one writer at a time, so every write of the bot is queued to
+one task that owns the only read-write connection. Writes queued while a
+transaction is running are group-committed in the next one. If one of them
+fails, the batch is rolled back and replayed with every write in its own
+savepoint, so a failing write does not undo the others.
+A WriteBatcher in front of the queue collects calls of one kind made within
+a few milliseconds and writes them as a single job, e.g. one multi-row INSERT.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from config import DB_WRITE_BATCH_SIZE
+from db.database import async_session
+from services.profiling import UpdateProfile, current_profile
+
+logger = logging.getLogger(__name__)
+
+# Coroutine function doing the writes on the given session. It must not commit
+# and may run twice, so it should build its objects and statements when called
+WriteJob = Callable[[AsyncSession], Awaitable[Any]]
+
+# Coroutine function writing a list of items and returning one result per item,
+# in the same order. The same rules as for a WriteJob apply
+BatchWriteJob = Callable[[AsyncSession, List[Any]], Awaitable[List[Any]]]
+
+
+class _PendingWrite:
+    """A queued write and the future its caller waits on."""
+
+    __slots__ = ("job", "future", "profile")
+
+    def __init__(self, job: WriteJob, future: asyncio.Future, profile: Optional[UpdateProfile]):
+        self.job = job
+        self.future = future
+        # The caller's profile, so the write's statements are counted for its update
+        self.profile = profile
+
+
+class WriteCoordinator:
+    """Queue of writes committed in batches by one writer task."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker = async_session,
+        batch_size: int = DB_WRITE_BATCH_SIZE
+    ):
+        """
+        Args:
+            session_factory: Session factory of the read-write engine
+            batch_size: Maximum number of writes per transaction
+        """
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._batchers: List["WriteBatcher"] = []
+
+        self.batches = 0
+        self.writes = 0
+        self.failed = 0
+        self.replays = 0
+        self.batch_max = 0
+
+    async def run(self, job: WriteJob) -> Any:
+        """
+        Queue a write and wait until it is committed.
+
+        Args:
+            job: Coroutine function receiving the writer session
+
+        Returns:
+            What the job returned, once its transaction is committed
+
+        Raises:
+            Whatever the job raised, or the error of the failed commit
+        """
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(_PendingWrite(job, future, current_profile.get()))
+        return await future
+
+    def _ensure_started(self):
+        """Start the writer task on first use in the running event loop."""
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._write_forever(), name="db-writer")
+
+    async def close(self):
+        """Commit everything queued so far and stop the writer task."""
+        for batcher in self._batchers:
+            await batcher.drain()
+        if self._task is None or self._task.done():
+            return
+        self._queue.put_nowait(None)
+        await self._task
+        self._task = None
+        logger.info(
+            f"Database writer: {self.writes} writes in {self.batches} transactions "
+            f"(largest {self.batch_max}), {self.failed} failed, {self.replays} batches replayed"
+        )
+
+    async def _write_forever(self):
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                pending = self._queue.get_nowait()
+                if pending is None:
+                    stopping = True
+                    break
+                batch.append(pending)
+            await self._write_batch(batch)
+
+    async def _write_batch(self, batch: List[_PendingWrite]):
+        """Run a batch of writes in one transaction and resolve their futures."""
+        try:
+            outcomes = await self._transaction(batch, savepoints=False)
+        except Exception as e:
+            if len(batch) == 1:
+                # A lone write's own error goes to its caller only
+                outcomes = [(False, e)]
+            else:
+                # Some write failed: redo the batch with each write in a savepoint
+                self.replays += 1
+                try:
+                    outcomes = await self._transaction(batch, savepoints=True)
+                except Exception as e:
+                    logger.error(f"Write transaction of {len(batch)} writes failed: {e}")
+                    outcomes = [(False, e)] * len(batch)
+
+        self.batches += 1
+        self.writes += len(batch)
+        self.batch_max = max(self.batch_max, len(batch))
+        for pending, (ok, value) in zip(batch, outcomes):
+            if pending.future.done():
+                continue  # Caller was cancelled; the write is committed anyway
+            if ok:
+                pending.future.set_result(value)
+            else:
+                self.failed += 1
+                pending.future.set_exception(value)
+
+    async def _transaction(self, batch: List[_PendingWrite], savepoints: bool) -> List[Tuple[bool, Any]]:
+        """
+        Run the writes in one transaction and commit it.
+
+        Without savepoints the first failing write aborts the transaction and
+        its error is raised; with them a failing write is rolled back alone.
+        """
+        outcomes = []
+        async with self.session_factory() as session:
+            async with session.begin():
+                for pending in batch:
+                    token = current_profile.set(pending.profile)
+                    try:
+                        if not savepoints:
+                            result = await pending.job(session)
+                            await session.flush()
+                            outcomes.append((True, result))
+                            continue
+                        try:
+                            async with session.begin_nested():
+                                result = await pending.job(session)
+                                await session.flush()
+                            outcomes.append((True, result))
+                        except Exception as e:
+                            outcomes.append((False, e))
+                    finally:
+                        current_profile.reset(token)
+        return outcomes
+
+
+class WriteBatcher:
+    """Collects items submitted within a short window and writes them in one job."""
+
+    def __init__(
+        self,
+        write_many: BatchWriteJob,
+        window: float,
+        coordinator: WriteCoordinator,
+        max_size: int = DB_WRITE_BATCH_SIZE
+    ):
+        """
+        Args:
+            write_many: Job writing a list of items
+            window: Seconds to wait for more items after the first one
+            coordinator: Write coordinator running the jobs
+            max_size: Number of items that triggers a write without waiting
+        """
+        self.write_many = write_many
+        self.window = window
+        self.coordinator = coordinator
+        self.max_size = max_size
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._writing: Set[asyncio.Task] = set()
+        coordinator._batchers.append(self)
+
+        self.jobs = 0
+        self.items = 0
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Add an item to the current batch and wait until it is committed.
+
+        The batch's statements are counted for the update that submitted
+        its first item, or its last one if the batch filled up.
+
+        Args:
+            item: Item passed to write_many
+
+        Returns:
+            The result write_many returned for this item
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    async def drain(self):
+        """Write the current batch now and wait for all batches in progress."""
+        self._flush()
+        if self._writing:
+            await asyncio.gather(*self._writing, return_exceptions=True)
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        task = asyncio.create_task(self._write(pending))
+        self._writing.add(task)
+        task.add_done_callback(self._writing.discard)
+
+    async def _write(self, pending: List[Tuple[Any, asyncio.Future]]):
+        items = [item for item, _ in pending]
+        self.jobs += 1
+        self.items += len(items)
+        try:
+            results = await self.coordinator.run(lambda session: self.write_many(session, items))
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(pending, results):
+            if not future.done():
+                future.set_result(result)
+
+
+write_coordinator = WriteCoordinator()
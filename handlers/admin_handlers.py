@@ -1,25 +1,38 @@
 """
 Admin handlers for admin panel.
 """
+import html
 import logging
+import os
+from typing import Optional, Tuple
 
 from aiogram import Bot, F, Router
+from aiogram.enums import ChatAction
 from aiogram.exceptions import TelegramBadRequest
-from aiogram.filters import Command
+from aiogram.filters import Command, CommandObject
 from aiogram.fsm.context import FSMContext
-from aiogram.types import CallbackQuery, Message
-from sqlalchemy import func, select
+from aiogram.types import CallbackQuery, FSInputFile, InlineKeyboardMarkup, Message
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from config import ADMIN_ID
 from db.manager import (
+    APPLICATIONS_PAGE_SIZE,
+    SEARCH_MAX_RANKED,
+    NoticeBuilder,
     add_admin,
     get_added_admins,
+    get_application,
+    get_application_stats,
+    get_pending_applications_page,
     is_admin,
     is_main_admin,
+    make_page_cursor,
     remove_admin,
+    search_applications,
+    update_application_status,
+    update_applications_status,
 )
-from db.models import Application, ApplicationStatus, User
+from db.models import Application, ApplicationStatus
 from keyboards.admin_kb import (
     get_admin_main_keyboard,
     get_admin_management_keyboard,
@@ -27,8 +40,11 @@ from keyboards.admin_kb import (
     get_application_actions_keyboard,
     get_applications_list_keyboard,
     get_back_to_menu_keyboard,
+    get_bulk_select_keyboard,
 )
-from locales.strings import LANG_EN, get_string
+from locales.strings import get_string
+from services.export import MAX_DOCUMENT_BYTES, export_applications, parse_export_args
+from services.outbox import outbox_worker
 from states.application_states import AdminStates
 
 router = Router()
@@ -43,16 +59,6 @@ async def safe_edit_message(message: Message, text: str, reply_markup=None):
         await message.answer(text, reply_markup=reply_markup)
 
 
-async def get_admin_language(session: AsyncSession, user_id: int = None) -> str:
-    """Get admin's language preference."""
-    target_id = user_id or ADMIN_ID
-    result = await session.execute(
-        select(User).where(User.user_id == target_id)
-    )
-    user = result.scalar_one_or_none()
-    return user.language if user else LANG_EN
-
-
 async def get_admin_display(bot: Bot, user_id: int) -> str:
     """Return display value for admin (username with @ or fallback to ID)."""
     try:
@@ -64,26 +70,29 @@ async def get_admin_display(bot: Bot, user_id: int) -> str:
     return str(user_id)
 
 
+def decision_notice(status: ApplicationStatus) -> NoticeBuilder:
+    """Return the builder of the notification telling a user about the decision on their application."""
+    key = "application_approved" if status == ApplicationStatus.APPROVED else "application_rejected"
+
+    def build(app: Application, user_language: str) -> Tuple[str, Optional[InlineKeyboardMarkup]]:
+        return get_string(user_language, key), None
+
+    return build
+
+
 @router.message(Command("admin"))
-async def cmd_admin(message: Message, session: AsyncSession):
+async def cmd_admin(message: Message, session: AsyncSession, language: str):
     """Handle /admin command."""
     user_id = message.from_user.id
     logger.info(f"Admin command received from user {user_id}, ADMIN_ID={ADMIN_ID}")
     
-    language = await get_admin_language(session, user_id)
-    
     if not await is_admin(session, user_id):
         await message.answer(get_string(language, "access_denied"))
         return
     
     try:
         # Count pending applications
-        result = await session.execute(
-            select(func.count(Application.id)).where(
-                Application.status == ApplicationStatus.PENDING
-            )
-        )
-        pending_count = result.scalar() or 0
+        pending_count = (await get_application_stats(session))["pending"]
         
         await message.answer(
             get_string(language, "admin_panel_title"),
@@ -99,22 +108,16 @@ async def cmd_admin(message: Message, session: AsyncSession):
 
 
 @router.callback_query(F.data == "admin_menu")
-async def admin_menu_callback(callback: CallbackQuery, session: AsyncSession):
+async def admin_menu_callback(callback: CallbackQuery, session: AsyncSession, language: str):
     """Handle admin menu callback."""
     user_id = callback.from_user.id
-    language = await get_admin_language(session, user_id)
     
     if not await is_admin(session, user_id):
         await callback.answer(get_string(language, "access_denied"))
         return
     
     # Count pending applications
-    result = await session.execute(
-        select(func.count(Application.id)).where(
-            Application.status == ApplicationStatus.PENDING
-        )
-    )
-    pending_count = result.scalar() or 0
+    pending_count = (await get_application_stats(session))["pending"]
     
     await safe_edit_message(
         callback.message,
@@ -128,24 +131,21 @@ async def admin_menu_callback(callback: CallbackQuery, session: AsyncSession):
     await callback.answer()
 
 
-@router.callback_query(F.data == "admin_new_apps")
-async def admin_new_apps_callback(callback: CallbackQuery, session: AsyncSession):
-    """Handle new applications list callback - shows list of pending applications."""
-    user_id = callback.from_user.id
-    language = await get_admin_language(session, user_id)
-    
-    if not await is_admin(session, user_id):
-        await callback.answer(get_string(language, "access_denied"))
-        return
-    
-    # Get pending applications
-    result = await session.execute(
-        select(Application)
-        .where(Application.status == ApplicationStatus.PENDING)
-        .order_by(Application.created_at.desc())
-        .limit(10)
+async def show_pending_applications(
+    callback: CallbackQuery,
+    session: AsyncSession,
+    language: str,
+    older_than: str = None,
+    newer_than: str = None
+):
+    """Render one page of pending applications into the callback message."""
+    applications, has_newer, has_older = await get_pending_applications_page(
+        session, older_than=older_than, newer_than=newer_than
     )
-    applications = result.scalars().all()
+    
+    if not applications and (older_than or newer_than):
+        # Page emptied out since it was linked (applications were processed)
+        applications, has_newer, has_older = await get_pending_applications_page(session)
     
     if not applications:
         await safe_edit_message(
@@ -160,16 +160,48 @@ async def admin_new_apps_callback(callback: CallbackQuery, session: AsyncSession
     await safe_edit_message(
         callback.message,
         get_string(language, "applications_list_title"),
-        reply_markup=get_applications_list_keyboard(applications, language)
+        reply_markup=get_applications_list_keyboard(
+            applications,
+            language,
+            prev_callback=f"apps_newer_{make_page_cursor(applications[0])}" if has_newer else None,
+            next_callback=f"apps_older_{make_page_cursor(applications[-1])}" if has_older else None
+        )
     )
     await callback.answer()
 
 
+@router.callback_query(F.data == "admin_new_apps")
+async def admin_new_apps_callback(callback: CallbackQuery, session: AsyncSession, language: str):
+    """Handle new applications list callback - shows list of pending applications."""
+    user_id = callback.from_user.id
+    
+    if not await is_admin(session, user_id):
+        await callback.answer(get_string(language, "access_denied"))
+        return
+    
+    await show_pending_applications(callback, session, language)
+
+
+@router.callback_query(F.data.startswith("apps_older_") | F.data.startswith("apps_newer_"))
+async def applications_page_callback(callback: CallbackQuery, session: AsyncSession, language: str):
+    """Handle next/previous page buttons of the pending applications list."""
+    user_id = callback.from_user.id
+    
+    if not await is_admin(session, user_id):
+        await callback.answer(get_string(language, "access_denied"))
+        return
+    
+    _, direction, cursor = callback.data.split("_", 2)
+    if direction == "older":
+        await show_pending_applications(callback, session, language, older_than=cursor)
+    else:
+        await show_pending_applications(callback, session, language, newer_than=cursor)
+
+
 @router.callback_query(F.data.startswith("view_app_"))
-async def view_application_callback(callback: CallbackQuery, session: AsyncSession):
+async def view_application_callback(callback: CallbackQuery, session: AsyncSession, language: str):
     """Handle viewing a specific application."""
     user_id = callback.from_user.id
-    language = await get_admin_language(session, user_id)
     
     if not await is_admin(session, user_id):
         await callback.answer(get_string(language, "access_denied"))
@@ -178,10 +210,7 @@ async def view_application_callback(callback: CallbackQuery, session: AsyncSessi
     app_id = int(callback.data.split("_")[-1])
     
     # Get application
-    result = await session.execute(
-        select(Application).where(Application.id == app_id)
-    )
-    app = result.scalar_one_or_none()
+    app = await get_application(session, app_id)
     
     if not app:
         await callback.answer(get_string(language, "app_not_found"))
@@ -204,10 +233,9 @@ async def view_application_callback(callback: CallbackQuery, session: AsyncSessi
 
 
 @router.callback_query(F.data.startswith("admin_approve_"))
-async def admin_approve_callback(callback: CallbackQuery, session: AsyncSession):
+async def admin_approve_callback(callback: CallbackQuery, session: AsyncSession, language: str):
     """Handle application approval."""
     user_id = callback.from_user.id
-    language = await get_admin_language(session, user_id)
     
     if not await is_admin(session, user_id):
         await callback.answer(get_string(language, "access_denied"))
@@ -215,67 +243,44 @@ async def admin_approve_callback(callback: CallbackQuery, session: AsyncSession)
     
     app_id = int(callback.data.split("_")[-1])
     
-    # Get application
-    result = await session.execute(
-        select(Application).where(Application.id == app_id)
+    # Update status only if still pending (one atomic compare-and-set)
+    app = await update_application_status(
+        session, app_id, ApplicationStatus.APPROVED, notice=decision_notice(ApplicationStatus.APPROVED)
     )
-    app = result.scalar_one_or_none()
     
     if not app:
-        await callback.answer(get_string(language, "app_not_found"))
+        if await get_application(session, app_id):
+            await callback.answer(get_string(language, "app_already_processed"))
+        else:
+            await callback.answer(get_string(language, "app_not_found"))
         return
     
-    if app.status != ApplicationStatus.PENDING:
-        await callback.answer(get_string(language, "app_already_processed"))
-        return
-    
-    # Update status
-    app.status = ApplicationStatus.APPROVED
-    await session.commit()
-    
-    # Get user
-    user_result = await session.execute(
-        select(User).where(User.user_id == app.user_id)
-    )
-    user = user_result.scalar_one_or_none()
-    
-    # Notify user
-    if user:
-        language = user.language or "en"
-        bot: Bot = callback.bot
-        try:
-            await bot.send_message(
-                app.user_id,
-                get_string(language, "application_approved")
-            )
-        except Exception:
-            pass  # User blocked bot or other error
+    # The user notification was queued with the status change, delivered by the outbox worker
+    outbox_worker.wake()
     
     # Update message with admin ID
-    admin_language = await get_admin_language(session)
-    approved_title = get_string(admin_language, 'app_approved_title').replace('{id}', str(app.id))
+    approved_title = get_string(language, 'app_approved_title').replace('{id}', str(app.id))
     text = (
         f"{approved_title}\n\n"
-        f"👤 <b>{get_string(admin_language, 'field_name')}:</b> {app.name}\n"
-        f"📞 <b>{get_string(admin_language, 'field_contact')}:</b> {app.contact}\n"
-        f"📄 <b>{get_string(admin_language, 'field_purpose')}:</b> {app.purpose}\n\n"
-        f"{get_string(admin_language, 'user_notified')}\n"
-        f"{get_string(admin_language, 'processed_by_admin', admin_id=callback.from_user.id)}"
+        f"👤 <b>{get_string(language, 'field_name')}:</b> {app.name}\n"
+        f"📞 <b>{get_string(language, 'field_contact')}:</b> {app.contact}\n"
+        f"📄 <b>{get_string(language, 'field_purpose')}:</b> {app.purpose}\n\n"
+        f"{get_string(language, 'user_notified')}\n"
+        f"{get_string(language, 'processed_by_admin', admin_id=callback.from_user.id)}"
     )
     
     await safe_edit_message(
         callback.message,
         text,
-        reply_markup=get_back_to_menu_keyboard(admin_language)
+        reply_markup=get_back_to_menu_keyboard(language)
     )
-    await callback.answer(get_string(admin_language, "application_approved").split("\n")[0])
+    await callback.answer(get_string(language, "application_approved").split("\n")[0])
 
 
 @router.callback_query(F.data.startswith("admin_reject_"))
-async def admin_reject_callback(callback: CallbackQuery, session: AsyncSession):
+async def admin_reject_callback(callback: CallbackQuery, session: AsyncSession, language: str):
     """Handle application rejection."""
     user_id = callback.from_user.id
-    language = await get_admin_language(session, user_id)
     
     if not await is_admin(session, user_id):
         await callback.answer(get_string(language, "access_denied"))
@@ -283,103 +288,56 @@ async def admin_reject_callback(callback: CallbackQuery, session: AsyncSession):
     
     app_id = int(callback.data.split("_")[-1])
     
-    # Get application
-    result = await session.execute(
-        select(Application).where(Application.id == app_id)
+    # Update status only if still pending (one atomic compare-and-set)
+    app = await update_application_status(
+        session, app_id, ApplicationStatus.REJECTED, notice=decision_notice(ApplicationStatus.REJECTED)
     )
-    app = result.scalar_one_or_none()
     
     if not app:
-        await callback.answer(get_string(language, "app_not_found"))
-        return
-    
-    if app.status != ApplicationStatus.PENDING:
-        await callback.answer(get_string(language, "app_already_processed"))
+        if await get_application(session, app_id):
+            await callback.answer(get_string(language, "app_already_processed"))
+        else:
+            await callback.answer(get_string(language, "app_not_found"))
         return
     
-    # Update status
-    app.status = ApplicationStatus.REJECTED
-    await session.commit()
-    
-    # Get user
-    user_result = await session.execute(
-        select(User).where(User.user_id == app.user_id)
-    )
-    user = user_result.scalar_one_or_none()
-    
-    # Notify user
-    if user:
-        language = user.language or "en"
-        bot: Bot = callback.bot
-        try:
-            await bot.send_message(
-                app.user_id,
-                get_string(language, "application_rejected")
-            )
-        except Exception:
-            pass  # User blocked bot or other error
+    # The user notification was queued with the status change, delivered by the outbox worker
+    outbox_worker.wake()
     
     # Update message with admin ID
-    admin_language = await get_admin_language(session)
-    rejected_title = get_string(admin_language, 'app_rejected_title').replace('{id}', str(app.id))
+    rejected_title = get_string(language, 'app_rejected_title').replace('{id}', str(app.id))
     text = (
         f"{rejected_title}\n\n"
-        f"👤 <b>{get_string(admin_language, 'field_name')}:</b> {app.name}\n"
-        f"📞 <b>{get_string(admin_language, 'field_contact')}:</b> {app.contact}\n"
-        f"📄 <b>{get_string(admin_language, 'field_purpose')}:</b> {app.purpose}\n\n"
-        f"{get_string(admin_language, 'user_notified')}\n"
-        f"{get_string(admin_language, 'processed_by_admin', admin_id=callback.from_user.id)}"
+        f"👤 <b>{get_string(language, 'field_name')}:</b> {app.name}\n"
+        f"📞 <b>{get_string(language, 'field_contact')}:</b> {app.contact}\n"
+        f"📄 <b>{get_string(language, 'field_purpose')}:</b> {app.purpose}\n\n"
+        f"{get_string(language, 'user_notified')}\n"
+        f"{get_string(language, 'processed_by_admin', admin_id=callback.from_user.id)}"
     )
     
     await safe_edit_message(
         callback.message,
         text,
-        reply_markup=get_back_to_menu_keyboard(admin_language)
+        reply_markup=get_back_to_menu_keyboard(language)
     )
-    await callback.answer(get_string(admin_language, "application_rejected").split("\n")[0])
+    await callback.answer(get_string(language, "application_rejected").split("\n")[0])
 
 
 @router.callback_query(F.data == "admin_stats")
-async def admin_stats_callback(callback: CallbackQuery, session: AsyncSession):
+async def admin_stats_callback(callback: CallbackQuery, session: AsyncSession, language: str):
     """Handle admin stats callback."""
     user_id = callback.from_user.id
-    language = await get_admin_language(session, user_id)
     
     if not await is_admin(session, user_id):
         await callback.answer(get_string(language, "access_denied"))
         return
     
     # Get statistics
-    total_apps = await session.execute(
-        select(func.count(Application.id))
-    )
-    total = total_apps.scalar() or 0
-    
-    pending_apps = await session.execute(
-        select(func.count(Application.id)).where(
-            Application.status == ApplicationStatus.PENDING
-        )
-    )
-    pending = pending_apps.scalar() or 0
-    
-    approved_apps = await session.execute(
-        select(func.count(Application.id)).where(
-            Application.status == ApplicationStatus.APPROVED
-        )
-    )
-    approved = approved_apps.scalar() or 0
-    
-    rejected_apps = await session.execute(
-        select(func.count(Application.id)).where(
-            Application.status == ApplicationStatus.REJECTED
-        )
-    )
-    rejected = rejected_apps.scalar() or 0
-    
-    total_users = await session.execute(
-        select(func.count(User.user_id))
-    )
-    users = total_users.scalar() or 0
+    stats = await get_application_stats(session)
+    total = stats["total"]
+    pending = stats["pending"]
+    approved = stats["approved"]
+    rejected = stats["rejected"]
+    users = stats["users"]
     
     # Calculate percentages
     approval_rate = (approved / total * 100) if total > 0 else 0
@@ -407,22 +365,301 @@ async def admin_stats_callback(callback: CallbackQuery, session: AsyncSession):
     await callback.answer()
 
 
+@router.message(Command("export"))
+async def cmd_export(message: Message, command: CommandObject, session: AsyncSession, language: str):
+    """Handle /export command - send matching applications as a CSV or JSONL file."""
+    user_id = message.from_user.id
+    
+    if not await is_admin(session, user_id):
+        await message.answer(get_string(language, "access_denied"))
+        return
+    
+    try:
+        options = parse_export_args(command.args)
+    except ValueError:
+        await message.answer(get_string(language, "export_usage"))
+        return
+    
+    await message.bot.send_chat_action(message.chat.id, ChatAction.UPLOAD_DOCUMENT)
+    try:
+        path, rows = await export_applications(options)
+    except Exception as e:
+        logger.error(f"Error exporting applications for admin {user_id}: {e}", exc_info=True)
+        await message.answer(get_string(language, "export_error"))
+        return
+    
+    try:
+        if rows == 0:
+            await message.answer(get_string(language, "export_empty"))
+        elif os.path.getsize(path) > MAX_DOCUMENT_BYTES:
+            await message.answer(get_string(language, "export_too_large"))
+        else:
+            # Uploaded from disk in chunks, never read into memory at once
+            await message.answer_document(
+                FSInputFile(path, filename=options.filename),
+                caption=get_string(language, "export_caption", rows=rows)
+            )
+    finally:
+        os.remove(path)
+
+
+async def render_search_results(
+    session: AsyncSession,
+    language: str,
+    query: str,
+    page: int
+) -> Tuple[str, InlineKeyboardMarkup]:
+    """Build the text and keyboard of one page of search results."""
+    applications, has_more, truncated = await search_applications(session, query, page)
+    if not applications:
+        return (
+            get_string(language, "search_no_results", query=html.escape(query)),
+            get_back_to_menu_keyboard(language)
+        )
+    
+    text = get_string(language, "search_results_title", query=html.escape(query), page=page + 1)
+    if truncated:
+        # Older matches are not searched, the admin has to narrow the query to reach them
+        text += "\n\n" + get_string(language, "search_truncated", count=SEARCH_MAX_RANKED)
+    return (
+        text,
+        get_applications_list_keyboard(
+            applications,
+            language,
+            prev_callback=f"search_page_{page - 1}" if page > 0 else None,
+            next_callback=f"search_page_{page + 1}" if has_more else None,
+            first_number=page * APPLICATIONS_PAGE_SIZE + 1,
+            bulk_select=False,
+            page_labels=("btn_prev_results", "btn_next_results")
+        )
+    )
+
+
+@router.message(Command("search"))
+async def cmd_search(
+    message: Message,
+    command: CommandObject,
+    session: AsyncSession,
+    state: FSMContext,
+    language: str
+):
+    """Handle /search command - full-text search over applications."""
+    user_id = message.from_user.id
+    
+    if not await is_admin(session, user_id):
+        await message.answer(get_string(language, "access_denied"))
+        return
+    
+    query = (command.args or "").strip()
+    if not query:
+        await message.answer(get_string(language, "search_usage"))
+        return
+    
+    # Kept for the page buttons, callback data is too short for the query
+    await state.update_data(search_query=query)
+    text, keyboard = await render_search_results(session, language, query, 0)
+    await message.answer(text, reply_markup=keyboard)
+
+
+@router.callback_query(F.data.startswith("search_page_"))
+async def search_page_callback(callback: CallbackQuery, session: AsyncSession, state: FSMContext, language: str):
+    """Handle next/previous page buttons of the search results."""
+    user_id = callback.from_user.id
+    
+    if not await is_admin(session, user_id):
+        await callback.answer(get_string(language, "access_denied"))
+        return
+    
+    query = (await state.get_data()).get("search_query")
+    if not query:
+        await callback.answer(get_string(language, "search_expired"))
+        return
+    
+    page = int(callback.data.split("_")[-1])
+    text, keyboard = await render_search_results(session, language, query, page)
+    await safe_edit_message(callback.message, text, reply_markup=keyboard)
+    await callback.answer()
+
+
 @router.callback_query(F.data == "admin_exit")
-async def admin_exit_callback(callback: CallbackQuery, session: AsyncSession):
+async def admin_exit_callback(callback: CallbackQuery, language: str):
     """Handle admin exit callback."""
-    language = await get_admin_language(session, callback.from_user.id)
     await callback.message.delete()
     await callback.answer(get_string(language, "admin_panel_closed"))
 
 
+# ============== Bulk Review Handlers ==============
+
+# FSM data keys of the multi-select mode
+BULK_DATA_KEYS = ("bulk_selected", "bulk_page", "bulk_page_ids")
+
+
+async def show_bulk_selection(
+    callback: CallbackQuery,
+    session: AsyncSession,
+    state: FSMContext,
+    language: str,
+    page: dict = None
+):
+    """
+    Render one page of pending applications in multi-select mode.
+
+    Args:
+        callback: Callback query whose message is edited
+        session: Database session
+        state: Admin's FSM context holding the selection
+        language: Admin language code
+        page: Keyword arguments of get_pending_applications_page for the page
+            to show, None to show the page shown last
+    """
+    data = await state.get_data()
+    if page is None:
+        page = data.get("bulk_page", {})
+    selected = set(data.get("bulk_selected", []))
+
+    applications, has_newer, has_older = await get_pending_applications_page(session, **page)
+    if not applications and page:
+        # Page emptied out since it was linked (applications were processed)
+        page = {}
+        applications, has_newer, has_older = await get_pending_applications_page(session)
+    await state.update_data(bulk_page=page, bulk_page_ids=[app.id for app in applications])
+
+    await safe_edit_message(
+        callback.message,
+        get_string(language, "bulk_select_title", count=len(selected)),
+        reply_markup=get_bulk_select_keyboard(
+            applications,
+            selected,
+            language,
+            prev_callback=f"bulk_newer_{make_page_cursor(applications[0])}" if has_newer else None,
+            next_callback=f"bulk_older_{make_page_cursor(applications[-1])}" if has_older else None
+        )
+    )
+    await callback.answer()
+
+
+async def clear_bulk_selection(state: FSMContext):
+    """Leave multi-select mode, keeping any other FSM data."""
+    data = await state.get_data()
+    for key in BULK_DATA_KEYS:
+        data.pop(key, None)
+    await state.set_data(data)
+
+
+@router.callback_query(F.data == "bulk_start")
+async def bulk_start_callback(callback: CallbackQuery, session: AsyncSession, state: FSMContext, language: str):
+    """Handle select several button - switch the pending list to multi-select mode."""
+    user_id = callback.from_user.id
+    
+    if not await is_admin(session, user_id):
+        await callback.answer(get_string(language, "access_denied"))
+        return
+    
+    await state.update_data(bulk_selected=[])
+    await show_bulk_selection(callback, session, state, language, page={})
+
+
+@router.callback_query(F.data.startswith("bulk_older_") | F.data.startswith("bulk_newer_"))
+async def bulk_page_callback(callback: CallbackQuery, session: AsyncSession, state: FSMContext, language: str):
+    """Handle next/previous page buttons in multi-select mode, keeping the selection."""
+    user_id = callback.from_user.id
+    
+    if not await is_admin(session, user_id):
+        await callback.answer(get_string(language, "access_denied"))
+        return
+    
+    _, direction, cursor = callback.data.split("_", 2)
+    page = {"older_than": cursor} if direction == "older" else {"newer_than": cursor}
+    await show_bulk_selection(callback, session, state, language, page=page)
+
+
+@router.callback_query(F.data.startswith("bulk_toggle_") | (F.data == "bulk_page_all"))
+async def bulk_toggle_callback(callback: CallbackQuery, session: AsyncSession, state: FSMContext, language: str):
+    """Handle checkbox toggles of one application or of the whole page."""
+    user_id = callback.from_user.id
+    
+    if not await is_admin(session, user_id):
+        await callback.answer(get_string(language, "access_denied"))
+        return
+    
+    data = await state.get_data()
+    selected = set(data.get("bulk_selected", []))
+    if callback.data == "bulk_page_all":
+        page_ids = set(data.get("bulk_page_ids", []))
+        # Select the whole page, or clear it if it is already fully selected
+        if page_ids <= selected:
+            selected -= page_ids
+        else:
+            selected |= page_ids
+    else:
+        selected ^= {int(callback.data.split("_")[-1])}
+    
+    await state.update_data(bulk_selected=sorted(selected))
+    await show_bulk_selection(callback, session, state, language)
+
+
+@router.callback_query(F.data == "bulk_cancel")
+async def bulk_cancel_callback(callback: CallbackQuery, session: AsyncSession, state: FSMContext, language: str):
+    """Handle cancel selection button - back to the plain pending list."""
+    user_id = callback.from_user.id
+    
+    if not await is_admin(session, user_id):
+        await callback.answer(get_string(language, "access_denied"))
+        return
+    
+    await clear_bulk_selection(state)
+    await show_pending_applications(callback, session, language)
+
+
+@router.callback_query(F.data.in_({"bulk_approve", "bulk_reject"}))
+async def bulk_decision_callback(callback: CallbackQuery, session: AsyncSession, state: FSMContext, language: str):
+    """Handle bulk approval or rejection of the selected applications."""
+    user_id = callback.from_user.id
+    
+    if not await is_admin(session, user_id):
+        await callback.answer(get_string(language, "access_denied"))
+        return
+    
+    selected = (await state.get_data()).get("bulk_selected", [])
+    if not selected:
+        await callback.answer(get_string(language, "bulk_nothing_selected"))
+        return
+    
+    approve = callback.data == "bulk_approve"
+    status = ApplicationStatus.APPROVED if approve else ApplicationStatus.REJECTED
+    
+    # One compare-and-set UPDATE for the whole selection, queueing the user notifications with it
+    apps = await update_applications_status(session, selected, status, notice=decision_notice(status))
+    await clear_bulk_selection(state)
+    
+    # Delivered by the outbox worker at the Bot API rate limit
+    if apps:
+        outbox_worker.wake()
+    
+    text = get_string(language, "bulk_approved" if approve else "bulk_rejected", count=len(apps))
+    skipped = len(selected) - len(apps)
+    if skipped:
+        text += "\n" + get_string(language, "bulk_skipped", count=skipped)
+    text += (
+        f"\n\n{get_string(language, 'users_notified')}\n"
+        f"{get_string(language, 'processed_by_admin', admin_id=user_id)}"
+    )
+    
+    await safe_edit_message(
+        callback.message,
+        text,
+        reply_markup=get_back_to_menu_keyboard(language)
+    )
+    await callback.answer()
+
+
 # ============== Admin Management Handlers ==============
 
 
 @router.callback_query(F.data == "admin_manage")
-async def admin_manage_callback(callback: CallbackQuery, session: AsyncSession):
+async def admin_manage_callback(callback: CallbackQuery, session: AsyncSession, language: str):
     """Handle admin management menu."""
     user_id = callback.from_user.id
-    language = await get_admin_language(session, user_id)
     
     if not await is_main_admin(user_id):
         await callback.answer(get_string(language, "access_denied"))
@@ -452,10 +689,9 @@ async def admin_manage_callback(callback: CallbackQuery, session: AsyncSession):
 
 
 @router.callback_query(F.data == "admin_add")
-async def admin_add_callback(callback: CallbackQuery, session: AsyncSession, state: FSMContext):
+async def admin_add_callback(callback: CallbackQuery, session: AsyncSession, state: FSMContext, language: str):
     """Handle add admin button - request user ID."""
     user_id = callback.from_user.id
-    language = await get_admin_language(session, user_id)
     
     if not await is_main_admin(user_id):
         await callback.answer(get_string(language, "access_denied"))
@@ -470,10 +706,9 @@ async def admin_add_callback(callback: CallbackQuery, session: AsyncSession, sta
 
 
 @router.message(AdminStates.waiting_for_admin_id)
-async def process_admin_id(message: Message, session: AsyncSession, state: FSMContext):
+async def process_admin_id(message: Message, session: AsyncSession, state: FSMContext, language: str):
     """Process admin ID input."""
     user_id = message.from_user.id
-    language = await get_admin_language(session, user_id)
     
     if not await is_main_admin(user_id):
         await state.clear()
@@ -502,10 +737,9 @@ async def process_admin_id(message: Message, session: AsyncSession, state: FSMCo
 
 
 @router.callback_query(F.data == "admin_remove")
-async def admin_remove_callback(callback: CallbackQuery, session: AsyncSession):
+async def admin_remove_callback(callback: CallbackQuery, session: AsyncSession, language: str):
     """Handle remove admin button - show list of admins to remove."""
     user_id = callback.from_user.id
-    language = await get_admin_language(session, user_id)
     
     if not await is_main_admin(user_id):
         await callback.answer(get_string(language, "access_denied"))
@@ -530,10 +764,9 @@ async def admin_remove_callback(callback: CallbackQuery, session: AsyncSession):
 
 
 @router.callback_query(F.data.startswith("admin_remove_"))
-async def admin_remove_confirm_callback(callback: CallbackQuery, session: AsyncSession):
+async def admin_remove_confirm_callback(callback: CallbackQuery, session: AsyncSession, language: str):
     """Handle admin removal confirmation."""
     user_id = callback.from_user.id
-    language = await get_admin_language(session, user_id)
     
     if not await is_main_admin(user_id):
         await callback.answer(get_string(language, "access_denied"))
@@ -548,7 +781,7 @@ async def admin_remove_confirm_callback(callback: CallbackQuery, session: AsyncS
             get_string(language, "admin_removed", user_id=display)
         )
         # Return to admin management
-        await admin_manage_callback(callback, session)
+        await admin_manage_callback(callback, session, language)
     else:
         await callback.answer(get_string(language, "admin_not_found"))
 
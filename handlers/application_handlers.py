@@ -3,21 +3,20 @@ Handlers for application submission process.
 """
 import logging
 import re
-from datetime import datetime
+from typing import Tuple
 
-from aiogram import Bot, F, Router
+from aiogram import F, Router
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
-from aiogram.types import CallbackQuery, Message, ReplyKeyboardRemove
-from sqlalchemy import select
+from aiogram.types import CallbackQuery, InlineKeyboardMarkup, Message, ReplyKeyboardRemove
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from config import ADMIN_ID
-from db.manager import get_all_admins, get_user
-from db.models import Application, ApplicationStatus, User
+from db.manager import create_application
+from db.models import Application, User
 from keyboards.admin_kb import get_application_actions_keyboard
 from keyboards.user_kb import get_cancel_keyboard, get_contact_step_keyboard
-from locales.strings import LANG_EN, get_string
+from locales.strings import get_string
+from services.outbox import outbox_worker
 from states.application_states import ApplicationSteps
 
 logger = logging.getLogger(__name__)
@@ -28,22 +27,26 @@ EMAIL_REGEX = re.compile(r"^[\w\.-]+@[\w\.-]+\.\w{2,}$")
 USERNAME_REGEX = re.compile(r"^@?[A-Za-z0-9_]{5,32}$")
 
 
-async def get_admin_language(session: AsyncSession) -> str:
-    """Get admin's language preference."""
-    result = await session.execute(
-        select(User).where(User.user_id == ADMIN_ID)
-    )
-    user = result.scalar_one_or_none()
-    return user.language if user else LANG_EN
-
 router = Router()
 
 
+def new_application_notice(application: Application, admin_language: str) -> Tuple[str, InlineKeyboardMarkup]:
+    """Build the notification telling an admin about a new application."""
+    admin_text = (
+        f"{get_string(admin_language, 'new_application_title').replace('{id}', str(application.id))}\n\n"
+        f"👤 <b>{get_string(admin_language, 'field_name')}:</b> {application.name}\n"
+        f"📞 <b>{get_string(admin_language, 'field_contact')}:</b> {application.contact}\n"
+        f"📄 <b>{get_string(admin_language, 'field_purpose')}:</b> {application.purpose}\n\n"
+        f"🕐 <b>{get_string(admin_language, 'field_submitted')}:</b> {application.created_at.strftime('%Y-%m-%d %H:%M:%S')}"
+    )
+    return admin_text, get_application_actions_keyboard(application.id, admin_language)
+
+
 @router.callback_query(F.data == "continue_with_telegram", ApplicationSteps.contact)
 async def process_telegram_contact(
     callback: CallbackQuery,
     state: FSMContext,
-    session: AsyncSession
+    language: str
 ):
     """
     Handle 'Continue with Telegram' button press.
@@ -52,13 +55,6 @@ async def process_telegram_contact(
     user_id = callback.from_user.id
     username = callback.from_user.username
 
-    # Get user language
-    result = await session.execute(
-        select(User).where(User.user_id == user_id)
-    )
-    user = result.scalar_one_or_none()
-    language = user.language if user else LANG_EN
-
     # Use username if available, otherwise use user ID
     contact_value = f"@{username}" if username else f"tg://user?id={user_id}"
 
@@ -71,25 +67,8 @@ async def process_telegram_contact(
 
 
 @router.message(Command("apply"))
-async def cmd_apply(message: Message, state: FSMContext, session: AsyncSession):
+async def cmd_apply(message: Message, state: FSMContext, language: str):
     """Start application submission process."""
-    user_id = message.from_user.id
-    
-    # Get user
-    result = await session.execute(
-        select(User).where(User.user_id == user_id)
-    )
-    user = result.scalar_one_or_none()
-    
-    if not user:
-        # Create user if doesn't exist
-        user = User(user_id=user_id, language=LANG_EN)
-        session.add(user)
-        await session.commit()
-        await session.refresh(user)
-    
-    language = user.language or LANG_EN
-    
     await state.set_state(ApplicationSteps.name)
     await message.answer(
         get_string(language, "apply_start"),
@@ -98,17 +77,8 @@ async def cmd_apply(message: Message, state: FSMContext, session: AsyncSession):
 
 
 @router.message(ApplicationSteps.name)
-async def process_name(message: Message, state: FSMContext, session: AsyncSession):
+async def process_name(message: Message, state: FSMContext, language: str):
     """Process user name input."""
-    user_id = message.from_user.id
-    
-    # Get user
-    result = await session.execute(
-        select(User).where(User.user_id == user_id)
-    )
-    user = result.scalar_one_or_none()
-    language = user.language if user else LANG_EN
-    
     # Check for cancel
     if message.text == get_string(language, "cancel"):
         await state.clear()
@@ -135,17 +105,8 @@ async def process_name(message: Message, state: FSMContext, session: AsyncSessio
 
 
 @router.message(ApplicationSteps.contact)
-async def process_contact(message: Message, state: FSMContext, session: AsyncSession):
+async def process_contact(message: Message, state: FSMContext, language: str):
     """Process contact information input."""
-    user_id = message.from_user.id
-    
-    # Get user
-    result = await session.execute(
-        select(User).where(User.user_id == user_id)
-    )
-    user = result.scalar_one_or_none()
-    language = user.language if user else LANG_EN
-    
     # Check for cancel
     if message.text == get_string(language, "cancel"):
         await state.clear()
@@ -174,23 +135,15 @@ async def process_contact(message: Message, state: FSMContext, session: AsyncSes
 
 
 @router.message(ApplicationSteps.purpose)
-async def process_purpose(message: Message, state: FSMContext, session: AsyncSession, bot: Bot):
+async def process_purpose(
+    message: Message,
+    state: FSMContext,
+    session: AsyncSession,
+    user: User,
+    language: str
+):
     """Process purpose input and save application."""
-    user_id = message.from_user.id
-    
-    # Get user
-    result = await session.execute(
-        select(User).where(User.user_id == user_id)
-    )
-    user = result.scalar_one_or_none()
-    
-    if not user:
-        user = User(user_id=user_id, language=LANG_EN)
-        session.add(user)
-        await session.commit()
-        await session.refresh(user)
-    
-    language = user.language or LANG_EN
+    user_id = user.user_id
     
     # Check for cancel
     if message.text == get_string(language, "cancel"):
@@ -212,49 +165,21 @@ async def process_purpose(message: Message, state: FSMContext, session: AsyncSes
     # Get all data
     data = await state.get_data()
     
-    # Create application
-    application = Application(
-        user_id=user_id,
+    # Create application, queueing the admin notifications in the same transaction
+    await create_application(
+        session,
+        user_id,
         name=data["name"],
         contact=data["contact"],
         purpose=message.text.strip(),
-        status=ApplicationStatus.PENDING
+        admin_notice=new_application_notice
     )
-    session.add(application)
-    
-    # Update user's last submission time
-    user.last_submission_time = datetime.utcnow()
-    
-    await session.commit()
-    await session.refresh(application)
     await state.clear()
     
-    # Notify all admins about new application
-    try:
-        admin_ids = await get_all_admins(session)
-        for admin_id in admin_ids:
-            try:
-                admin_user = await get_user(session, admin_id)
-                admin_language = admin_user.language if admin_user else LANG_EN
-                admin_text = (
-                    f"{get_string(admin_language, 'new_application_title').replace('{id}', str(application.id))}\n\n"
-                    f"👤 <b>{get_string(admin_language, 'field_name')}:</b> {application.name}\n"
-                    f"📞 <b>{get_string(admin_language, 'field_contact')}:</b> {application.contact}\n"
-                    f"📄 <b>{get_string(admin_language, 'field_purpose')}:</b> {application.purpose}\n\n"
-                    f"🕐 <b>{get_string(admin_language, 'field_submitted')}:</b> {application.created_at.strftime('%Y-%m-%d %H:%M:%S')}"
-                )
-                await bot.send_message(
-                    admin_id,
-                    admin_text,
-                    reply_markup=get_application_actions_keyboard(application.id, admin_language)
-                )
-            except Exception:
-                pass  # Admin blocked bot or other error
-    except Exception as e:
-        logger.error(f"Failed to notify admins about new application: {e}", exc_info=True)
-    
     await message.answer(
         get_string(language, "application_received"),
         reply_markup=ReplyKeyboardRemove()
     )
-
+    
+    # Delivered by the outbox worker
+    outbox_worker.wake()
@@ -5,34 +5,18 @@ This router should be registered last to not interfere with other handlers.
 from aiogram import F, Router
 from aiogram.fsm.context import FSMContext
 from aiogram.types import Message, ReplyKeyboardRemove
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from db.models import User
-from locales.strings import LANG_EN, get_string
+from locales.strings import AVAILABLE_LANGUAGES, get_string
 
 router = Router()
 
+# Cancel button text in every language
+CANCEL_TEXTS = {get_string(lang, "cancel") for lang in AVAILABLE_LANGUAGES}
 
-@router.message(F.text)
-async def handle_cancel_button(message: Message, state: FSMContext, session: AsyncSession):
+
+@router.message(F.text.in_(CANCEL_TEXTS))
+async def handle_cancel_button(message: Message, state: FSMContext, language: str):
     """Handle cancel button press globally."""
-    user_id = message.from_user.id
-    
-    # Get user language
-    result = await session.execute(
-        select(User).where(User.user_id == user_id)
-    )
-    user = result.scalar_one_or_none()
-    language = user.language if user else LANG_EN
-    
-    # Check if message text matches cancel button in any language
-    cancel_text_en = get_string("en", "cancel")
-    cancel_text_ru = get_string("ru", "cancel")
-    
-    if message.text not in [cancel_text_en, cancel_text_ru]:
-        return  # Not a cancel button, let other handlers process it
-    
     # Check if user is in any FSM state
     current_state = await state.get_state()
     
@@ -49,4 +33,3 @@ async def handle_cancel_button(message: Message, state: FSMContext, session: Asy
             "👌",
             reply_markup=ReplyKeyboardRemove()
         )
-
@@ -1,7 +1,7 @@
 """
 Admin keyboards for admin panel.
 """
-from typing import List
+from typing import List, Optional, Set, Tuple
 
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
@@ -54,25 +54,54 @@ def get_admin_main_keyboard(
 
 def get_applications_list_keyboard(
     applications: List,
-    language: str = "en"
+    language: str = "en",
+    prev_callback: Optional[str] = None,
+    next_callback: Optional[str] = None,
+    first_number: int = 1,
+    bulk_select: bool = True,
+    page_labels: Tuple[str, str] = ("btn_prev_page", "btn_next_page")
 ) -> InlineKeyboardMarkup:
     """
-    Get keyboard with list of pending applications.
+    Get keyboard with list of applications.
 
     Args:
         applications: List of Application objects
         language: Admin language code
+        prev_callback: Callback data of the previous page button, None to hide it
+        next_callback: Callback data of the next page button, None to hide it
+        first_number: Number shown next to the first application
+        bulk_select: Show the button switching the pending list to multi-select mode
+        page_labels: String keys of the previous and next page buttons
 
     Returns:
         Inline keyboard with application list
     """
     buttons = []
-    for i, app in enumerate(applications, 1):
+    for i, app in enumerate(applications, first_number):
         buttons.append([InlineKeyboardButton(
             text=get_string(language, "app_list_item", num=i, name=app.name[:20]),
             callback_data=f"view_app_{app.id}"
         )])
 
+    navigation = []
+    if prev_callback:
+        navigation.append(InlineKeyboardButton(
+            text=get_string(language, page_labels[0]),
+            callback_data=prev_callback
+        ))
+    if next_callback:
+        navigation.append(InlineKeyboardButton(
+            text=get_string(language, page_labels[1]),
+            callback_data=next_callback
+        ))
+    if navigation:
+        buttons.append(navigation)
+
+    if bulk_select:
+        buttons.append([InlineKeyboardButton(
+            text=get_string(language, "btn_select_several"),
+            callback_data="bulk_start"
+        )])
     buttons.append([InlineKeyboardButton(
         text=get_string(language, "btn_back_to_menu"),
         callback_data="admin_menu"
@@ -81,6 +110,74 @@ def get_applications_list_keyboard(
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
 
+def get_bulk_select_keyboard(
+    applications: List,
+    selected: Set[int],
+    language: str = "en",
+    prev_callback: Optional[str] = None,
+    next_callback: Optional[str] = None
+) -> InlineKeyboardMarkup:
+    """
+    Get keyboard of the pending applications list in multi-select mode.
+
+    Args:
+        applications: List of Application objects on the page
+        selected: IDs of the selected applications, on any page
+        language: Admin language code
+        prev_callback: Callback data of the previous page button, None to hide it
+        next_callback: Callback data of the next page button, None to hide it
+
+    Returns:
+        Inline keyboard with checkbox toggles and bulk actions
+    """
+    buttons = []
+    for i, app in enumerate(applications, 1):
+        mark = "☑️" if app.id in selected else "⬜"
+        buttons.append([InlineKeyboardButton(
+            text=f"{mark} {get_string(language, 'app_list_item', num=i, name=app.name[:20])}",
+            callback_data=f"bulk_toggle_{app.id}"
+        )])
+
+    if applications:
+        buttons.append([InlineKeyboardButton(
+            text=get_string(language, "btn_select_page"),
+            callback_data="bulk_page_all"
+        )])
+
+    navigation = []
+    if prev_callback:
+        navigation.append(InlineKeyboardButton(
+            text=get_string(language, "btn_prev_page"),
+            callback_data=prev_callback
+        ))
+    if next_callback:
+        navigation.append(InlineKeyboardButton(
+            text=get_string(language, "btn_next_page"),
+            callback_data=next_callback
+        ))
+    if navigation:
+        buttons.append(navigation)
+
+    if selected:
+        buttons.append([
+            InlineKeyboardButton(
+                text=get_string(language, "btn_bulk_approve", count=len(selected)),
+                callback_data="bulk_approve"
+            ),
+            InlineKeyboardButton(
+                text=get_string(language, "btn_bulk_reject", count=len(selected)),
+                callback_data="bulk_reject"
+            )
+        ])
+
+    buttons.append([InlineKeyboardButton(
+        text=get_string(language, "btn_cancel_selection"),
+        callback_data="bulk_cancel"
+    )])
+
+    return InlineKeyboardMarkup(inline_keyboard=buttons)
+
+
 def get_application_actions_keyboard(application_id: int, language: str = "en") -> InlineKeyboardMarkup:
     """
     Get keyboard for application actions (approve/reject).
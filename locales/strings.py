@@ -91,6 +91,7 @@ STRINGS: Dict[str, Dict[str, str]] = {
         "app_rejected_title": "❌ <b>Application #{id} Rejected</b>",
         "new_application_title": "📋 <b>New Application #{id}</b>",
         "user_notified": "User has been notified.",
+        "users_notified": "Users have been notified.",
         "bot_statistics": "📊 <b>Bot Statistics</b>",
         "users_overview": "👥 <b>Users Overview</b>",
         "total_registered_users": "Total registered users:",
@@ -114,6 +115,15 @@ STRINGS: Dict[str, Dict[str, str]] = {
         "btn_reject": "❌ Reject",
         "btn_back_to_list": "🔙 Back to List",
         "btn_back_to_menu": "🔙 Back to Menu",
+        "btn_prev_page": "⬅️ Newer",
+        "btn_next_page": "Older ➡️",
+        "btn_prev_results": "⬅️ Previous",
+        "btn_next_results": "Next ➡️",
+        "btn_select_several": "☑️ Select Several",
+        "btn_select_page": "☑️ Select/Unselect Page",
+        "btn_bulk_approve": "✅ Approve ({count})",
+        "btn_bulk_reject": "❌ Reject ({count})",
+        "btn_cancel_selection": "🔙 Cancel Selection",
         
         # User buttons
         "btn_continue_telegram": "📱 Continue with Telegram",
@@ -121,12 +131,21 @@ STRINGS: Dict[str, Dict[str, str]] = {
         # Admin welcome
         "admin_welcome": "🔐 <b>Admin Notice</b>\n\n"
                          "You have administrator privileges.\n"
-                         "Use /admin to open the admin panel.",
+                         "Use /admin to open the admin panel.\n"
+                         "Use /export to download applications as a file.\n"
+                         "Use /search to find applications by name, contact or purpose.",
         
         # Applications list
         "applications_list_title": "📋 <b>Pending Applications</b>\n\n"
                                    "Select an application to review:",
         "app_list_item": "{num}. {name}",
+        "bulk_select_title": "☑️ <b>Select Applications</b>\n\n"
+                             "Tap applications to select them, then approve or reject them all at once.\n"
+                             "Selected: <b>{count}</b>",
+        "bulk_nothing_selected": "Select at least one application.",
+        "bulk_approved": "✅ <b>Applications approved: {count}</b>",
+        "bulk_rejected": "❌ <b>Applications rejected: {count}</b>",
+        "bulk_skipped": "Already processed and skipped: {count}.",
         "view_app_title": "📋 <b>Application #{id}</b>",
         "processed_by_admin": "Processed by Admin ID: {admin_id}",
         
@@ -150,6 +169,26 @@ STRINGS: Dict[str, Dict[str, str]] = {
         "admin_invalid_id": "⚠️ Invalid User ID. Please enter a valid number.",
         "admin_cannot_remove_main": "⚠️ Cannot remove the main administrator.",
         "admin_not_found": "⚠️ Administrator not found.",
+
+        # Export
+        "export_usage": "📤 <b>Export Applications</b>\n\n"
+                        "<code>/export [csv|jsonl] [pending|approved|rejected|all] [FROM] [TO] [gz]</code>\n\n"
+                        "Dates are YYYY-MM-DD, both inclusive. Example:\n"
+                        "<code>/export jsonl approved 2024-01-01 2024-01-31 gz</code>",
+        "export_caption": "📤 Applications: {rows}",
+        "export_empty": "📤 No applications match these filters.",
+        "export_too_large": "⚠️ The export is larger than 50 MB. Add <code>gz</code> or narrow the filters.",
+        "export_error": "❌ An error occurred while exporting applications. Please try again.",
+
+        # Search
+        "search_usage": "🔍 <b>Search Applications</b>\n\n"
+                        "<code>/search WORDS</code>\n\n"
+                        "Finds applications by name, contact or purpose. Words may be cut short, "
+                        "e.g. <code>/search jo smi</code> finds John Smith.",
+        "search_results_title": "🔍 <b>Search: {query}</b>\n\nPage {page}, best matches first:",
+        "search_no_results": "🔍 Nothing found for <b>{query}</b>.",
+        "search_truncated": "⚠️ Only the {count} newest matches are shown. Add words to find older applications.",
+        "search_expired": "Search again with /search.",
     },
     LANG_RU: {
         # Welcome and start
@@ -226,6 +265,7 @@ STRINGS: Dict[str, Dict[str, str]] = {
         "app_rejected_title": "❌ <b>Заявка #{id} отклонена</b>",
         "new_application_title": "📋 <b>Новая заявка #{id}</b>",
         "user_notified": "Пользователь уведомлен.",
+        "users_notified": "Пользователи уведомлены.",
         "bot_statistics": "📊 <b>Статистика бота</b>",
         "users_overview": "👥 <b>Обзор пользователей</b>",
         "total_registered_users": "Всего зарегистрированных пользователей:",
@@ -249,6 +289,15 @@ STRINGS: Dict[str, Dict[str, str]] = {
         "btn_reject": "❌ Отклонить",
         "btn_back_to_list": "🔙 Назад к списку",
         "btn_back_to_menu": "🔙 Назад в меню",
+        "btn_prev_page": "⬅️ Новее",
+        "btn_next_page": "Старше ➡️",
+        "btn_prev_results": "⬅️ Назад",
+        "btn_next_results": "Далее ➡️",
+        "btn_select_several": "☑️ Выбрать несколько",
+        "btn_select_page": "☑️ Выбрать/снять страницу",
+        "btn_bulk_approve": "✅ Одобрить ({count})",
+        "btn_bulk_reject": "❌ Отклонить ({count})",
+        "btn_cancel_selection": "🔙 Отменить выбор",
         
         # User buttons
         "btn_continue_telegram": "📱 Продолжить с Telegram",
@@ -256,12 +305,21 @@ STRINGS: Dict[str, Dict[str, str]] = {
         # Admin welcome
         "admin_welcome": "🔐 <b>Уведомление для администратора</b>\n\n"
                          "У вас есть права администратора.\n"
-                         "Используйте /admin для открытия панели управления.",
+                         "Используйте /admin для открытия панели управления.\n"
+                         "Используйте /export, чтобы скачать заявки файлом.\n"
+                         "Используйте /search, чтобы найти заявки по имени, контакту или цели.",
         
         # Applications list
         "applications_list_title": "📋 <b>Ожидающие заявки</b>\n\n"
                                    "Выберите заявку для просмотра:",
         "app_list_item": "{num}. {name}",
+        "bulk_select_title": "☑️ <b>Выбор заявок</b>\n\n"
+                             "Нажимайте на заявки, чтобы выбрать их, затем одобрите или отклоните все сразу.\n"
+                             "Выбрано: <b>{count}</b>",
+        "bulk_nothing_selected": "Выберите хотя бы одну заявку.",
+        "bulk_approved": "✅ <b>Одобрено заявок: {count}</b>",
+        "bulk_rejected": "❌ <b>Отклонено заявок: {count}</b>",
+        "bulk_skipped": "Уже обработаны и пропущены: {count}.",
         "view_app_title": "📋 <b>Заявка #{id}</b>",
         "processed_by_admin": "Обработано администратором ID: {admin_id}",
         
@@ -285,6 +343,26 @@ STRINGS: Dict[str, Dict[str, str]] = {
         "admin_invalid_id": "⚠️ Неверный User ID. Введите корректное число.",
         "admin_cannot_remove_main": "⚠️ Невозможно удалить главного администратора.",
         "admin_not_found": "⚠️ Администратор не найден.",
+
+        # Export
+        "export_usage": "📤 <b>Выгрузка заявок</b>\n\n"
+                        "<code>/export [csv|jsonl] [pending|approved|rejected|all] [С] [ПО] [gz]</code>\n\n"
+                        "Даты в формате YYYY-MM-DD, обе включительно. Пример:\n"
+                        "<code>/export jsonl approved 2024-01-01 2024-01-31 gz</code>",
+        "export_caption": "📤 Заявок: {rows}",
+        "export_empty": "📤 Нет заявок, подходящих под эти фильтры.",
+        "export_too_large": "⚠️ Выгрузка больше 50 МБ. Добавьте <code>gz</code> или сузьте фильтры.",
+        "export_error": "❌ Произошла ошибка при выгрузке заявок. Пожалуйста, попробуйте снова.",
+
+        # Search
+        "search_usage": "🔍 <b>Поиск заявок</b>\n\n"
+                        "<code>/search СЛОВА</code>\n\n"
+                        "Ищет заявки по имени, контакту или цели. Слова можно сокращать, "
+                        "например <code>/search ив пет</code> найдёт Ивана Петрова.",
+        "search_results_title": "🔍 <b>Поиск: {query}</b>\n\nСтраница {page}, сначала лучшие совпадения:",
+        "search_no_results": "🔍 По запросу <b>{query}</b> ничего не найдено.",
+        "search_truncated": "⚠️ Показаны только {count} самых новых совпадений. Добавьте слова, чтобы найти более старые заявки.",
+        "search_expired": "Повторите поиск командой /search.",
     }
 }
 
@@ -3,26 +3,83 @@ Main entry point for the Telegram bot.
 """
 import asyncio
 import logging
-from typing import Any, Awaitable, Callable, Dict
+from typing import Any, Awaitable, Callable, Dict, List
 
 from aiogram import BaseMiddleware, Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
 from aiogram.enums import ParseMode
 from aiogram.fsm.storage.memory import MemoryStorage
 from aiogram.types import BotCommand, TelegramObject
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
 
-from config import BOT_TOKEN
-from db.database import get_session, init_db
+from config import (
+    ADMIN_CACHE_REFRESH_SECONDS,
+    BOT_API_URL,
+    BOT_MODE,
+    BOT_TOKEN,
+    FSM_PURGE_SECONDS,
+    FSM_STORAGE,
+    LOG_LEVEL,
+    LOOP_BLOCK_THRESHOLD_MS,
+    METRICS_HOST,
+    METRICS_PORT,
+    SLOW_UPDATE_LOG,
+    SLOW_UPDATE_MS,
+    THROTTLE_CALLBACK_BURST,
+    THROTTLE_CALLBACK_RATE,
+    THROTTLE_IDLE_SECONDS,
+    THROTTLE_MESSAGE_BURST,
+    THROTTLE_MESSAGE_RATE,
+    UPDATE_CONCURRENCY,
+    WEBHOOK_HOST,
+    WEBHOOK_PATH,
+    WEBHOOK_PORT,
+    WEBHOOK_SECRET,
+    WEBHOOK_URL,
+    WORKERS,
+)
+from db.cache import load_caches, refresh_admin_cache_periodically
+from db.database import LazySession, engine, init_db, read_engine
+from db.fsm_storage import SQLiteStorage
+from db.writer import write_coordinator
 from handlers import admin_handlers, application_handlers, cancel_handler, user_handlers
 from middlewares.antiflood import AntiFloodMiddleware
+from middlewares.metrics import HandlerMetricsMiddleware, UpdateMetricsMiddleware
+from middlewares.profiling import ProfilingMiddleware, slow_update_logger
+from middlewares.scheduler import SchedulerMiddleware
+from middlewares.throttling import ThrottlingMiddleware
+from middlewares.user import UserMiddleware
+from middlewares.watchdog import WatchdogMiddleware
+from services.metrics import (
+    BotApiMetrics,
+    instrument_engine_metrics,
+    monitor_event_loop,
+    serve_metrics,
+    watch_fsm_storage,
+    watch_outbox,
+)
+from services.outbox import outbox_worker
+from services.profiling import BotApiTimer
+from services.sharding import Supervisor
+from services.watchdog import loop_watchdog
 
 # Configure logging
 logging.basicConfig(
-    level=logging.INFO,
+    level=LOG_LEVEL,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
 logger = logging.getLogger(__name__)
 
+# Slow updates go to their own file as JSON lines if configured
+if SLOW_UPDATE_LOG:
+    slow_update_handler = logging.FileHandler(SLOW_UPDATE_LOG)
+    slow_update_handler.setFormatter(logging.Formatter("%(message)s"))
+    slow_update_logger.addHandler(slow_update_handler)
+    slow_update_logger.propagate = False
+
 
 async def setup_bot_commands(bot: Bot):
     """Set up bot commands menu."""
@@ -36,38 +93,105 @@ async def setup_bot_commands(bot: Bot):
 
 class DatabaseMiddleware(BaseMiddleware):
     """Database session middleware."""
-    
+
+    def __init__(self):
+        self.updates_total = 0
+        self.updates_without_session = 0
+
     async def __call__(
         self,
         handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
         event: TelegramObject,
         data: Dict[str, Any]
     ) -> Any:
-        """Inject database session into handler data."""
-        async for session in get_session():
-            data["session"] = session
+        """Inject a lazy database session into handler data."""
+        session = LazySession()
+        data["session"] = session
+        try:
             return await handler(event, data)
+        finally:
+            self.updates_total += 1
+            if session.opened:
+                await session.close()
+            else:
+                self.updates_without_session += 1
 
+    def log_stats(self):
+        """Log how many updates finished without touching the database."""
+        logger.info(
+            f"Database sessions: {self.updates_without_session} of "
+            f"{self.updates_total} updates finished without opening a connection"
+        )
 
-async def main():
-    """Main function to start the bot."""
-    # Initialize database
-    logger.info("Initializing database...")
-    await init_db()
-    logger.info("Database initialized.")
-    
-    # Initialize bot and dispatcher
+
+def create_bot(api_url: str = BOT_API_URL) -> Bot:
+    """
+    Create the bot with its request middlewares.
+
+    Args:
+        api_url: Base URL of a local Bot API server, empty for api.telegram.org
+    """
+    session = AiohttpSession(api=TelegramAPIServer.from_base(api_url)) if api_url else None
     bot = Bot(
         token=BOT_TOKEN,
+        session=session,
         default=DefaultBotProperties(parse_mode=ParseMode.HTML)
     )
-    dp = Dispatcher(storage=MemoryStorage())
+    bot.session.middleware(BotApiTimer())
+    if METRICS_PORT:
+        bot.session.middleware(BotApiMetrics())
+    return bot
+
+
+def build_dispatcher() -> Dispatcher:
+    """Create the dispatcher with storage, middlewares and routers."""
+    if FSM_STORAGE == "sqlite":
+        storage = SQLiteStorage()
+    else:
+        storage = MemoryStorage()
+    # Each user's updates run one at a time, from before their FSM state is read
+    scheduler = SchedulerMiddleware(UPDATE_CONCURRENCY)
+    dp = Dispatcher(storage=storage, events_isolation=scheduler)
+    
+    if METRICS_PORT:
+        dp.update.outer_middleware(UpdateMetricsMiddleware())
+    
+    # Drop over-limit updates before filters and any database work
+    dp.message.outer_middleware(ThrottlingMiddleware(
+        THROTTLE_MESSAGE_RATE, THROTTLE_MESSAGE_BURST, THROTTLE_IDLE_SECONDS
+    ))
+    dp.callback_query.outer_middleware(ThrottlingMiddleware(
+        THROTTLE_CALLBACK_RATE, THROTTLE_CALLBACK_BURST, THROTTLE_IDLE_SECONDS
+    ))
+    
+    # Handle different users in parallel up to the concurrency limit
+    dp.message.outer_middleware(scheduler)
+    dp.callback_query.outer_middleware(scheduler)
+    dp.shutdown.register(scheduler.log_stats)
     
-    # Register middlewares
+    # Profile the whole inner chain: database session, user loading and handler
+    profiler = ProfilingMiddleware(SLOW_UPDATE_MS)
+    dp.message.middleware(profiler)
+    dp.callback_query.middleware(profiler)
+    dp.shutdown.register(profiler.log_stats)
+    if METRICS_PORT:
+        handler_metrics = HandlerMetricsMiddleware()
+        dp.message.middleware(handler_metrics)
+        dp.callback_query.middleware(handler_metrics)
+    if LOOP_BLOCK_THRESHOLD_MS:
+        # Lets the watchdog name the handler and update behind a blocked loop
+        dp.message.middleware(WatchdogMiddleware())
+        dp.callback_query.middleware(WatchdogMiddleware())
+    
+    # Register middlewares (order matters - antiflood needs no session, user needs one)
     dp.message.middleware(AntiFloodMiddleware())
     dp.callback_query.middleware(AntiFloodMiddleware())
-    dp.message.middleware(DatabaseMiddleware())
-    dp.callback_query.middleware(DatabaseMiddleware())
+    database_middleware = DatabaseMiddleware()
+    dp.message.middleware(database_middleware)
+    dp.callback_query.middleware(database_middleware)
+    dp.shutdown.register(database_middleware.log_stats)
+    dp.message.middleware(UserMiddleware())
+    dp.callback_query.middleware(UserMiddleware())
     
     # Register routers (order matters - cancel_handler should be last)
     dp.include_router(user_handlers.router)
@@ -75,12 +199,146 @@ async def main():
     dp.include_router(admin_handlers.router)
     dp.include_router(cancel_handler.router)  # Last to catch cancel button
     
+    return dp
+
+
+def create_webhook_app(dp: Dispatcher, bot: Bot) -> web.Application:
+    """
+    Create the aiohttp application that receives updates from Telegram.
+
+    Requests are answered with 200 right away and the update is processed
+    in a background task. Requests without the configured secret token are
+    rejected with 401.
+
+    Args:
+        dp: Dispatcher to feed updates into
+        bot: Bot instance
+
+    Returns:
+        aiohttp application serving WEBHOOK_PATH
+    """
+    app = web.Application()
+    SimpleRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        handle_in_background=True,
+        secret_token=WEBHOOK_SECRET or None,
+    ).register(app, path=WEBHOOK_PATH)
+    setup_application(app, dp, bot=bot)
+    return app
+
+
+def start_maintenance_tasks(dp: Dispatcher) -> List[asyncio.Task]:
+    """Start the background tasks every process that handles updates needs."""
+    # Keep the in-memory admin list in sync with direct database edits
+    tasks = [asyncio.create_task(
+        refresh_admin_cache_periodically(ADMIN_CACHE_REFRESH_SECONDS)
+    )]
+    
+    # Forget application drafts abandoned for longer than FSM_TTL_SECONDS
+    if isinstance(dp.storage, SQLiteStorage):
+        tasks.append(asyncio.create_task(
+            dp.storage.purge_periodically(FSM_PURGE_SECONDS)
+        ))
+    
+    # Report handlers that block the event loop
+    if LOOP_BLOCK_THRESHOLD_MS:
+        tasks.append(asyncio.create_task(loop_watchdog.run()))
+    return tasks
+
+
+def start_metrics_tasks(dp: Dispatcher, port: int) -> List[asyncio.Task]:
+    """
+    Start serving /metrics for this process.
+
+    Args:
+        dp: Dispatcher whose FSM storage is reported
+        port: Port of the metrics endpoint
+
+    Returns:
+        The endpoint and event loop monitor tasks
+    """
+    instrument_engine_metrics(engine)
+    instrument_engine_metrics(read_engine)
+    watch_fsm_storage(dp.storage)
+    return [
+        asyncio.create_task(serve_metrics(METRICS_HOST, port)),
+        asyncio.create_task(monitor_event_loop()),
+    ]
+
+
+async def run_webhook(dp: Dispatcher, bot: Bot, allowed_updates: List[str]):
+    """Serve the webhook endpoint and register it with Telegram until cancelled."""
+    runner = web.AppRunner(create_webhook_app(dp, bot))
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, WEBHOOK_HOST, WEBHOOK_PORT).start()
+        await bot.set_webhook(
+            f"{WEBHOOK_URL.rstrip('/')}{WEBHOOK_PATH}",
+            secret_token=WEBHOOK_SECRET or None,
+            allowed_updates=allowed_updates,
+        )
+        logger.info(f"Listening for webhook updates on {WEBHOOK_HOST}:{WEBHOOK_PORT}{WEBHOOK_PATH}")
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+async def main():
+    """Main function to start the bot."""
+    # Initialize database
+    logger.info("Initializing database...")
+    await init_db()
+    await load_caches()
+    logger.info("Database initialized.")
+    
+    # Initialize bot and dispatcher
+    bot = create_bot()
+    dp = build_dispatcher()
+    allowed_updates = dp.resolve_used_update_types()
+    
     # Set up bot commands
     await setup_bot_commands(bot)
     
-    # Start polling
-    logger.info("Starting bot...")
-    await dp.start_polling(bot, allowed_updates=dp.resolve_used_update_types())
+    supervisor = None
+    if WORKERS > 1:
+        # Workers run the real dispatcher; this process only receives and routes updates
+        supervisor = Supervisor(WORKERS)
+        supervisor.start()
+        await supervisor.wait_ready()
+        dp = supervisor.create_dispatcher()
+        background_tasks = []
+    else:
+        background_tasks = start_maintenance_tasks(dp)
+    if METRICS_PORT:
+        background_tasks += start_metrics_tasks(dp, METRICS_PORT)
+        # Only this process sends the outbox; the workers just queue messages
+        watch_outbox(outbox_worker)
+    
+    # Deliver queued notifications, including ones left over from a restart
+    background_tasks.append(asyncio.create_task(outbox_worker.run(bot)))
+    
+    logger.info(f"Starting bot in {BOT_MODE} mode with {WORKERS} worker(s)...")
+    try:
+        if BOT_MODE == "webhook":
+            await run_webhook(dp, bot, allowed_updates)
+        else:
+            # Telegram refuses getUpdates while a webhook is set
+            await bot.delete_webhook()
+            await dp.start_polling(
+                bot,
+                allowed_updates=allowed_updates,
+                # Forwarding is cheap; doing it in order keeps each user's updates in order
+                handle_as_tasks=supervisor is None,
+            )
+    finally:
+        for task in background_tasks:
+            task.cancel()
+        outbox_worker.log_stats()
+        if supervisor is not None:
+            await supervisor.stop()
+        # Commit writes queued during shutdown, e.g. the final FSM flush
+        await write_coordinator.close()
 
 
 if __name__ == "__main__":
@@ -3,17 +3,14 @@ Anti-flood middleware to prevent spam.
 Implements cooldown mechanism for application submissions.
 """
 import logging
-from datetime import datetime
 from typing import Any, Awaitable, Callable, Dict
 
 from aiogram import BaseMiddleware
 from aiogram.types import Message, TelegramObject
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from config import APP_COOLDOWN_SECONDS
-from db.models import User
-from locales.strings import LANG_EN, get_string
+from db.cache import cooldowns
+from locales.strings import get_string
+from services.metrics import rejected_updates
 
 logger = logging.getLogger(__name__)
 
@@ -46,37 +43,19 @@ class AntiFloodMiddleware(BaseMiddleware):
         if not event.text or not (event.text.startswith("/apply") or event.text.startswith("/start")):
             return await handler(event, data)
         
-        # Get database session
-        session: AsyncSession = data.get("session")
-        if not session:
-            return await handler(event, data)
-        
+        # Check cooldown in the in-memory index (no database access)
         user_id = event.from_user.id
-        
-        # Get or create user
-        result = await session.execute(
-            select(User).where(User.user_id == user_id)
-        )
-        user = result.scalar_one_or_none()
-        
-        if not user:
-            # New user, allow
-            return await handler(event, data)
-        
-        # Check cooldown
-        if user.last_submission_time:
-            time_diff = datetime.utcnow() - user.last_submission_time
-            if time_diff.total_seconds() < APP_COOLDOWN_SECONDS:
-                remaining = int(APP_COOLDOWN_SECONDS - time_diff.total_seconds())
-                language = user.language or LANG_EN
-                logger.info(
-                    f"User {user_id} blocked by antiflood, {remaining}s remaining"
-                )
-                await event.answer(
-                    get_string(language, "cooldown_active", seconds=remaining)
-                )
-                return
+        cooldown = cooldowns.get(user_id)
+        if cooldown:
+            remaining, language = cooldown
+            rejected_updates.inc(("antiflood",))
+            logger.info(
+                f"User {user_id} blocked by antiflood, {remaining}s remaining"
+            )
+            await event.answer(
+                get_string(language, "cooldown_active", seconds=remaining)
+            )
+            return
         
         # Allow handler to proceed
         return await handler(event, data)
-
@@ -0,0 +1,60 @@
+"""
+Metrics middlewares.
+Count incoming updates by type and record handler latency by router and handler.
+"""
+import time
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+
+from services.metrics import handler_duration, updates_total
+
+
+class UpdateMetricsMiddleware(BaseMiddleware):
+    """Update-level outer middleware counting every incoming update."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: Dict[str, Any]
+    ) -> Any:
+        updates_total.inc((event.event_type,))
+        return await handler(event, data)
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """Inner middleware timing the handler chosen for each update."""
+
+    def __init__(self):
+        # Handler callback -> (router module, handler name)
+        self._labels: Dict[Callable, Tuple[str, str]] = {}
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        """
+        Run the handler and record how long it took.
+
+        Args:
+            handler: Next handler in chain
+            event: Telegram event
+            data: Handler data
+
+        Returns:
+            Handler result
+        """
+        callback = data["handler"].callback
+        labels = self._labels.get(callback)
+        if labels is None:
+            labels = self._labels[callback] = (callback.__module__.rsplit(".", 1)[-1], callback.__name__)
+
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            handler_duration.observe(time.perf_counter() - started, labels)
@@ -0,0 +1,140 @@
+"""
+Per-update profiling middleware.
+Records wall, SQL and Bot API time and the SQL statement count of every
+handler, and writes updates slower than a threshold to the slow-update log.
+"""
+import json
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from services.profiling import UpdateProfile, current_profile
+
+logger = logging.getLogger(__name__)
+
+# One JSON object per slow update
+slow_update_logger = logging.getLogger("slow_updates")
+
+
+class HandlerStats:
+    """Totals for one handler."""
+
+    __slots__ = ("calls", "wall_time", "wall_max", "sql_time", "sql_count", "sql_max", "api_time", "api_count")
+
+    def __init__(self):
+        self.calls = 0
+        self.wall_time = 0.0
+        self.wall_max = 0.0
+        self.sql_time = 0.0
+        self.sql_count = 0
+        self.sql_max = 0
+        self.api_time = 0.0
+        self.api_count = 0
+
+
+class ProfilingMiddleware(BaseMiddleware):
+    """Middleware that profiles the handler chosen for each update."""
+
+    def __init__(self, slow_threshold_ms: float):
+        """
+        Args:
+            slow_threshold_ms: Updates taking at least this long are logged as slow
+        """
+        self.slow_threshold = slow_threshold_ms / 1000
+        self.handlers: Dict[str, HandlerStats] = defaultdict(HandlerStats)
+        self.slow_updates = 0
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        """
+        Run the handler with a fresh profile and record the result.
+
+        Args:
+            handler: Next handler in chain
+            event: Telegram event
+            data: Handler data
+
+        Returns:
+            Handler result
+        """
+        handler_object = data.get("handler")
+        name = handler_object.callback.__name__ if handler_object else "unknown"
+
+        outer = current_profile.get()
+        profile = UpdateProfile(capture_statements=outer is not None and outer.statements is not None)
+        token = current_profile.set(profile)
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            wall = time.perf_counter() - started
+            current_profile.reset(token)
+            if outer is not None:
+                outer.add(profile)
+            self._record(name, wall, profile, data)
+
+    def _record(self, name: str, wall: float, profile: UpdateProfile, data: Dict[str, Any]):
+        stats = self.handlers[name]
+        stats.calls += 1
+        stats.wall_time += wall
+        stats.wall_max = max(stats.wall_max, wall)
+        stats.sql_time += profile.sql_time
+        stats.sql_count += profile.sql_count
+        stats.sql_max = max(stats.sql_max, profile.sql_count)
+        stats.api_time += profile.api_time
+        stats.api_count += profile.api_count
+
+        if wall < self.slow_threshold:
+            return
+        self.slow_updates += 1
+        update = data.get("event_update")
+        user = data.get("event_from_user")
+        slow_update_logger.warning(json.dumps({
+            "time": datetime.utcnow().isoformat(timespec="milliseconds"),
+            "update_id": update.update_id if update else None,
+            "update_type": update.event_type if update else None,
+            "user_id": user.id if user else None,
+            "handler": name,
+            "wall_ms": round(wall * 1000, 2),
+            "sql_ms": round(profile.sql_time * 1000, 2),
+            "sql_count": profile.sql_count,
+            "api_ms": round(profile.api_time * 1000, 2),
+            "api_count": profile.api_count,
+        }))
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Return per-handler averages in milliseconds, slowest total first."""
+        ordered = sorted(self.handlers.items(), key=lambda item: item[1].wall_time, reverse=True)
+        return {
+            name: {
+                "calls": stats.calls,
+                "wall_avg_ms": stats.wall_time / stats.calls * 1000,
+                "wall_max_ms": stats.wall_max * 1000,
+                "sql_avg_ms": stats.sql_time / stats.calls * 1000,
+                "queries_avg": stats.sql_count / stats.calls,
+                "queries_max": stats.sql_max,
+                "api_avg_ms": stats.api_time / stats.calls * 1000,
+                "api_calls_avg": stats.api_count / stats.calls,
+            }
+            for name, stats in ordered
+        }
+
+    def log_stats(self):
+        """Log the per-handler summary."""
+        for name, stats in self.summary().items():
+            logger.info(
+                f"{name}: {stats['calls']} calls, wall {stats['wall_avg_ms']:.1f} ms avg / "
+                f"{stats['wall_max_ms']:.1f} ms max, SQL {stats['sql_avg_ms']:.1f} ms in "
+                f"{stats['queries_avg']:.1f} queries (max {stats['queries_max']}), "
+                f"Bot API {stats['api_avg_ms']:.1f} ms in {stats['api_calls_avg']:.1f} calls"
+            )
+        logger.info(f"Slow updates: {self.slow_updates}")
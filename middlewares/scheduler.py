@@ -0,0 +1,137 @@
+"""
+Update scheduling middleware.
+Runs updates from different users in parallel up to a global limit, while
+updates from the same user are handled one at a time, in arrival order.
+The per-user lock is the dispatcher's event isolation, so it is taken before
+the FSM state is read; the global limit is applied by the middleware, after
+the throttling middlewares have dropped over-limit updates.
+"""
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncGenerator, Awaitable, Callable, Dict, Optional
+
+from aiogram import BaseMiddleware
+from aiogram.fsm.storage.base import BaseEventIsolation, StorageKey
+from aiogram.types import TelegramObject
+
+logger = logging.getLogger(__name__)
+
+# When the update being handled arrived, set before waiting for its user's lock
+_arrived_at: ContextVar[Optional[float]] = ContextVar("scheduler_arrived_at", default=None)
+
+
+class _UserLock:
+    """Lock of one user and the number of updates holding or waiting for it."""
+
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+
+class SchedulerMiddleware(BaseMiddleware, BaseEventIsolation):
+    """
+    Serialises each user's updates under a global concurrency limit.
+
+    Pass it to the Dispatcher as events_isolation for the per-user order and
+    register it as an outer middleware for the concurrency limit.
+    """
+
+    def __init__(self, concurrency: int):
+        """
+        Args:
+            concurrency: Maximum number of updates handled at the same time
+        """
+        self.concurrency = concurrency
+        self.semaphore = asyncio.Semaphore(concurrency)
+        # Entries exist only while a user has updates in flight
+        self.locks: Dict[int, _UserLock] = {}
+
+        self.updates = 0
+        self.contended = 0  # updates that waited for the same user's previous update
+        self.saturated = 0  # updates that waited for a free concurrency slot
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    @asynccontextmanager
+    async def lock(self, key: StorageKey) -> AsyncGenerator[None, None]:
+        """
+        Hold the user's lock while the update's state is read and handled.
+
+        Args:
+            key: FSM storage key of the update
+        """
+        arrived = _arrived_at.set(time.perf_counter())
+        entry = self.locks.get(key.user_id)
+        if entry is None:
+            entry = self.locks[key.user_id] = _UserLock()
+        if entry.lock.locked():
+            self.contended += 1
+        entry.users += 1
+        try:
+            # asyncio.Lock wakes waiters in FIFO order, so the user's updates keep their order
+            async with entry.lock:
+                yield
+        finally:
+            entry.users -= 1
+            if entry.users == 0:
+                del self.locks[key.user_id]
+            _arrived_at.reset(arrived)
+
+    async def close(self) -> None:
+        """Nothing to release; the locks go away with their last update."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        """
+        Run the update once a concurrency slot is free.
+
+        Args:
+            handler: Next handler in chain
+            event: Telegram event
+            data: Handler data
+
+        Returns:
+            Handler result
+        """
+        arrived = _arrived_at.get()
+        if arrived is None:
+            # Updates without a user are not isolated
+            arrived = time.perf_counter()
+        if self.semaphore.locked():
+            self.saturated += 1
+        async with self.semaphore:
+            wait = time.perf_counter() - arrived
+            self.updates += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+            return await handler(event, data)
+
+    def stats(self) -> Dict[str, float]:
+        """Return queue wait times (milliseconds) and contention counters."""
+        return {
+            "updates": self.updates,
+            "contended": self.contended,
+            "saturated": self.saturated,
+            "wait_avg_ms": self.wait_total / self.updates * 1000 if self.updates else 0.0,
+            "wait_max_ms": self.wait_max * 1000,
+            "users_in_flight": len(self.locks),
+        }
+
+    def log_stats(self):
+        """Log queue wait time and lock contention."""
+        stats = self.stats()
+        logger.info(
+            f"Scheduler: {stats['updates']} updates, average wait {stats['wait_avg_ms']:.1f} ms, "
+            f"max wait {stats['wait_max_ms']:.1f} ms, {stats['contended']} waited for the "
+            f"same user, {stats['saturated']} waited for a free slot "
+            f"(limit {self.concurrency})"
+        )
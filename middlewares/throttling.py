@@ -0,0 +1,79 @@
+"""
+Per-user rate limiting middleware.
+Drops updates from users who exceed their token bucket before any handler work.
+"""
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from services.metrics import rejected_updates
+from services.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """Middleware that gives every user a token bucket for one update type."""
+
+    def __init__(self, rate: float, burst: int, idle_seconds: float):
+        """
+        Args:
+            rate: Updates per second a user may sustain
+            burst: Updates a user may send back to back
+            idle_seconds: Buckets untouched for this long are evicted
+        """
+        self.rate = rate
+        self.burst = burst
+        self.idle_seconds = idle_seconds
+        self.buckets: Dict[int, TokenBucket] = {}
+        self.dropped = 0
+        self._next_sweep = time.monotonic() + idle_seconds
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        """
+        Pass the update on only if the sender has a token left.
+
+        Args:
+            handler: Next handler in chain
+            event: Telegram event
+            data: Handler data
+
+        Returns:
+            Handler result, or None if the update was dropped
+        """
+        from_user = data.get("event_from_user")
+        if from_user is None:
+            return await handler(event, data)
+
+        self._evict_idle()
+
+        bucket = self.buckets.get(from_user.id)
+        if bucket is None:
+            bucket = self.buckets[from_user.id] = TokenBucket(self.rate, self.burst)
+
+        if not bucket.try_acquire():
+            self.dropped += 1
+            rejected_updates.inc(("throttle",))
+            logger.debug(f"User {from_user.id} throttled")
+            return None
+
+        return await handler(event, data)
+
+    def _evict_idle(self):
+        """Forget buckets of users who have been quiet for idle_seconds."""
+        now = time.monotonic()
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + self.idle_seconds
+        cutoff = now - self.idle_seconds
+        idle = [user_id for user_id, bucket in self.buckets.items() if bucket.updated_at < cutoff]
+        for user_id in idle:
+            del self.buckets[user_id]
@@ -0,0 +1,54 @@
+"""
+User loader middleware.
+Resolves the sender's User row once per update and shares it with handlers.
+"""
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from db.manager import get_or_create_user
+from locales.strings import AVAILABLE_LANGUAGES, LANG_EN
+
+
+class UserMiddleware(BaseMiddleware):
+    """Middleware that injects `user` and `language` into handler data."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        """
+        Get or create the sender's user row before calling the handler.
+
+        The lookup is skipped when the matched handler asks for neither
+        `user` nor `language`, so such updates never touch the database.
+
+        Args:
+            handler: Next handler in chain
+            event: Telegram event
+            data: Handler data
+
+        Returns:
+            Handler result
+        """
+        from_user = data.get("event_from_user")
+        handler_object = data.get("handler")
+        if from_user is None or (
+            handler_object is not None
+            and not handler_object.varkw
+            and not {"user", "language"} & handler_object.params
+        ):
+            return await handler(event, data)
+
+        language_code = from_user.language_code
+        user = await get_or_create_user(
+            data["session"],
+            from_user.id,
+            language=language_code if language_code in AVAILABLE_LANGUAGES else LANG_EN
+        )
+        data["user"] = user
+        data["language"] = user.language or LANG_EN
+        return await handler(event, data)
@@ -0,0 +1,48 @@
+"""
+Watchdog middleware.
+Tells the event loop watchdog which handler and update each task is processing.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from services.watchdog import loop_watchdog
+
+
+class WatchdogMiddleware(BaseMiddleware):
+    """Inner middleware registering the running handler with the watchdog."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        """
+        Track the current task while the handler runs.
+
+        Args:
+            handler: Next handler in chain
+            event: Telegram event
+            data: Handler data
+
+        Returns:
+            Handler result
+        """
+        task = asyncio.current_task()
+        handler_object = data.get("handler")
+        update = data.get("event_update")
+        user = data.get("event_from_user")
+        callback = handler_object.callback if handler_object else None
+        loop_watchdog.track(task, {
+            "handler": f"{callback.__module__}.{callback.__name__}" if callback else "unknown",
+            "update_id": update.update_id if update else None,
+            "update_type": update.event_type if update else None,
+            "user_id": user.id if user else None,
+        })
+        try:
+            return await handler(event, data)
+        finally:
+            loop_watchdog.untrack(task)
@@ -0,0 +1,192 @@
+"""
+Application export for admins.
+Streams the applications matching the filters from the read pool in chunks
+and writes each chunk to a temporary CSV or JSONL file, optionally gzipped,
+so memory use stays the same however many rows are exported.
+"""
+import asyncio
+import csv
+import gzip
+import json
+import logging
+import os
+import tempfile
+from datetime import date, datetime, timedelta
+from typing import IO, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+
+from db.database import read_session
+from db.models import Application, ApplicationStatus
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ("csv", "jsonl")
+EXPORT_COLUMNS = ("id", "user_id", "name", "contact", "purpose", "status", "created_at", "updated_at")
+
+# Rows fetched from the cursor and written to the file at a time
+EXPORT_CHUNK_ROWS = 1000
+
+# Largest file a bot may send with sendDocument
+MAX_DOCUMENT_BYTES = 50 * 1024 * 1024
+
+
+class ExportOptions:
+    """Filters and file format of an export."""
+
+    def __init__(
+        self,
+        file_format: str = "csv",
+        status: Optional[ApplicationStatus] = None,
+        since: Optional[date] = None,
+        until: Optional[date] = None,
+        compress: bool = False
+    ):
+        """
+        Args:
+            file_format: "csv" or "jsonl"
+            status: Only export applications with this status
+            since: First day of the submission date range
+            until: Last day of the submission date range, inclusive
+            compress: Gzip the file
+        """
+        self.file_format = file_format
+        self.status = status
+        self.since = since
+        self.until = until
+        self.compress = compress
+
+    @property
+    def filename(self) -> str:
+        """File name shown to the admin, e.g. applications_pending_2024-01-01_2024-01-31.csv.gz"""
+        parts = ["applications"]
+        if self.status is not None:
+            parts.append(self.status.value)
+        if self.since is not None or self.until is not None:
+            parts.append(str(self.since or "start"))
+            parts.append(str(self.until or "now"))
+        return "_".join(parts) + f".{self.file_format}" + (".gz" if self.compress else "")
+
+
+def parse_export_args(args: Optional[str]) -> ExportOptions:
+    """
+    Parse the arguments of /export.
+
+    Arguments may come in any order: a format (csv or jsonl), a status
+    (pending, approved, rejected or all), "gz", and up to two dates in
+    YYYY-MM-DD format, the first and last day of the date range.
+
+    Args:
+        args: Text after the command, or None
+
+    Returns:
+        Export options
+
+    Raises:
+        ValueError: If an argument is not recognised
+    """
+    options = ExportOptions()
+    statuses = {status.value: status for status in ApplicationStatus}
+    dates = []
+    for arg in (args or "").lower().split():
+        if arg in EXPORT_FORMATS:
+            options.file_format = arg
+        elif arg in statuses:
+            options.status = statuses[arg]
+        elif arg == "all":
+            options.status = None
+        elif arg in ("gz", "gzip"):
+            options.compress = True
+        else:
+            try:
+                dates.append(datetime.strptime(arg, "%Y-%m-%d").date())
+            except ValueError:
+                raise ValueError(f"Unknown export argument: {arg}")
+
+    if len(dates) > 2:
+        raise ValueError("At most two dates are allowed")
+    if dates:
+        options.since = dates[0]
+    if len(dates) == 2:
+        options.until = dates[1]
+        if options.until < options.since:
+            raise ValueError("The date range ends before it starts")
+    return options
+
+
+def _open_file(path: str, compress: bool) -> IO[str]:
+    if compress:
+        return gzip.open(path, "wt", encoding="utf-8", newline="")
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+def _format_row(row: Sequence) -> list:
+    """Column values as plain strings and numbers."""
+    values = list(row)
+    values[5] = values[5].value
+    values[6] = values[6].isoformat(sep=" ")
+    values[7] = values[7].isoformat(sep=" ")
+    return values
+
+
+def _write_csv(file: IO[str], rows: Sequence[Sequence], header: bool):
+    writer = csv.writer(file)
+    if header:
+        writer.writerow(EXPORT_COLUMNS)
+    writer.writerows(_format_row(row) for row in rows)
+
+
+def _write_jsonl(file: IO[str], rows: Sequence[Sequence], header: bool):
+    file.writelines(
+        json.dumps(dict(zip(EXPORT_COLUMNS, _format_row(row))), ensure_ascii=False) + "\n"
+        for row in rows
+    )
+
+
+async def export_applications(options: ExportOptions) -> Tuple[str, int]:
+    """
+    Write the applications matching the options to a temporary file.
+
+    Rows come from a server-side cursor EXPORT_CHUNK_ROWS at a time, and
+    each chunk is written in a worker thread so the event loop stays free
+    while it is formatted and compressed.
+
+    Args:
+        options: Filters and file format
+
+    Returns:
+        Path of the file, which the caller must delete, and the number of rows
+    """
+    query = select(*(getattr(Application, column) for column in EXPORT_COLUMNS))
+    if options.status is not None:
+        # ix_applications_status_created_at returns these in created_at order
+        query = query.where(Application.status == options.status).order_by(Application.created_at, Application.id)
+    else:
+        query = query.order_by(Application.id)
+    if options.since is not None:
+        query = query.where(Application.created_at >= datetime.combine(options.since, datetime.min.time()))
+    if options.until is not None:
+        query = query.where(
+            Application.created_at < datetime.combine(options.until + timedelta(days=1), datetime.min.time())
+        )
+
+    write_rows = _write_csv if options.file_format == "csv" else _write_jsonl
+    fd, path = tempfile.mkstemp(prefix="export_", suffix=f".{options.file_format}")
+    os.close(fd)
+    rows = 0
+    try:
+        file = await asyncio.to_thread(_open_file, path, options.compress)
+        try:
+            async with read_session() as session:
+                result = await session.stream(query.execution_options(yield_per=EXPORT_CHUNK_ROWS))
+                async for chunk in result.partitions():
+                    await asyncio.to_thread(write_rows, file, chunk, rows == 0)
+                    rows += len(chunk)
+        finally:
+            await asyncio.to_thread(file.close)
+    except BaseException:
+        os.remove(path)
+        raise
+
+    logger.info(f"Exported {rows} applications to {path} ({os.path.getsize(path)} bytes)")
+    return path, rows
@@ -0,0 +1,317 @@
+"""
+Prometheus-compatible metrics.
+A small in-process registry of counters, gauges and fixed-bucket histograms,
+rendered in the Prometheus text format by an optional /metrics endpoint.
+Recording a value is a dict lookup and an addition, cheap enough to stay on
+under load.
+"""
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections import Counter as TallyCounter
+from typing import Awaitable, Callable, Dict, Iterator, List, Sequence, Tuple
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.fsm.storage.base import BaseStorage
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+from aiohttp import web
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from db.database import TimedQueuePool
+from db.fsm_storage import SQLiteStorage
+from services.outbox import OutboxWorker
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers everything from a cached handler to a slow Bot API call
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric(ABC):
+    """Base class of all metrics; label values are passed as a tuple."""
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        """
+        Args:
+            name: Metric name
+            documentation: Help text
+            labelnames: Names of the labels, in the order values are passed
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        registry.register(self)
+
+    @abstractmethod
+    def samples(self) -> Iterator[str]:
+        """Yield the sample lines of the metric in the text format."""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """Monotonically increasing count."""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels = (), amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels: Labels = ()) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self) -> Iterator[str]:
+        for labels, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Gauge(Metric):
+    """Value that goes up and down, usually set by a collector at scrape time."""
+
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def set(self, value: float, labels: Labels = ()):
+        self._values[labels] = value
+
+    def clear(self):
+        self._values.clear()
+
+    def samples(self) -> Iterator[str]:
+        for labels, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Histogram(Metric):
+    """Distribution of observed values over fixed buckets."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [count per bucket..., count above the last bucket, sum]
+        self._series: Dict[Labels, List[float]] = {}
+
+    def observe(self, value: float, labels: Labels = ()):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 2)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def count(self, labels: Labels = ()) -> int:
+        series = self._series.get(labels)
+        return sum(series[:-1]) if series else 0
+
+    def samples(self) -> Iterator[str]:
+        for labels, series in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = f'le="{_format_value(float(bound))}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+            label_text = _format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{label_text} {_format_value(float(series[-1]))}"
+            yield f"{self.name}_count{label_text} {cumulative}"
+
+
+class Registry:
+    """All metrics of the process and the collectors refreshing gauges before a scrape."""
+
+    def __init__(self):
+        self.metrics: List[Metric] = []
+        self.collectors: List[Callable[[], Awaitable[None]]] = []
+
+    def register(self, metric: Metric):
+        self.metrics.append(metric)
+
+    def add_collector(self, collector: Callable[[], Awaitable[None]]):
+        self.collectors.append(collector)
+
+    async def render(self) -> str:
+        """Run the collectors and render every metric in the text format."""
+        for collector in self.collectors:
+            try:
+                await collector()
+            except Exception as e:
+                logger.error(f"Metrics collector failed: {e}", exc_info=True)
+        return "\n".join(metric.render() for metric in self.metrics) + "\n"
+
+
+registry = Registry()
+
+updates_total = Counter("bot_updates_total", "Updates received, by update type.", ("type",))
+handler_duration = Histogram(
+    "bot_handler_duration_seconds",
+    "Time spent handling an update, by router module and handler.",
+    ("router", "handler"),
+)
+rejected_updates = Counter(
+    "bot_rejected_updates_total",
+    "Updates dropped by the rate limits, by reason (throttle or antiflood).",
+    ("reason",),
+)
+db_pool_wait = Histogram("bot_db_pool_wait_seconds", "Time spent waiting for a pooled database connection.")
+db_query_duration = Histogram(
+    "bot_db_query_duration_seconds", "Duration of SQL statements, by statement kind.", ("statement",)
+)
+bot_api_duration = Histogram(
+    "bot_api_request_duration_seconds", "Duration of Bot API requests, by method.", ("method",)
+)
+bot_api_errors = Counter("bot_api_errors_total", "Failed Bot API requests, by method and error.", ("method", "error"))
+fsm_states = Gauge("bot_fsm_states", "Conversations currently in each FSM state.", ("state",))
+outbox_depth = Gauge("bot_outbox_depth", "Messages waiting in the outbox.")
+outbox_messages = Gauge(
+    "bot_outbox_messages", "Outbox messages since start, by outcome (delivered, retried, dropped).", ("outcome",)
+)
+outbox_latency = Gauge(
+    "bot_outbox_latency_seconds", "Time from enqueue to delivery of outbox messages, by statistic (avg, max).", ("stat",)
+)
+event_loop_lag = Histogram(
+    "bot_event_loop_lag_seconds",
+    "How late the event loop woke up a sleeping task.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+
+def instrument_engine_metrics(engine: AsyncEngine):
+    """Record pool checkout waits and statement durations of the engine."""
+    TimedQueuePool.on_wait = db_pool_wait.observe
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        kind = statement.split(None, 1)[0].upper() if statement else ""
+        db_query_duration.observe(time.perf_counter() - context._metrics_started, (kind,))
+
+
+def watch_fsm_storage(storage: BaseStorage):
+    """Count conversations per FSM state on every scrape."""
+
+    async def collect():
+        if isinstance(storage, SQLiteStorage):
+            counts = await storage.count_states()
+        elif isinstance(storage, MemoryStorage):
+            counts = TallyCounter(record.state for record in storage.storage.values() if record.state)
+        else:
+            return
+        fsm_states.clear()
+        for state, count in counts.items():
+            fsm_states.set(count, (state,))
+
+    registry.add_collector(collect)
+
+
+def watch_outbox(worker: OutboxWorker):
+    """Report the outbox backlog and the worker's delivery counters on every scrape."""
+
+    async def collect():
+        outbox_depth.set(await worker.queue_depth())
+        stats = worker.stats()
+        for outcome in ("delivered", "retried", "dropped"):
+            outbox_messages.set(stats[outcome], (outcome,))
+        outbox_latency.set(stats["latency_avg"], ("avg",))
+        outbox_latency.set(stats["latency_max"], ("max",))
+
+    registry.add_collector(collect)
+
+
+class BotApiMetrics(BaseRequestMiddleware):
+    """Bot session middleware recording latency and errors of Bot API calls."""
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        labels = (method.__api_method__,)
+        started = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        except Exception as e:
+            bot_api_errors.inc((method.__api_method__, type(e).__name__))
+            raise
+        finally:
+            bot_api_duration.observe(time.perf_counter() - started, labels)
+
+
+async def monitor_event_loop(interval: float = 0.5):
+    """
+    Measure event loop lag every `interval` seconds until cancelled.
+
+    Args:
+        interval: Seconds between measurements
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        event_loop_lag.observe(max(0.0, loop.time() - started - interval))
+
+
+async def handle_metrics(request: web.Request) -> web.Response:
+    return web.Response(body=(await registry.render()).encode(), headers={"Content-Type": CONTENT_TYPE})
+
+
+async def serve_metrics(host: str, port: int):
+    """Serve /metrics on host:port until cancelled."""
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, host, port).start()
+        logger.info(f"Serving metrics on {host}:{port}/metrics")
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
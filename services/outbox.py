@@ -0,0 +1,228 @@
+"""
+Durable outbox sender.
+Delivers messages queued in the outbox table with bounded concurrency under
+Telegram's global rate limit, retrying failures with backoff.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+
+from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramBadRequest,
+    TelegramForbiddenError,
+    TelegramNotFound,
+    TelegramRetryAfter,
+)
+from aiogram.types import InlineKeyboardMarkup
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import (
+    BOT_API_RATE_LIMIT,
+    NOTIFY_CONCURRENCY,
+    OUTBOX_BATCH_SIZE,
+    OUTBOX_MAX_ATTEMPTS,
+    OUTBOX_MAX_BACKOFF_SECONDS,
+    OUTBOX_POLL_SECONDS,
+)
+from db.database import read_session
+from db.models import OutboxMessage
+from db.writer import write_coordinator
+from services.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Errors that will not go away by retrying (blocked bot, deleted chat, bad markup)
+PERMANENT_ERRORS = (TelegramForbiddenError, TelegramBadRequest, TelegramNotFound)
+
+# Delivery outcomes
+ATTEMPT_DONE = "done"  # sent, or rejected for good
+ATTEMPT_FAILED = "failed"  # transient error, retry with backoff
+ATTEMPT_THROTTLED = "throttled"  # flood control, retry after the requested delay
+
+
+class OutboxWorker:
+    """Background task that drains the outbox table in batches."""
+
+    def __init__(
+        self,
+        batch_size: int = OUTBOX_BATCH_SIZE,
+        poll_interval: float = OUTBOX_POLL_SECONDS,
+        max_attempts: int = OUTBOX_MAX_ATTEMPTS,
+        max_backoff: float = OUTBOX_MAX_BACKOFF_SECONDS,
+        rate: float = BOT_API_RATE_LIMIT,
+        concurrency: int = NOTIFY_CONCURRENCY
+    ):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.max_backoff = max_backoff
+        self.bucket = TokenBucket(rate, rate)
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self._wakeup = asyncio.Event()
+        self._resume_at = 0.0
+        # Called on every wake(); worker processes use it to wake the supervisor's sender
+        self.on_wake: Optional[Callable[[], None]] = None
+
+        self.delivered = 0
+        self.retried = 0
+        self.dropped = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def wake(self):
+        """Start the next batch now instead of waiting for the poll interval."""
+        self._wakeup.set()
+        if self.on_wake is not None:
+            self.on_wake()
+
+    async def queue_depth(self) -> int:
+        """Return the number of messages waiting in the outbox."""
+        async with read_session() as session:
+            result = await session.execute(select(func.count(OutboxMessage.id)))
+            return result.scalar() or 0
+
+    def stats(self) -> Dict[str, float]:
+        """Return delivery counters and latency (seconds from enqueue to delivery)."""
+        return {
+            "delivered": self.delivered,
+            "retried": self.retried,
+            "dropped": self.dropped,
+            "latency_avg": self.latency_total / self.delivered if self.delivered else 0.0,
+            "latency_max": self.latency_max,
+        }
+
+    def log_stats(self):
+        """Log delivery counters and latency."""
+        stats = self.stats()
+        logger.info(
+            f"Outbox: {stats['delivered']} delivered, {stats['retried']} retries, {stats['dropped']} dropped, "
+            f"average latency {stats['latency_avg']:.2f} s, max {stats['latency_max']:.2f} s"
+        )
+
+    async def run(self, bot: Bot):
+        """
+        Deliver queued messages until cancelled.
+
+        Args:
+            bot: Bot instance used for sending
+        """
+        logger.info("Outbox worker started")
+        while True:
+            pause = self._resume_at - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+
+            try:
+                processed = await self.process_batch(bot)
+            except Exception as e:
+                logger.error(f"Outbox batch failed: {e}", exc_info=True)
+                processed = 0
+
+            if processed >= self.batch_size:
+                continue  # More rows are probably due, keep draining
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def process_batch(self, bot: Bot) -> int:
+        """
+        Send one batch of due messages and record the outcome of each.
+
+        Args:
+            bot: Bot instance used for sending
+
+        Returns:
+            Number of messages taken from the outbox
+        """
+        now = datetime.utcnow()
+        async with read_session() as session:
+            result = await session.execute(
+                select(OutboxMessage)
+                .where(OutboxMessage.next_attempt_at <= now)
+                .order_by(OutboxMessage.id)
+                .limit(self.batch_size)
+            )
+            messages = result.scalars().all()
+        if not messages:
+            return 0
+
+        # Send without holding a connection, then record all outcomes at once
+        outcomes = await asyncio.gather(*(self._deliver(bot, message) for message in messages))
+
+        done_ids = []
+        retries = []
+        for message, (outcome, delay) in zip(messages, outcomes):
+            attempts = message.attempts + (outcome == ATTEMPT_FAILED)
+            if outcome == ATTEMPT_DONE:
+                done_ids.append(message.id)
+            elif attempts >= self.max_attempts:
+                logger.error(f"Outbox message #{message.id} dropped after {attempts} attempts")
+                self.dropped += 1
+                done_ids.append(message.id)
+            else:
+                retries.append({
+                    "id": message.id,
+                    "attempts": attempts,
+                    "next_attempt_at": now + timedelta(seconds=delay),
+                })
+
+        async def record_outcomes(session: AsyncSession):
+            if done_ids:
+                await session.execute(
+                    delete(OutboxMessage).where(OutboxMessage.id.in_(done_ids))
+                )
+            if retries:
+                await session.execute(update(OutboxMessage), retries)
+
+        await write_coordinator.run(record_outcomes)
+
+        self.retried += len(retries)
+        return len(messages)
+
+    async def _deliver(self, bot: Bot, message: OutboxMessage) -> Tuple[str, float]:
+        """
+        Try to send one message.
+
+        Returns:
+            Tuple of (outcome, seconds to wait before the next attempt)
+        """
+        reply_markup = (
+            InlineKeyboardMarkup.model_validate_json(message.reply_markup)
+            if message.reply_markup else None
+        )
+        try:
+            async with self.semaphore:
+                await self.bucket.acquire()
+                # Another send of this batch may have hit flood control meanwhile
+                pause = self._resume_at - time.monotonic()
+                if pause > 0:
+                    return ATTEMPT_THROTTLED, pause
+                await bot.send_message(message.chat_id, message.text, reply_markup=reply_markup)
+        except TelegramRetryAfter as e:
+            # Flood control is not the message's fault, so it does not use up an attempt
+            logger.warning(f"Flood control, pausing outbox for {e.retry_after}s")
+            self._resume_at = max(self._resume_at, time.monotonic() + e.retry_after)
+            return ATTEMPT_THROTTLED, float(e.retry_after)
+        except PERMANENT_ERRORS as e:
+            logger.warning(f"Outbox message #{message.id} to {message.chat_id} rejected: {e}")
+            self.dropped += 1
+            return ATTEMPT_DONE, 0.0
+        except Exception as e:
+            delay = min(2 ** message.attempts, self.max_backoff)
+            logger.warning(f"Outbox message #{message.id} failed, retrying in {delay}s: {e}")
+            return ATTEMPT_FAILED, float(delay)
+
+        latency = (datetime.utcnow() - message.created_at).total_seconds()
+        self.delivered += 1
+        self.latency_total += latency
+        self.latency_max = max(self.latency_max, latency)
+        return ATTEMPT_DONE, 0.0
+
+
+outbox_worker = OutboxWorker()
@@ -0,0 +1,114 @@
+"""
+Per-update resource accounting.
+Counts SQL statements and times SQL and Bot API calls made while an update
+(or any block of code) is being profiled.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class UpdateProfile:
+    """SQL and Bot API usage collected while profiling one update."""
+
+    __slots__ = ("sql_count", "sql_time", "api_count", "api_time", "statements")
+
+    def __init__(self, capture_statements: bool = False):
+        """
+        Args:
+            capture_statements: Keep the text of every SQL statement
+        """
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.api_count = 0
+        self.api_time = 0.0
+        self.statements: Optional[List[str]] = [] if capture_statements else None
+
+    def add(self, other: "UpdateProfile"):
+        """Add the usage collected by a nested profile."""
+        self.sql_count += other.sql_count
+        self.sql_time += other.sql_time
+        self.api_count += other.api_count
+        self.api_time += other.api_time
+        if self.statements is not None and other.statements is not None:
+            self.statements.extend(other.statements)
+
+
+# Profile of the update handled by the current task, if any
+current_profile: ContextVar[Optional[UpdateProfile]] = ContextVar("current_profile", default=None)
+
+
+def instrument_engine(engine: AsyncEngine):
+    """Count and time every statement the engine runs for the current profile."""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if current_profile.get() is not None:
+            context._profile_started = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        profile = current_profile.get()
+        started = getattr(context, "_profile_started", None)
+        if profile is None or started is None:
+            return
+        profile.sql_count += 1
+        profile.sql_time += time.perf_counter() - started
+        if profile.statements is not None:
+            profile.statements.append(statement)
+
+
+class BotApiTimer(BaseRequestMiddleware):
+    """Bot session middleware that times Bot API calls for the current profile."""
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        profile = current_profile.get()
+        if profile is None:
+            return await make_request(bot, method)
+        started = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        finally:
+            profile.api_count += 1
+            profile.api_time += time.perf_counter() - started
+
+
+@contextmanager
+def assert_max_queries(limit: int) -> Iterator[UpdateProfile]:
+    """
+    Fail if the block runs more than `limit` SQL statements.
+
+    Usage:
+        with assert_max_queries(4):
+            await dp.feed_update(bot, update)
+
+    Args:
+        limit: Maximum number of statements
+
+    Raises:
+        AssertionError: With the executed statements if the budget is exceeded
+    """
+    profile = UpdateProfile(capture_statements=True)
+    token = current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        current_profile.reset(token)
+    if profile.sql_count > limit:
+        statements = "\n".join(f"  {statement}" for statement in profile.statements)
+        raise AssertionError(
+            f"{profile.sql_count} SQL statements, budget is {limit}:\n{statements}"
+        )
@@ -0,0 +1,256 @@
+"""
+Multi-process mode.
+The supervisor receives updates and routes each one to a worker process chosen
+by its sender, so a user's updates and FSM state always stay on one worker.
+A worker that dies is started again with a new queue: a process killed while
+reading its queue leaves the queue's lock held, so the updates it had not taken
+yet are lost, and this is logged.
+Every worker has its own WriteCoordinator, so there is one SQLite writer per
+process, not one overall: the workers' write transactions still wait on each
+other through busy_timeout.
+"""
+import asyncio
+import logging
+import multiprocessing
+from typing import Any, Dict, List, Optional, Set
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+
+from config import METRICS_PORT
+from db import cache
+from db.writer import write_coordinator
+from services.outbox import outbox_worker
+
+logger = logging.getLogger(__name__)
+
+# Messages sent to a worker
+MSG_UPDATE = "update"  # (MSG_UPDATE, raw update)
+MSG_CACHE = "cache"  # (MSG_CACHE, cache name, method, args)
+MSG_STOP = "stop"  # (MSG_STOP,)
+
+# Messages sent by a worker to the supervisor
+MSG_READY = "ready"  # (MSG_READY, worker index)
+MSG_CACHE_CHANGED = "cache_changed"  # (MSG_CACHE_CHANGED, worker index, cache name, method, args)
+MSG_WAKE_OUTBOX = "wake_outbox"  # (MSG_WAKE_OUTBOX,)
+
+# Seconds between checks that the workers are alive
+WORKER_CHECK_SECONDS = 1.0
+
+
+def shard_key(update: Dict[str, Any]) -> int:
+    """
+    Return the ID an update is routed by: its sender, or its chat if it has none.
+
+    Args:
+        update: Raw update as received from Telegram
+
+    Returns:
+        User or chat ID, 0 for updates that carry neither
+    """
+    for payload in update.values():
+        if not isinstance(payload, dict):
+            continue
+        sender = payload.get("from") or payload.get("user")
+        if sender:
+            return sender["id"]
+        chat = payload.get("chat") or (payload.get("message") or {}).get("chat")
+        if chat:
+            return chat["id"]
+    return 0
+
+
+class Supervisor:
+    """Starts worker processes and distributes updates between them."""
+
+    def __init__(self, workers: int):
+        """
+        Args:
+            workers: Number of worker processes
+        """
+        self.workers = workers
+        # Workers run their own event loop and SQLite connections, so never fork
+        self.context = multiprocessing.get_context("spawn")
+        self.events = self.context.Queue()
+        self.queues = [self.context.Queue() for _ in range(workers)]
+        self.processes = [self._create_process(index) for index in range(workers)]
+        self.routed: List[int] = [0] * workers
+        self.restarts = 0
+        self._ready: Set[int] = set()
+        self._all_ready = asyncio.Event()
+        self._stopping = False
+        self._relay_task: Optional[asyncio.Task] = None
+        self._monitor_task: Optional[asyncio.Task] = None
+
+    def _create_process(self, index: int) -> multiprocessing.Process:
+        return self.context.Process(
+            target=worker_main,
+            args=(index, self.queues[index], self.events),
+            name=f"worker-{index}",
+        )
+
+    def start(self):
+        """Start the workers and the relay of their messages."""
+        for process in self.processes:
+            process.start()
+        self._relay_task = asyncio.create_task(self._relay())
+        logger.info(f"Started {self.workers} worker processes")
+
+    async def wait_ready(self):
+        """Wait until every worker has loaded its caches and dispatcher, then start watching them."""
+        while not self._all_ready.is_set():
+            for process in self.processes:
+                if not process.is_alive():
+                    raise RuntimeError(f"{process.name} exited with code {process.exitcode} during startup")
+            try:
+                await asyncio.wait_for(self._all_ready.wait(), WORKER_CHECK_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+        self._monitor_task = asyncio.create_task(self._monitor())
+
+    async def _monitor(self):
+        """Restart workers that exit on their own."""
+        while not self._stopping:
+            await asyncio.sleep(WORKER_CHECK_SECONDS)
+            for index, process in enumerate(self.processes):
+                if self._stopping or process.is_alive():
+                    continue
+                logger.error(
+                    f"{process.name} exited with code {process.exitcode}, restarting it; "
+                    f"updates queued for it are lost"
+                )
+                process.close()
+                dead_queue = self.queues[index]
+                dead_queue.cancel_join_thread()
+                dead_queue.close()
+                self.queues[index] = self.context.Queue()
+                self.processes[index] = self._create_process(index)
+                self.processes[index].start()
+                self.restarts += 1
+
+    def route(self, update: Dict[str, Any]):
+        """
+        Send a raw update to the worker that owns its sender.
+
+        Args:
+            update: Raw update
+        """
+        index = hash(shard_key(update)) % self.workers
+        self.queues[index].put((MSG_UPDATE, update))
+        self.routed[index] += 1
+
+    def create_dispatcher(self) -> Dispatcher:
+        """Create a dispatcher that forwards every update to the workers."""
+        dp = Dispatcher()
+        dp.update.outer_middleware(self._forward)
+        return dp
+
+    async def _forward(self, handler, event: Update, data: Dict[str, Any]):
+        self.route(event.model_dump(mode="json", by_alias=True, exclude_none=True))
+
+    async def _relay(self):
+        """Fan cache changes out to the other workers and forward outbox wake-ups."""
+        loop = asyncio.get_running_loop()
+        while True:
+            message = await loop.run_in_executor(None, self.events.get)
+            kind = message[0]
+            if kind == MSG_STOP:
+                return
+            if kind == MSG_READY:
+                self._ready.add(message[1])
+                if len(self._ready) == self.workers:
+                    self._all_ready.set()
+            elif kind == MSG_CACHE_CHANGED:
+                origin, change = message[1], message[2:]
+                for index, worker_queue in enumerate(self.queues):
+                    if index != origin:
+                        worker_queue.put((MSG_CACHE, *change))
+            elif kind == MSG_WAKE_OUTBOX:
+                outbox_worker.wake()
+
+    async def stop(self, timeout: float = 10.0):
+        """
+        Let the workers finish queued updates, then stop them.
+
+        Args:
+            timeout: Seconds to wait for each worker before terminating it
+        """
+        self._stopping = True
+        if self._monitor_task is not None:
+            self._monitor_task.cancel()
+        for worker_queue in self.queues:
+            worker_queue.put((MSG_STOP,))
+        loop = asyncio.get_running_loop()
+        for process in self.processes:
+            await loop.run_in_executor(None, process.join, timeout)
+            if process.is_alive():
+                logger.warning(f"{process.name} did not stop in {timeout}s, terminating")
+                process.terminate()
+        self.events.put((MSG_STOP,))
+        if self._relay_task is not None:
+            await self._relay_task
+        logger.info(f"Workers stopped, updates routed: {self.routed}, restarts: {self.restarts}")
+
+
+def worker_main(index: int, updates: multiprocessing.Queue, events: multiprocessing.Queue):
+    """Entry point of a worker process."""
+    asyncio.run(_run_worker(index, updates, events))
+
+
+async def _run_worker(index: int, updates: multiprocessing.Queue, events: multiprocessing.Queue):
+    # Imported here because main imports this module
+    from main import build_dispatcher, create_bot, start_maintenance_tasks, start_metrics_tasks
+
+    await cache.load_caches()
+    cache.set_publisher(
+        lambda name, method, args: events.put((MSG_CACHE_CHANGED, index, name, method, args))
+    )
+    outbox_worker.on_wake = lambda: events.put((MSG_WAKE_OUTBOX,))
+
+    bot = create_bot()
+    dp = build_dispatcher()
+    maintenance_tasks = start_maintenance_tasks(dp)
+    if METRICS_PORT:
+        maintenance_tasks += start_metrics_tasks(dp, METRICS_PORT + index + 1)
+    await dp.emit_startup(bot=bot)
+    events.put((MSG_READY, index))
+
+    # Last queued update per user; the next one starts only after it finishes
+    tails: Dict[int, asyncio.Task] = {}
+
+    def forget(key: int, task: asyncio.Task):
+        if tails.get(key) is task:
+            del tails[key]
+
+    loop = asyncio.get_running_loop()
+    while True:
+        message = await loop.run_in_executor(None, updates.get)
+        kind = message[0]
+        if kind == MSG_STOP:
+            break
+        if kind == MSG_CACHE:
+            cache.apply_change(*message[1:])
+            continue
+
+        update = message[1]
+        key = shard_key(update)
+        task = asyncio.create_task(_feed_after(tails.get(key), dp, bot, update))
+        tails[key] = task
+        task.add_done_callback(lambda done, key=key: forget(key, done))
+
+    await asyncio.gather(*tails.values())
+    for task in maintenance_tasks:
+        task.cancel()
+    await dp.emit_shutdown(bot=bot)
+    await write_coordinator.close()
+    await bot.session.close()
+
+
+async def _feed_after(previous: Optional[asyncio.Task], dp: Dispatcher, bot: Bot, update: Dict[str, Any]):
+    """Process an update once the previous update of the same user is done."""
+    if previous is not None:
+        await previous
+    try:
+        await dp.feed_raw_update(bot, update)
+    except Exception as e:
+        logger.error(f"Update {update.get('update_id')} failed: {e}", exc_info=True)
@@ -0,0 +1,99 @@
+"""
+Event loop blocking detector.
+A heartbeat task ticks on the event loop while a watchdog thread checks that
+it keeps ticking. When the loop stops answering for longer than a threshold,
+the thread logs the stack of the loop thread together with the handler and
+update that the running task is processing.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Any, Dict, Optional
+
+from config import LOOP_BLOCK_THRESHOLD_MS
+
+logger = logging.getLogger(__name__)
+
+
+class LoopWatchdog:
+    """Heartbeat task plus watchdog thread reporting blocking calls."""
+
+    def __init__(self, threshold: float):
+        """
+        Args:
+            threshold: Seconds the loop may be blocked before it is reported
+        """
+        self.threshold = threshold
+        self.interval = max(threshold / 4, 0.01)
+        self.stalls = 0
+        # Task -> handler and update it is processing, filled by WatchdogMiddleware
+        self._running: Dict[asyncio.Task, Dict[str, Any]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = 0.0
+        self._reported = False
+        self._stop = threading.Event()
+
+    def track(self, task: asyncio.Task, context: Dict[str, Any]):
+        """Remember what a task is processing until untrack is called."""
+        self._running[task] = context
+
+    def untrack(self, task: asyncio.Task):
+        self._running.pop(task, None)
+
+    async def run(self):
+        """Tick the heartbeat and watch it from a thread until cancelled."""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        thread.start()
+        logger.info(f"Watching for event loop blocks over {self.threshold * 1000:.0f} ms")
+        try:
+            while True:
+                await asyncio.sleep(self.interval)
+                now = time.monotonic()
+                lag = now - self._last_beat - self.interval
+                self._last_beat = now
+                if self._reported:
+                    self._reported = False
+                    logger.warning(f"Event loop unblocked after {lag * 1000:.0f} ms")
+        finally:
+            self._stop.set()
+
+    def _watch(self):
+        """Thread body: report once per stall of the heartbeat."""
+        while not self._stop.wait(self.interval):
+            lag = time.monotonic() - self._last_beat - self.interval
+            if lag >= self.threshold and not self._reported:
+                self._reported = True
+                self.stalls += 1
+                self._report(lag)
+
+    def _report(self, lag: float):
+        """Log the loop thread's stack and what its current task is processing."""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        task = asyncio.current_task(self._loop)
+        context = self._running.get(task) if task is not None else None
+
+        if context is not None:
+            where = (
+                f"handler {context['handler']} (update {context['update_id']}, "
+                f"{context['update_type']} from user {context['user_id']}, task {task.get_name()})"
+            )
+        elif task is not None:
+            where = f"task {task.get_name()} outside any handler"
+        else:
+            where = "a callback outside any task"
+        stack = "".join(traceback.format_stack(frame)) if frame is not None else "  <no stack>\n"
+        logger.warning(
+            f"Event loop blocked for {lag * 1000:.0f} ms in {where}; "
+            f"stack of the loop thread:\n{stack.rstrip()}"
+        )
+
+
+loop_watchdog = LoopWatchdog(LOOP_BLOCK_THRESHOLD_MS / 1000)
@@ -0,0 +1,38 @@
+"""
+Shared test setup.
+Points the bot at a scratch database before any bot module is imported and
+runs coroutines on a fresh event loop per test, closing the writer and the
+engines' connections before the loop goes away.
+"""
+import asyncio
+import os
+import tempfile
+
+os.environ["BOT_TOKEN"] = "123456:TEST"
+os.environ["ADMIN_ID"] = "1"
+os.environ["DB_FILE"] = os.path.join(tempfile.mkdtemp(), "tests.db")
+os.environ["LOG_LEVEL"] = "WARNING"
+
+import pytest  # noqa: E402
+
+from db.database import engine, init_db, read_engine  # noqa: E402
+from db.writer import write_coordinator  # noqa: E402
+
+
+@pytest.fixture
+def run():
+    """Run a coroutine to completion against an initialised database."""
+
+    def run_coroutine(coroutine):
+        async def main():
+            await init_db()
+            try:
+                return await coroutine
+            finally:
+                await write_coordinator.close()
+                await engine.dispose()
+                await read_engine.dispose()
+
+        return asyncio.run(main())
+
+    return run_coroutine
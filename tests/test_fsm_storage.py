@@ -0,0 +1,51 @@
+"""
+Tests for the SQLite FSM storage.
+"""
+import asyncio
+
+from aiogram.fsm.storage.base import StorageKey
+
+from db import fsm_storage
+from db.database import read_session
+from db.fsm_storage import SQLiteStorage
+from db.models import FsmRecord
+
+
+class FailingOnce:
+    """Write coordinator whose first write fails."""
+
+    def __init__(self, coordinator):
+        self.coordinator = coordinator
+        self.calls = 0
+
+    async def run(self, job):
+        self.calls += 1
+        if self.calls == 1:
+            raise RuntimeError("database is locked")
+        return await self.coordinator.run(job)
+
+
+def test_failed_flush_is_retried(run, monkeypatch):
+    writer = FailingOnce(fsm_storage.write_coordinator)
+    monkeypatch.setattr(fsm_storage, "write_coordinator", writer)
+    monkeypatch.setattr(fsm_storage, "FLUSH_RETRY_MIN_SECONDS", 0.01)
+
+    async def scenario():
+        storage = SQLiteStorage(flush_delay=0)
+        key = StorageKey(bot_id=1, chat_id=201, user_id=201)
+        await storage.set_state(key, "ApplicationSteps:name")
+
+        # No other change follows, so only the retry can save the state
+        for _ in range(100):
+            if storage.flushes:
+                break
+            await asyncio.sleep(0.01)
+
+        async with read_session() as session:
+            record = await session.get(FsmRecord, storage.key_builder.build(key))
+        return writer.calls, storage.flushes, record.state if record else None
+
+    calls, flushes, state = run(scenario())
+    assert calls == 2
+    assert flushes == 1
+    assert state == "ApplicationSteps:name"
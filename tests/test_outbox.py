@@ -0,0 +1,74 @@
+"""
+Tests for the outbox sender.
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select
+
+from benchmarks.fake_bot_api import FLOOD_CONTROL, NETWORK_ERROR, FakeBotAPI
+from db.database import read_session
+from db.manager import enqueue_messages
+from db.models import OutboxMessage
+from db.writer import write_coordinator
+from services.outbox import OutboxWorker
+
+
+async def clear_outbox():
+    async def delete_all(session):
+        await session.execute(delete(OutboxMessage))
+
+    await write_coordinator.run(delete_all)
+
+
+async def load_message() -> OutboxMessage:
+    async with read_session() as session:
+        return (await session.execute(select(OutboxMessage))).scalar_one()
+
+
+def test_flood_control_and_network_errors_are_retried(run):
+    api = FakeBotAPI()
+    worker = OutboxWorker(max_backoff=0.05)
+
+    async def scenario():
+        await api.start()
+        bot = api.create_bot()
+        try:
+            await clear_outbox()
+            await enqueue_messages(None, [(301, "Your application has been approved", None)])
+            api.fail_next("sendMessage", FLOOD_CONTROL, NETWORK_ERROR)
+            results = {}
+
+            # 429: rescheduled after retry_after without using up an attempt
+            started = datetime.utcnow()
+            await worker.process_batch(bot)
+            message = await load_message()
+            results["flood"] = (
+                message.attempts,
+                message.next_attempt_at >= started + timedelta(seconds=api.retry_after),
+            )
+            results["sent_before_due"] = await worker.process_batch(bot)
+            await asyncio.sleep(api.retry_after)
+
+            # Network error: rescheduled with backoff, using up an attempt
+            await worker.process_batch(bot)
+            message = await load_message()
+            results["network"] = message.attempts
+            await asyncio.sleep(worker.max_backoff)
+
+            await worker.process_batch(bot)
+            results["depth"] = await worker.queue_depth()
+            return results
+        finally:
+            await bot.session.close()
+            await api.stop()
+
+    results = run(scenario())
+    assert results["flood"] == (0, True)
+    assert results["sent_before_due"] == 0
+    assert results["network"] == 1
+    assert results["depth"] == 0
+    assert api.calls["sendmessage"] == 3
+    assert api.requests["sendmessage"][-1]["chat_id"] == "301"
+    stats = worker.stats()
+    assert (stats["delivered"], stats["retried"], stats["dropped"]) == (1, 2, 0)
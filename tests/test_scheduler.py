@@ -0,0 +1,93 @@
+"""
+Tests for the update scheduler.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+
+from aiogram import Bot, Dispatcher, Router
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.types import Message, Update
+
+from benchmarks.fake_bot_api import make_message_update
+from db.database import read_session
+from db.fsm_storage import SQLiteStorage
+from middlewares.scheduler import SchedulerMiddleware
+
+BOT_TOKEN = "123456:TEST"
+USER_ID = 401
+
+
+class Steps(StatesGroup):
+    first = State()
+    second = State()
+
+
+class SlowFirstRead:
+    """Read session factory whose first session is held until released."""
+
+    def __init__(self):
+        self.calls = 0
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    @asynccontextmanager
+    async def __call__(self):
+        self.calls += 1
+        if self.calls == 1:
+            self.started.set()
+            await self.release.wait()
+        async with read_session() as session:
+            yield session
+
+
+def test_user_order_survives_fsm_cache_miss(run):
+    handled = []
+    router = Router()
+
+    @router.message(Steps.first)
+    async def first_step(message: Message, state: FSMContext):
+        handled.append(("first", message.text))
+        await state.set_state(Steps.second)
+
+    @router.message(Steps.second)
+    async def second_step(message: Message):
+        handled.append(("second", message.text))
+
+    async def scenario():
+        key = StorageKey(bot_id=123456, chat_id=USER_ID, user_id=USER_ID)
+        saved = SQLiteStorage(flush_delay=0)
+        await saved.set_state(key, Steps.first)
+        await saved.close()
+
+        reads = SlowFirstRead()
+        storage = SQLiteStorage(session_factory=reads, flush_delay=0)
+        scheduler = SchedulerMiddleware(4)
+        dp = Dispatcher(storage=storage, events_isolation=scheduler)
+        dp.message.outer_middleware(scheduler)
+        dp.include_router(router)
+        bot = Bot(BOT_TOKEN)
+        try:
+            # The first update misses the cache and waits for its read
+            first = asyncio.create_task(
+                dp.feed_update(bot, Update.model_validate(make_message_update(1, USER_ID, "one")))
+            )
+            await reads.started.wait()
+            # Meanwhile the state gets cached, so the second update hits
+            await storage.get_state(key)
+            second = asyncio.create_task(
+                dp.feed_update(bot, Update.model_validate(make_message_update(2, USER_ID, "two")))
+            )
+            await asyncio.sleep(0.05)
+            reads.release.set()
+            await asyncio.gather(first, second)
+            await storage.close()
+            return scheduler.stats()
+        finally:
+            await bot.session.close()
+
+    stats = run(scenario())
+    assert handled == [("first", "one"), ("second", "two")]
+    assert stats["contended"] == 1
+    assert stats["users_in_flight"] == 0
@@ -0,0 +1,55 @@
+"""
+Tests for the application search.
+"""
+from sqlalchemy import insert
+
+from db import manager
+from db.database import read_session
+from db.manager import ApplicationSubmission, insert_applications, search_applications
+from db.models import User
+from db.writer import write_coordinator
+from handlers import admin_handlers
+
+USER_ID = 501
+
+
+async def submit_applications(purposes):
+    async def insert_all(session):
+        await session.execute(insert(User).prefix_with("OR IGNORE"), [{"user_id": USER_ID, "language": "en"}])
+        return await insert_applications(session, [
+            ApplicationSubmission({"user_id": USER_ID, "name": "Applicant", "contact": "a@example.com", "purpose": purpose})
+            for purpose in purposes
+        ])
+
+    return [application.id for application, _ in await write_coordinator.run(insert_all)]
+
+
+def test_search_past_ranked_limit_is_reported(run, monkeypatch):
+    monkeypatch.setattr(manager, "SEARCH_MAX_RANKED", 5)
+    monkeypatch.setattr(admin_handlers, "SEARCH_MAX_RANKED", 5)
+
+    async def scenario():
+        ids = await submit_applications([f"zebraquartz training number {i}" for i in range(8)])
+        await submit_applications(["unrelated purpose"] * 3)
+        await submit_applications([f"okapifeldspar course {i}" for i in range(5)])
+
+        async with read_session() as session:
+            broad = [await search_applications(session, "zebraquartz", page, limit=3) for page in range(3)]
+            narrow = await search_applications(session, "okapifeldspar", limit=10)
+            text, _ = await admin_handlers.render_search_results(session, "en", "zebraquartz", 0)
+            narrow_text, _ = await admin_handlers.render_search_results(session, "en", "okapifeldspar", 0)
+        return ids, broad, narrow, text, narrow_text
+
+    ids, broad, narrow, text, narrow_text = run(scenario())
+    found = [application.id for applications, _, _ in broad for application in applications]
+    # Only the 5 newest of the 8 matches are ranked and shown
+    assert sorted(found) == sorted(ids[-5:])
+    assert [has_more for _, has_more, _ in broad] == [True, False, False]
+    assert all(truncated for applications, _, truncated in broad if applications)
+    assert "Only the 5 newest matches are shown" in text
+
+    applications, has_more, truncated = narrow
+    assert len(applications) == 5
+    assert not has_more
+    assert not truncated
+    assert "newest matches" not in narrow_text